@@ -0,0 +1,11 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+# gunicorn settings, passed with -c in the Procfile
+
+
+def post_fork(server, worker):
+    # threads don't survive the fork so every worker starts its own, the app
+    # module is the one the worker then serves as app:server
+    from app import start_background_tasks
+
+    start_background_tasks()
@@ -0,0 +1,247 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import os
+import json
+import threading
+import time
+from collections import defaultdict
+
+import flask
+from dotenv import load_dotenv, find_dotenv
+
+from src.logs import get_logger
+
+logger = get_logger(__name__)
+
+load_dotenv(find_dotenv())
+
+# callback requests from a browser within this many seconds of the last one are
+# counted as part of the same user interaction
+CALLBACK_INTERACTION_WINDOW_S = float(os.getenv("CALLBACK_INTERACTION_WINDOW_S", 1))
+# log a summary of the callbacks per interaction after this many interactions
+CALLBACK_METRICS_LOG_EVERY = int(os.getenv("CALLBACK_METRICS_LOG_EVERY", 100))
+# name of interactions made of the requests a page fires when it loads
+PAGE_LOAD = "page_load"
+DASH_UPDATE_PATH = "/_dash-update-component"
+
+
+def prop_key(component_id, prop):
+    """Key identifying a component property, pattern matching ids by their type.
+
+    Parameters
+    ----------
+    component_id : str or dict
+        Component id, pattern matching ids can be given as their JSON.
+    prop : str
+        Property name.
+
+    Returns
+    -------
+    str
+        e.g. "explore-model-select.value"
+    """
+    if isinstance(component_id, str) and component_id.startswith("{"):
+        component_id = json.loads(component_id)
+    if isinstance(component_id, dict):
+        component_id = component_id.get("type")
+    return f"{component_id}.{prop}"
+
+
+class CallbackMetrics:
+    def __init__(self, window_s=CALLBACK_INTERACTION_WINDOW_S, max_clients=1024):
+        """Count the callbacks and server round trips each user interaction causes.
+
+        Every callback is its own request, a user interaction is the requests
+        fired by one change in the browser plus the requests chained off their
+        outputs. A request is chained when every input that changed is the
+        output of another callback (or nothing changed, the initial calls when
+        a page loads), otherwise it starts a new interaction named by the inputs
+        the user changed. Requests from a browser join its current interaction
+        while they arrive within `window_s` of the previous one.
+
+        Parameters
+        ----------
+        window_s : float, optional
+            Seconds between requests of the same interaction, by default
+            CALLBACK_INTERACTION_WINDOW_S
+        max_clients : int, optional
+            Browsers to track open interactions of, by default 1024
+        """
+        self.window_s = window_s
+        self.max_clients = max_clients
+        self.callback_counts = defaultdict(int)
+        self.callback_ms = defaultdict(float)
+        self.interactions = defaultdict(
+            lambda: {"count": 0, "callbacks": 0, "server_ms": 0.0}
+        )
+        self.num_interactions = 0
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def record(self, client, output, changed_props, chained, duration_ms, now=None):
+        """Record one callback request.
+
+        Parameters
+        ----------
+        client : str
+            Identifier of the browser making the request.
+        output : str
+            Output id of the callback.
+        changed_props : list
+            Keys of the inputs that changed, see `prop_key`.
+        chained : bool
+            True if the changed inputs are outputs of other callbacks.
+        duration_ms : float
+            Time the server took to handle the request.
+        now : float, optional
+            Time of the request in seconds, by default time.monotonic()
+        """
+        now = time.monotonic() if now is None else now
+        if len(changed_props) == 0:
+            root = PAGE_LOAD
+        else:
+            root = ",".join(sorted(set(changed_props)))
+
+        with self._lock:
+            self.callback_counts[output] += 1
+            self.callback_ms[output] += duration_ms
+
+            interaction = self._open.get(client)
+            # callbacks fired by the same change arrive together, chained ones
+            # follow the responses of the callbacks they depend on
+            joins = (
+                interaction is not None
+                and now - interaction["last"] <= self.window_s
+                and (chained or interaction["root"] == root)
+            )
+            if not joins:
+                if interaction is not None:
+                    self._finish(interaction)
+                interaction = {"root": root, "callbacks": 0, "server_ms": 0.0}
+                self._open[client] = interaction
+            interaction["callbacks"] += 1
+            interaction["server_ms"] += duration_ms
+            interaction["last"] = now
+
+            if len(self._open) > self.max_clients:
+                self._finish_idle(now)
+
+    def _finish(self, interaction):
+        """Add a completed interaction to the totals of its root."""
+        totals = self.interactions[interaction["root"]]
+        totals["count"] += 1
+        totals["callbacks"] += interaction["callbacks"]
+        totals["server_ms"] += interaction["server_ms"]
+        self.num_interactions += 1
+        logger.debug(
+            f"interaction {interaction['root']}: {interaction['callbacks']} callbacks, "
+            f"{interaction['server_ms']:.0f} ms server time"
+        )
+        if self.num_interactions % CALLBACK_METRICS_LOG_EVERY == 0:
+            logger.info(f"callbacks per interaction: {self._summary()}")
+
+    def _finish_idle(self, now):
+        """Finish the interactions that can't be joined anymore."""
+        for client, interaction in list(self._open.items()):
+            if now - interaction["last"] > self.window_s:
+                self._finish(interaction)
+                del self._open[client]
+
+    def flush(self):
+        """Finish every open interaction, e.g. before reading the summary."""
+        with self._lock:
+            for interaction in self._open.values():
+                self._finish(interaction)
+            self._open.clear()
+
+    def _summary(self):
+        return {
+            root: {
+                "interactions": totals["count"],
+                "callbacks_per_interaction": totals["callbacks"] / totals["count"],
+                "server_ms_per_interaction": totals["server_ms"] / totals["count"],
+            }
+            for root, totals in self.interactions.items()
+        }
+
+    def summary(self):
+        """Average callbacks and server time of the finished interactions.
+
+        Returns
+        -------
+        dict
+            By the inputs that started the interactions, the number of
+            `interactions`, `callbacks_per_interaction` (= server round trips)
+            and `server_ms_per_interaction`.
+        """
+        with self._lock:
+            return self._summary()
+
+
+callback_metrics = CallbackMetrics()
+
+
+def _callback_outputs(dash_app):
+    """Keys of every callback output of an app, see `prop_key`."""
+    outputs = set()
+    for output in dash_app.callback_map:
+        # multi output callbacks are keyed "..id.prop...id.prop..", single
+        # output ones "id.prop", pattern matching ids are JSON that may contain
+        # dots so the property is after the last one
+        if output.startswith(".."):
+            dependencies = output[2:-2].split("...")
+        else:
+            dependencies = [output]
+        for dependency in dependencies:
+            component_id, prop = dependency.rsplit(".", 1)
+            # outputs allowing duplicates have a hash appended to their property
+            outputs.add(prop_key(component_id, prop.split("@")[0]))
+    return outputs
+
+
+def install_callback_metrics(dash_app, metrics=callback_metrics):
+    """Record the callback requests of a Dash app in `metrics`.
+
+    Parameters
+    ----------
+    dash_app : dash.Dash
+        App whose server to instrument.
+    metrics : CallbackMetrics, optional
+        Where to record the requests, by default the module's callback_metrics
+    """
+    server = dash_app.server
+    # the callback map is filled in when the app serves its first request
+    outputs = set()
+
+    @server.before_request
+    def start_callback_timer():
+        if flask.request.path.endswith(DASH_UPDATE_PATH):
+            flask.g.callback_start_time = time.perf_counter()
+
+    @server.after_request
+    def record_callback(response):
+        start_time = flask.g.pop("callback_start_time", None)
+        if start_time is None:
+            return response
+        try:
+            body = flask.request.get_json(silent=True) or {}
+            changed_props = [
+                prop_key(*prop_id.rsplit(".", 1))
+                for prop_id in body.get("changedPropIds", [])
+            ]
+            if len(outputs) == 0:
+                outputs.update(_callback_outputs(dash_app))
+            client = flask.request.headers.get(
+                "X-Forwarded-For", str(flask.request.remote_addr)
+            )
+            metrics.record(
+                client=client + flask.request.headers.get("User-Agent", ""),
+                output=body.get("output", ""),
+                changed_props=changed_props,
+                chained=all(prop in outputs for prop in changed_props),
+                duration_ms=(time.perf_counter() - start_time) * 1000,
+            )
+        except Exception as e:
+            logger.error(f"Failed to record callback metrics: {e}")
+        return response
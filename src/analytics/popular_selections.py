@@ -0,0 +1,225 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import os
+import json
+import fcntl
+import tempfile
+import atexit
+import threading
+import time
+from collections import Counter
+
+from dotenv import load_dotenv, find_dotenv
+
+from src.logs import get_logger
+
+logger = get_logger(__name__)
+
+load_dotenv(find_dotenv())
+
+# number of selections to pre-warm when a worker boots or the data changes, 0 disables
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", 10))
+# selections always pre-warmed, a JSON list of model lists e.g. '[["camry", "civic"]]'
+PREWARM_SELECTIONS = os.getenv("PREWARM_SELECTIONS", "[]")
+POPULAR_SELECTIONS_FILE = os.getenv(
+    "POPULAR_SELECTIONS_FILE",
+    os.path.join(tempfile.gettempdir(), "fortunato-wheels", "popular-selections.json"),
+)
+# seconds between writes of the selections a worker counted to the shared file
+POPULAR_SELECTIONS_FLUSH_S = float(os.getenv("POPULAR_SELECTIONS_FLUSH_S", 60))
+# distinct selections counted, the least clicked are dropped past this
+MAX_TRACKED_SELECTIONS = 1000
+# default state of the explore sidebar filters
+DEFAULT_AGE_RANGE = [0, 15]
+
+
+def selection(models, age_range=None, bounds=None, facets=None):
+    """Normalized explore filter state.
+
+    Parameters
+    ----------
+    models : list
+        Selected models, empty for the default models.
+    age_range : list, optional
+        Inclusive [min, max] age, by default DEFAULT_AGE_RANGE
+    bounds : list, optional
+        Price range from explore_ads.price_bounds, by default None
+    facets : dict, optional
+        Selected values by facet, by default None
+
+    Returns
+    -------
+    dict
+        `models`, `age_range`, `bounds` and `facets` with lists sorted so equal
+        states compare equal.
+    """
+    return {
+        "models": sorted({model.lower().replace(" ", "-") for model in models}),
+        "age_range": [int(age) for age in (age_range or DEFAULT_AGE_RANGE)],
+        "bounds": None if bounds is None else [b if b is None else float(b) for b in bounds],
+        "facets": {
+            facet: sorted(values)
+            for facet, values in sorted((facets or {}).items())
+            if values
+        },
+    }
+
+
+class PopularSelections:
+    def __init__(self, file_path=POPULAR_SELECTIONS_FILE, configured=PREWARM_SELECTIONS):
+        """Counts of the explore selections users apply, shared by the workers on a
+        machine through a JSON file, plus configured selections to always warm.
+
+        Selections are counted in memory and merged into the file by `flush`, so
+        applying one doesn't take the file lock.
+
+        Parameters
+        ----------
+        file_path : str, optional
+            File to keep the counts in, by default POPULAR_SELECTIONS_FILE
+        configured : str or list, optional
+            Model lists (JSON or parsed) ranked ahead of the counted selections,
+            by default PREWARM_SELECTIONS
+        """
+        self.file_path = file_path
+        if isinstance(configured, str):
+            try:
+                configured = json.loads(configured)
+            except json.JSONDecodeError as e:
+                logger.error(f"Invalid PREWARM_SELECTIONS, ignoring them: {e}")
+                configured = []
+        self.configured = [selection(models) for models in configured]
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._pending_lock = threading.Lock()
+        self._flushing = False
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+
+    def _update(self, update_fn):
+        """Read, modify and write the counts under a file lock."""
+        with self._lock:
+            with open(self.file_path + ".lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    counts = self._read()
+                    update_fn(counts)
+                    fd, tmp_path = tempfile.mkstemp(
+                        dir=os.path.dirname(self.file_path) or ".", suffix=".tmp"
+                    )
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(counts, f)
+                    os.replace(tmp_path, self.file_path)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.file_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def record(self, state):
+        """Count one application of a selection, written to the file by `flush`.
+
+        Parameters
+        ----------
+        state : dict
+            Selection from `selection`.
+        """
+        key = json.dumps(state, sort_keys=True)
+        with self._pending_lock:
+            self._pending[key] += 1
+            if len(self._pending) > MAX_TRACKED_SELECTIONS:
+                del self._pending[min(self._pending, key=self._pending.get)]
+
+    def flush(self):
+        """Add the selections counted since the last flush to the shared file."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return
+
+        def merge(counts):
+            for key, count in pending.items():
+                counts[key] = counts.get(key, 0) + count
+            for key in sorted(counts, key=counts.get)[:-MAX_TRACKED_SELECTIONS]:
+                del counts[key]
+
+        try:
+            self._update(merge)
+        except OSError as e:
+            logger.warning(f"Failed to record explore selections: {e}")
+
+    def start_flusher(self, interval_s=POPULAR_SELECTIONS_FLUSH_S):
+        """Start a background thread flushing the counts, and flush at exit.
+
+        Parameters
+        ----------
+        interval_s : float, optional
+            Seconds between flushes, by default POPULAR_SELECTIONS_FLUSH_S. Only
+            flushes at exit if 0 or less.
+        """
+        if self._flushing:
+            return
+        self._flushing = True
+        atexit.register(self.flush)
+        if interval_s <= 0:
+            return
+
+        def flush_periodically():
+            while True:
+                time.sleep(interval_s)
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Failed to flush explore selections: {e}")
+
+        threading.Thread(
+            target=flush_periodically, name="popular-selections-flusher", daemon=True
+        ).start()
+
+    def top(self, n=PREWARM_TOP_N):
+        """Most popular selections, the default view and configured ones first.
+
+        Parameters
+        ----------
+        n : int, optional
+            Number of selections, by default PREWARM_TOP_N
+
+        Returns
+        -------
+        list
+            Up to `n` selections from `selection`.
+        """
+        counts = self._read()
+        counted = [
+            json.loads(key)
+            for key, _ in sorted(counts.items(), key=lambda item: -item[1])
+        ]
+        top = []
+        for state in [selection([])] + self.configured + counted:
+            if state not in top:
+                top.append(state)
+        return top[:n]
+
+
+_popular_selections = None
+_popular_selections_lock = threading.Lock()
+
+
+def get_popular_selections():
+    """Shared PopularSelections for the process.
+
+    Returns
+    -------
+    PopularSelections
+        The selection counts.
+    """
+    global _popular_selections
+
+    with _popular_selections_lock:
+        if _popular_selections is None:
+            _popular_selections = PopularSelections()
+        return _popular_selections
@@ -22,12 +22,66 @@ if SRC_PATH not in sys.path:
     sys.path.append(SRC_PATH)
 
 from src.logs import get_logger
-from src.data.azure_blob_storage import AzureBlob
+from src.data.summary_cache import summary_cache, store_payload
 from src.analytics.google_analytics import custom_event_to_GA
+from src.analytics.callback_metrics import install_callback_metrics
+from src.analytics.popular_selections import PREWARM_TOP_N, get_popular_selections
 
 # Create a custom logger
 logger = get_logger(__name__)
 
+# GA event reporting the time taken to load each summary
+SUMMARY_LOAD_EVENTS = {
+    "price_summary": "price_data_load_time",
+    "mileage_summary": "mileage_data_load_time",
+    "num_ads_summary": "num_ads_data_load_time",
+    "makes_models": "makes_models_data_load_time",
+}
+_load_times_reported = False
+
+
+def report_load_times(snapshot):
+    """Send GA the summary load times of the first snapshot this worker loads,
+    whether a session or the boot load in the background loaded it."""
+    global _load_times_reported
+    if _load_times_reported:
+        return
+    _load_times_reported = True
+
+    # placeholder until proper gtag id's can be extracted
+    client_id = str(time.time_ns())
+    for name, event_name in SUMMARY_LOAD_EVENTS.items():
+        if name in snapshot.load_times_ms:
+            custom_event_to_GA(
+                client_id,
+                event_name,
+                {"time_ms": snapshot.load_times_ms[name]},
+            )
+    # summaries are fetched concurrently so the total is the slowest
+    # fetch rather than the sum of the times above
+    custom_event_to_GA(
+        client_id,
+        "summary_data_load_wall_time",
+        {"time_ms": snapshot.load_wall_time_ms},
+    )
+
+
+summary_cache.add_listener(report_load_times)
+
+
+def start_background_tasks():
+    """Start this worker's background threads, from gunicorn's post_fork hook (see
+    gunicorn.conf.py) or when run directly, rather than whenever the app is
+    imported."""
+    # pick up new summary data in the background without restarting workers
+    summary_cache.start_refresher()
+    # write the explore selections this worker counted to the file shared by workers
+    get_popular_selections().start_flusher()
+    # load the data when the worker boots, the explore page pre-warms its popular
+    # selections once it's loaded
+    if PREWARM_TOP_N > 0:
+        summary_cache.start_background_load()
+
 external_stylesheets = [
     dbc.themes.BOOTSTRAP,
     "https://fonts.google.com/specimen/Poppins",
@@ -55,6 +109,8 @@ logo = html.Img(
 )
 
 server = app.server
+# count the callbacks and round trips each user interaction triggers
+install_callback_metrics(app)
 
 nav_buttons = dbc.Row(
     [
@@ -238,6 +294,7 @@ app.layout = html.Div(
         dcc.Store(id="num-ads-summary-store", storage_type="session"),
         dcc.Store(id="mileage-summary-store", storage_type="session"),
         dcc.Store(id="makes-models-store", storage_type="session"),
+        dcc.Store(id="summary-version-store", storage_type="session"),
         html.Div(
             className="div-app",
             id="div-app",
@@ -303,6 +360,7 @@ def toggle_navbar_collapse(n, is_open):
     Output("num-ads-summary-store", "data"),
     Output("mileage-summary-store", "data"),
     Output("makes-models-store", "data"),
+    Output("summary-version-store", "data"),
     Input("first-load", "children"),
     [
         State("price-summary-store", "data"),
@@ -313,63 +371,29 @@ def toggle_navbar_collapse(n, is_open):
 def load_data(first_load, price_summary, num_ads_summary, mileage_summary):
     # if any summary is None, then we need to load data
     if not price_summary or not num_ads_summary or not mileage_summary:
-        azure_blob = AzureBlob()
-
-        # placeholder until proper gtag id's can be extracted
-        client_id = str(time.time_ns())
-
         start_time = time.time()
-        ad_price_summary = azure_blob.load_parquet(
-            "processed/avg_price_summary.parquet"
-        ).to_dict()
-        custom_event_to_GA(
-            client_id,
-            "price_data_load_time",
-            {"time_ms": round((time.time() - start_time) * 1000, 0)},
-        )
-        logger
-
-        start_time = time.time()
-        mileage_summary = azure_blob.load_parquet(
-            "processed/mileage_distribution_summary.parquet"
-        ).to_dict()
-        custom_event_to_GA(
-            client_id,
-            "mileage_data_load_time",
-            {"time_ms": round((time.time() - start_time) * 1000, 0)},
-        )
-
-        start_time = time.time()
-        num_ads_summary = azure_blob.load_parquet(
-            "processed/num_ads_summary.parquet"
-        ).to_dict()
-        custom_event_to_GA(
-            client_id,
-            "num_ads_data_load_time",
-            {"time_ms": round((time.time() - start_time) * 1000, 0)},
-        )
-
-        start_time = time.time()
-        makes_models = azure_blob.load_parquet(
-            "processed/makes_models.parquet"
-        ).to_dict()
-        custom_event_to_GA(
-            client_id,
-            "makes_models_data_load_time",
-            {"time_ms": round((time.time() - start_time) * 1000, 0)},
-        )
+        # summaries are only downloaded once per worker, after that every session
+        # is served from the process wide cache, see report_load_times
+        snapshot = summary_cache.snapshot()
 
         logger.debug(
-            f"Loaded data from Azure Blob Storage in {time.time() - start_time} seconds"
+            f"Loaded summary data version {snapshot.version} in {time.time() - start_time} seconds"
         )
 
         custom_event_to_GA(time.time_ns(), "summary_data_load_time", {})
 
-        return ad_price_summary, num_ads_summary, mileage_summary, makes_models
+        return (
+            store_payload(snapshot, "price_summary"),
+            store_payload(snapshot, "num_ads_summary"),
+            store_payload(snapshot, "mileage_summary"),
+            store_payload(snapshot, "makes_models"),
+            snapshot.version,
+        )
     else:
         logger.debug("Data already loaded, skipping")
         raise dash.exceptions.PreventUpdate
 
 
 if __name__ == "__main__":
+    start_background_tasks()
     app.run_server(debug=False, port=8050, host="0.0.0.0")
@@ -0,0 +1,455 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import numpy as np
+import pandas as pd
+
+from src.data.compact_summaries import LongSummary
+
+# ages are stored per ad as int8 so fit below this, used to combine the group and
+# age of each ad into one sorted key
+_AGE_STRIDE = 128
+CATEGORICAL_COLUMNS = ["condition", "fuel", "transmission"]
+NUMERIC_COLUMNS = ["price", "odometer_km", "cylinders"]
+# columns stored dictionary encoded
+TEXT_COLUMNS = ["make", "model"] + CATEGORICAL_COLUMNS
+
+
+def sorted_categorical(values, categories=None):
+    """Dictionary encode a column with its categories in sorted order.
+
+    Parameters
+    ----------
+    values : pd.Series
+        Column to encode, plain or categorical.
+    categories : list, optional
+        Categories to encode with, e.g. the union of several batches, by default
+        None uses the values present.
+
+    Returns
+    -------
+    pd.Categorical
+        The encoded column, missing values have code -1.
+    """
+    values = pd.Series(values)
+    if categories is None:
+        categories = values.dropna().unique()
+    categories = np.sort(np.asarray(categories, dtype=object))
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # recodes without turning every value into a string
+        return values.cat.set_categories(categories).array
+    return pd.Categorical(values, categories=categories)
+
+
+def merge_ad_frames(frames):
+    """Merge ad frames that are each sorted by make, model and age, e.g. a full
+    build and the batches appended since, into one sorted frame.
+
+    Parameters
+    ----------
+    frames : list
+        Frames from build_summaries.ad_store_frame.
+
+    Returns
+    -------
+    pd.DataFrame
+        Ads of every frame sorted the same way, text columns encoded with the
+        categories of all of them.
+    """
+    if len(frames) == 1:
+        return frames[0]
+
+    categories = {
+        column: pd.unique(
+            np.concatenate(
+                [np.asarray(frame[column].dropna().unique()) for frame in frames]
+            )
+        )
+        for column in TEXT_COLUMNS
+    }
+    df = pd.concat(
+        [
+            frame.assign(
+                **{
+                    column: sorted_categorical(frame[column], categories[column])
+                    for column in TEXT_COLUMNS
+                }
+            )
+            for frame in frames
+        ],
+        ignore_index=True,
+    )
+    keys = (
+        df["make"].cat.codes.to_numpy().astype(np.int64)
+        * len(df["model"].cat.categories)
+        + df["model"].cat.codes.to_numpy()
+    ) * _AGE_STRIDE + df["age"].to_numpy()
+    # each frame is a sorted run so the stable sort only has to merge them
+    order = np.argsort(keys, kind="stable")
+    return df.iloc[order].reset_index(drop=True)
+
+
+def _codes(values):
+    """Integer codes and sorted categories of a column, -1 for missing values.
+
+    Dictionary encoded columns with sorted categories, as written by
+    build_summaries.ad_store_frame, are used as is so their codes stay in the
+    memory map shared by the workers.
+    """
+    if (
+        isinstance(values.dtype, pd.CategoricalDtype)
+        and values.cat.categories.is_monotonic_increasing
+    ):
+        return values.cat.codes.to_numpy(), np.asarray(
+            values.cat.categories, dtype=object
+        )
+    codes, categories = pd.factorize(values, sort=True)
+    return codes.astype(np.int16), np.asarray(categories, dtype=object)
+
+
+def _concat_ranges(starts, stops):
+    """Indexes of the half open ranges [starts[i], stops[i]) one after another."""
+    lengths = np.maximum(stops - starts, 0)
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(
+        lengths.sum()
+    )
+
+
+class AdStore:
+    def __init__(self, ads_df):
+        """Ad level columns held in memory for exact answers under any filter.
+
+        Ads are sorted by (make, model, age) so the ads of each make/model pair
+        are a contiguous group ordered by age. Selecting models or makes finds
+        the group ranges and an age range within them by binary search, other
+        filters are evaluated as vectorized masks over just those rows.
+
+        Parameters
+        ----------
+        ads_df : pd.DataFrame
+            Ads from build_summaries.ad_store_frame with `make`, `model`, `age`,
+            NUMERIC_COLUMNS and CATEGORICAL_COLUMNS.
+        """
+        make_codes, self.makes = _codes(ads_df["make"])
+        model_codes, self.models = _codes(ads_df["model"])
+        makes, models = self.makes, self.models
+        self.model_index = pd.Index(self.models)
+        self.make_index = pd.Index(self.makes)
+
+        ages = ads_df["age"].to_numpy().astype(np.int64)
+        group_keys = make_codes.astype(np.int64) * len(models) + model_codes
+        order = None
+        row_keys = group_keys * _AGE_STRIDE + ages
+        if np.any(row_keys[1:] < row_keys[:-1]):
+            order = np.argsort(row_keys, kind="stable")
+            row_keys = row_keys[order]
+            group_keys = group_keys[order]
+
+        # data written sorted with the compact types of ad_store_frame is used
+        # without copying it out of the shared memory map
+        def column(values, dtype):
+            values = values if order is None else values[order]
+            return values.astype(dtype, copy=False)
+
+        self.ages = column(ads_df["age"].to_numpy(), np.int8)
+        self.mileage = column(ads_df["yearly_mileage_range"].to_numpy(), np.int32)
+        self.numeric = {
+            name: column(ads_df[name].to_numpy(), np.float32)
+            for name in NUMERIC_COLUMNS
+        }
+        self.categorical = {}
+        for name in CATEGORICAL_COLUMNS:
+            codes, categories = _codes(ads_df[name])
+            self.categorical[name] = (column(codes, codes.dtype), categories)
+
+        # one group per make/model pair, `group_offsets[i]:group_offsets[i + 1]`
+        group_starts = np.flatnonzero(np.diff(group_keys, prepend=-1))
+        self.group_offsets = np.append(group_starts, len(group_keys))
+        self.group_makes = (group_keys[group_starts] // len(models)).astype(np.int32)
+        self.group_models = (group_keys[group_starts] % len(models)).astype(np.int32)
+        # group number and age of each ad, sorted so age ranges are a binary search
+        self._row_keys = (
+            np.repeat(
+                np.arange(len(group_starts), dtype=np.int32),
+                np.diff(self.group_offsets),
+            )
+            * _AGE_STRIDE
+            + self.ages
+        )
+
+        # groups of a model are spread over makes so are looked up through an order
+        self._model_group_order = np.argsort(self.group_models, kind="stable")
+        self._model_group_offsets = np.searchsorted(
+            self.group_models[self._model_group_order], np.arange(len(models) + 1)
+        )
+        # groups of a make are contiguous
+        self._make_group_offsets = np.searchsorted(
+            self.group_makes, np.arange(len(makes) + 1)
+        )
+
+    def __len__(self):
+        return len(self.ages)
+
+    @property
+    def nbytes(self):
+        arrays = [self.ages, self.mileage, self._row_keys, self.group_offsets]
+        arrays += list(self.numeric.values())
+        arrays += [codes for codes, _ in self.categorical.values()]
+        return sum(array.nbytes for array in arrays)
+
+    def _groups(self, models=None, makes=None):
+        """Groups of the selected models, else makes, else every group."""
+        if models is not None and len(models) > 0:
+            codes = self.model_index.get_indexer(list(models))
+            codes = codes[codes >= 0]
+            positions = _concat_ranges(
+                self._model_group_offsets[codes], self._model_group_offsets[codes + 1]
+            )
+            return np.sort(self._model_group_order[positions])
+        if makes is not None and len(makes) > 0:
+            codes = self.make_index.get_indexer(list(makes))
+            codes = codes[codes >= 0]
+            return _concat_ranges(
+                self._make_group_offsets[codes], self._make_group_offsets[codes + 1]
+            )
+        return np.arange(len(self.group_offsets) - 1)
+
+    def _mask(self, rows, ranges=None, values=None):
+        """Which of `rows` pass the numeric range and categorical value filters."""
+        mask = np.ones(len(rows), dtype=bool)
+        for name, (low, high) in (ranges or {}).items():
+            column = self.numeric[name][rows]
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+
+        for name, allowed in (values or {}).items():
+            if name in self.categorical:
+                codes, categories = self.categorical[name]
+                # lookup table by code, missing values (-1) pick the last entry
+                lookup = np.zeros(len(categories) + 1, dtype=bool)
+                lookup[:-1] = np.isin(categories, list(allowed))
+                mask &= lookup[codes[rows]]
+            else:
+                mask &= np.isin(self.numeric[name][rows], list(allowed))
+        return mask
+
+    def _ranges(self, models=None, makes=None, age_range=None):
+        """Start and stop rows of the selected models within the age range."""
+        groups = self._groups(models, makes)
+        if age_range is None:
+            return self.group_offsets[groups], self.group_offsets[groups + 1]
+
+        low = max(int(age_range[0]), 0)
+        high = min(int(age_range[1]), _AGE_STRIDE - 1)
+        # same type as the row keys so searchsorted doesn't copy them to compare
+        keys = groups.astype(self._row_keys.dtype) * _AGE_STRIDE
+        starts = np.searchsorted(self._row_keys, keys + low, side="left")
+        stops = np.searchsorted(self._row_keys, keys + high, side="right")
+        return starts, stops
+
+    def select(
+        self, models=None, makes=None, age_range=None, ranges=None, values=None
+    ):
+        """Rows of the ads matching every filter.
+
+        Parameters
+        ----------
+        models : list, optional
+            Model names to include, by default None includes every model.
+        makes : list, optional
+            Make names to include when no models are given, by default None
+        age_range : list, optional
+            Inclusive [min, max] age, by default None includes all ages.
+        ranges : dict, optional
+            Inclusive (min, max) by numeric column, e.g. `{"price": (5000, None)}`,
+            None leaves an end open, by default None
+        values : dict, optional
+            Allowed values by column, e.g. `{"fuel": ["gas", "diesel"]}`, by
+            default None
+
+        Returns
+        -------
+        np.ndarray
+            Indexes of the matching ads.
+        """
+        rows = _concat_ranges(*self._ranges(models, makes, age_range))
+        if ranges or values:
+            rows = rows[self._mask(rows, ranges, values)]
+        return rows
+
+    def count(
+        self, models=None, makes=None, age_range=None, ranges=None, values=None
+    ):
+        """Number of ads matching the filters, see `select` for the parameters.
+
+        Returns
+        -------
+        int
+            Number of matching ads.
+        """
+        if not ranges and not values:
+            # the binary searched ranges alone give the count
+            starts, stops = self._ranges(models, makes, age_range)
+            return int(np.maximum(stops - starts, 0).sum())
+        return len(self.select(models, makes, age_range, ranges, values))
+
+    def mean(self, column, **filters):
+        """Mean of a numeric column over the ads matching the filters.
+
+        Parameters
+        ----------
+        column : str
+            One of NUMERIC_COLUMNS.
+        **filters
+            Filters passed to `select`.
+
+        Returns
+        -------
+        float
+            The mean, nan if no ads match.
+        """
+        return self.describe(column, q=(), **filters)["mean"]
+
+    def quantiles(self, column, q, **filters):
+        """Quantiles of a numeric column over the ads matching the filters.
+
+        Parameters
+        ----------
+        column : str
+            One of NUMERIC_COLUMNS.
+        q : list
+            Quantiles to compute, between 0 and 1.
+        **filters
+            Filters passed to `select`.
+
+        Returns
+        -------
+        np.ndarray
+            One value per quantile, nan if no ads match.
+        """
+        return self.describe(column, q=q, **filters)["quantiles"]
+
+    def describe(self, column, q=(0.25, 0.5, 0.75), **filters):
+        """Count, mean and quantiles of a numeric column in a single pass over
+        the matching ads, missing values are ignored.
+
+        Parameters
+        ----------
+        column : str
+            One of NUMERIC_COLUMNS.
+        q : list, optional
+            Quantiles to compute, by default (0.25, 0.5, 0.75)
+        **filters
+            Filters passed to `select`.
+
+        Returns
+        -------
+        dict
+            `count` of matching ads, `mean` and `quantiles` of the column.
+        """
+        rows = self.select(**filters)
+        values = self.numeric[column][rows]
+        values = values[~np.isnan(values)].astype(np.float64)
+
+        if len(values) == 0:
+            mean, quantiles = np.nan, np.full(len(q), np.nan)
+        else:
+            mean = float(values.mean())
+            quantiles = np.quantile(values, q) if len(q) > 0 else np.array([])
+        return {"count": len(rows), "mean": mean, "quantiles": quantiles}
+
+    def row_models(self, rows):
+        """Model code of each row, indexes into `models`."""
+        groups = np.searchsorted(self.group_offsets, rows, side="right") - 1
+        return self.group_models[groups]
+
+    def model_counts(self, rows, summaries, model_codes):
+        """Number of the rows belonging to each model.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            Rows to count, e.g. from `select`.
+        summaries : CompactSummaries
+            Summaries whose model codes to count by.
+        model_codes : np.ndarray
+            Codes of the models to return counts of.
+
+        Returns
+        -------
+        np.ndarray
+            Number of rows per model, in the order of `model_codes`.
+        """
+        codes = summaries.model_index.get_indexer(self.models)[self.row_models(rows)]
+        counts = np.bincount(codes[codes >= 0], minlength=len(summaries.models))
+        return counts[np.asarray(model_codes, dtype=np.int64)]
+
+    def summarize(self, rows, summaries, key, statistic):
+        """Summary of some rows by model in the same form as CompactSummaries.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            Rows to summarize, e.g. from `select`.
+        summaries : CompactSummaries
+            Summaries whose model codes the result is coded with, models missing
+            from them are left out.
+        key : str
+            "age" or "yearly_mileage_range", ads without a usable mileage are left
+            out of mileage summaries.
+        statistic : str
+            "mean_price" for the average price, "fraction" for the share of each
+            model's ads in each bin.
+
+        Returns
+        -------
+        LongSummary
+            The summary of the rows.
+        """
+        codes = summaries.model_index.get_indexer(self.models)[self.row_models(rows)]
+        keys = self.ages[rows] if key == "age" else self.mileage[rows]
+        keep = (codes >= 0) & (keys >= 0)
+        codes, keys, rows = codes[keep], keys[keep], rows[keep]
+
+        groups, inverse = np.unique(
+            np.stack([codes, keys.astype(np.int64)]), axis=1, return_inverse=True
+        )
+        inverse = inverse.ravel()
+        counts = np.bincount(inverse, minlength=groups.shape[1])
+        if statistic == "mean_price":
+            values = np.bincount(inverse, weights=self.numeric["price"][rows]) / counts
+        elif statistic == "fraction":
+            model_totals = np.bincount(
+                groups[0], weights=counts, minlength=len(summaries.models)
+            )
+            values = counts / model_totals[groups[0]]
+        else:
+            raise ValueError(f"Unknown statistic {statistic}")
+
+        return LongSummary(
+            groups[0],
+            groups[1].astype(np.int32),
+            values.astype(np.float32),
+            len(summaries.models),
+        )
+
+
+def get_ad_store(snapshot):
+    """Ad store of a snapshot, built once per data version.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot holding an `ads` frame.
+
+    Returns
+    -------
+    AdStore or None
+        The store, None if the snapshot has no ad level data, e.g. data built
+        before it was added or snapshots decoded from session stores.
+    """
+    if "ads" not in snapshot.frames:
+        return None
+    return snapshot.derived("ad_store", lambda s: AdStore(s["ads"]))
@@ -0,0 +1,302 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import numpy as np
+import pandas as pd
+
+from src.data.compact_summaries import LongSummary, get_compact_summaries
+
+# width of the price bins in $, matches the step of the explore price slider so
+# slider ranges line up with whole bins
+PRICE_BIN_SIZE = 500
+# prices above the last bin are counted in it
+NUM_PRICE_BINS = 200
+CUBE_COLUMNS = [
+    "model",
+    "age",
+    "price_bin",
+    "yearly_mileage_range",
+    "num_ads",
+    "price_sum",
+]
+
+
+def price_bins(prices):
+    """Bin of each price, prices of PRICE_BIN_SIZE * NUM_PRICE_BINS or more share
+    the last bin.
+
+    Parameters
+    ----------
+    prices : np.ndarray
+        Ad prices in $.
+
+    Returns
+    -------
+    np.ndarray
+        Price bin of each ad.
+    """
+    bins = np.floor_divide(np.asarray(prices, dtype=np.float64), PRICE_BIN_SIZE)
+    return np.clip(bins, 0, NUM_PRICE_BINS).astype(np.int16)
+
+
+def _aggregate_cube(models, ages, bins, mileage, num_ads, price_sums):
+    """Sum rows with the same (model, age, price bin, mileage) and sort by them."""
+    df = pd.DataFrame(
+        {
+            "model": models,
+            "age": ages,
+            "price_bin": bins,
+            "yearly_mileage_range": mileage,
+            "num_ads": num_ads,
+            "price_sum": price_sums,
+        }
+    )
+    cube_df = (
+        df.groupby(CUBE_COLUMNS[:4], sort=True, observed=True)[["num_ads", "price_sum"]]
+        .sum()
+        .reset_index()
+    )
+    return cube_df.astype(
+        {
+            "model": str,
+            "age": np.int8,
+            "price_bin": np.int16,
+            "yearly_mileage_range": np.int32,
+            "num_ads": np.int32,
+            "price_sum": np.float64,
+        }
+    )
+
+
+def build_ads_cube(prepared_df, mileage_bin_km):
+    """Count and sum the prices of ads by model, age, price bin and yearly mileage.
+
+    Only combinations with ads are stored so the cube stays smaller than the ads.
+
+    Parameters
+    ----------
+    prepared_df : pd.DataFrame
+        Output of build_summaries.prepare_ads.
+    mileage_bin_km : int
+        Width of the yearly mileage bins the `mileage_bin` column was made with.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per combination with CUBE_COLUMNS, `yearly_mileage_range` is -1
+        for ads without a usable odometer reading.
+    """
+    mileage_bins = prepared_df["mileage_bin"].to_numpy()
+    return _aggregate_cube(
+        prepared_df["model"].to_numpy(),
+        prepared_df["age"].to_numpy(),
+        price_bins(prepared_df["price"].to_numpy()),
+        np.where(mileage_bins >= 0, mileage_bins * mileage_bin_km, -1),
+        np.ones(len(prepared_df), dtype=np.int64),
+        prepared_df["price"].to_numpy(dtype=np.float64),
+    )
+
+
+def merge_ads_cubes(cube_df, other_df):
+    """Add the counts of two cubes, e.g. the existing one and a new batch.
+
+    Parameters
+    ----------
+    cube_df, other_df : pd.DataFrame
+        Cubes from build_ads_cube.
+
+    Returns
+    -------
+    pd.DataFrame
+        Cube covering the ads of both.
+    """
+    both = pd.concat([cube_df, other_df], ignore_index=True)
+    return _aggregate_cube(*(both[column].to_numpy() for column in CUBE_COLUMNS))
+
+
+class AdsCube:
+    def __init__(self, cube_df, summaries):
+        """Sparse model x age x price bin x mileage cube for exact counts and
+        average prices under any combination of model, age and price filters.
+
+        Rows are sorted by model code so the rows of model `i` are
+        `offsets[i]:offsets[i + 1]`, same as LongSummary.
+
+        Parameters
+        ----------
+        cube_df : pd.DataFrame
+            Cube from build_ads_cube.
+        summaries : CompactSummaries
+            Summaries whose model codes the cube is coded with, models not in them
+            are dropped.
+        """
+        self.summaries = summaries
+        num_models = len(summaries.models)
+
+        model_codes = summaries.model_index.get_indexer(cube_df["model"].to_numpy())
+        keep = model_codes >= 0
+        model_codes = model_codes[keep]
+        ages = cube_df["age"].to_numpy()[keep]
+        order = np.lexsort((ages, model_codes))
+
+        self.model_codes = model_codes[order].astype(np.int32)
+        self.ages = ages[order].astype(np.int8)
+        self.price_bins = cube_df["price_bin"].to_numpy()[keep][order].astype(np.int16)
+        self.mileage = (
+            cube_df["yearly_mileage_range"].to_numpy()[keep][order].astype(np.int32)
+        )
+        self.num_ads = cube_df["num_ads"].to_numpy()[keep][order].astype(np.int32)
+        self.price_sums = cube_df["price_sum"].to_numpy()[keep][order]
+        self.offsets = np.searchsorted(self.model_codes, np.arange(num_models + 1))
+
+    @property
+    def nbytes(self):
+        return sum(
+            array.nbytes
+            for array in (
+                self.model_codes,
+                self.ages,
+                self.price_bins,
+                self.mileage,
+                self.num_ads,
+                self.price_sums,
+                self.offsets,
+            )
+        )
+
+    def _rows(self, model_codes, age_range=None, price_range=None):
+        """Indexes of the rows of some models within the age and price ranges."""
+        model_codes = np.asarray(model_codes, dtype=np.int64)
+        starts = self.offsets[model_codes]
+        lengths = self.offsets[model_codes + 1] - starts
+        # concatenated aranges of each model's slice
+        rows = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(
+            lengths.sum()
+        )
+
+        keep = np.ones(len(rows), dtype=bool)
+        if age_range is not None:
+            ages = self.ages[rows]
+            keep &= (ages >= age_range[0]) & (ages <= age_range[1])
+        if price_range is not None:
+            bins = self.price_bins[rows]
+            if price_range[0] is not None:
+                keep &= bins >= price_bins([price_range[0]])[0]
+            if price_range[1] is not None:
+                keep &= bins <= price_bins([price_range[1]])[0]
+        return rows[keep]
+
+    def model_counts(self, model_codes, age_range=None, price_range=None):
+        """Number of ads of each model within the age and price ranges.
+
+        Parameters
+        ----------
+        model_codes : np.ndarray
+            Codes of the models to count.
+        age_range : list, optional
+            Inclusive [min, max] ages, by default None includes all ages.
+        price_range : list, optional
+            Inclusive [min, max] prices in $, matched at PRICE_BIN_SIZE resolution,
+            either end can be None to leave it open, by default None
+
+        Returns
+        -------
+        np.ndarray
+            Number of ads per model, in the order of `model_codes`.
+        """
+        rows = self._rows(model_codes, age_range, price_range)
+        counts = np.bincount(
+            self.model_codes[rows],
+            weights=self.num_ads[rows],
+            minlength=len(self.offsets) - 1,
+        ).astype(np.int64)
+        return counts[np.asarray(model_codes, dtype=np.int64)]
+
+    def _group(self, rows, keys):
+        """Sum the counts and prices of rows by (model code, key)."""
+        groups, inverse = np.unique(
+            np.stack([self.model_codes[rows], keys]), axis=1, return_inverse=True
+        )
+        inverse = inverse.ravel()
+        num_ads = np.bincount(inverse, weights=self.num_ads[rows])
+        price_sums = np.bincount(inverse, weights=self.price_sums[rows])
+        return groups[0], groups[1], num_ads, price_sums
+
+    def price_summary(self, model_codes, age_range=None, price_range=None):
+        """Average price by model and age of the ads within the ranges.
+
+        Parameters
+        ----------
+        model_codes : np.ndarray
+            Codes of the models to include.
+        age_range : list, optional
+            Inclusive [min, max] ages, by default None includes all ages.
+        price_range : list, optional
+            Inclusive [min, max] prices in $, see `model_counts`, by default None
+
+        Returns
+        -------
+        LongSummary
+            Average price with the age as the key.
+        """
+        rows = self._rows(model_codes, age_range, price_range)
+        codes, ages, num_ads, price_sums = self._group(rows, self.ages[rows])
+        return LongSummary(
+            codes,
+            ages.astype(np.int16),
+            (price_sums / num_ads).astype(np.float32),
+            len(self.offsets) - 1,
+        )
+
+    def mileage_summary(self, model_codes, age_range=None, price_range=None):
+        """Fraction of each model's ads by yearly mileage within the ranges, ads
+        without a usable odometer reading are left out.
+
+        Parameters
+        ----------
+        model_codes : np.ndarray
+            Codes of the models to include.
+        age_range : list, optional
+            Inclusive [min, max] ages, by default None includes all ages.
+        price_range : list, optional
+            Inclusive [min, max] prices in $, see `model_counts`, by default None
+
+        Returns
+        -------
+        LongSummary
+            Fraction of vehicles with the yearly mileage range as the key.
+        """
+        rows = self._rows(model_codes, age_range, price_range)
+        rows = rows[self.mileage[rows] >= 0]
+        codes, mileage, num_ads, _ = self._group(rows, self.mileage[rows])
+
+        num_models = len(self.offsets) - 1
+        model_totals = np.bincount(codes, weights=num_ads, minlength=num_models)
+        return LongSummary(
+            codes,
+            mileage.astype(np.int32),
+            (num_ads / model_totals[codes]).astype(np.float32),
+            num_models,
+        )
+
+
+def get_ads_cube(snapshot):
+    """Ads cube of a snapshot, built once per data version.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot holding an `ads_cube` frame.
+
+    Returns
+    -------
+    AdsCube or None
+        The cube, None if the snapshot has no cube, e.g. data built before it
+        was added or snapshots decoded from session stores.
+    """
+    if "ads_cube" not in snapshot.frames:
+        return None
+    return snapshot.derived(
+        "ads_cube",
+        lambda s: AdsCube(s["ads_cube"], get_compact_summaries(s)),
+    )
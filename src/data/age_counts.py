@@ -0,0 +1,127 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import numpy as np
+
+from src.data.compact_summaries import get_compact_summaries
+
+
+class CumulativeAgeCounts:
+    def __init__(self, num_ads):
+        """Number of ads of each model summed over age, so the count of any age range
+        is two lookups per model.
+
+        Row `i` holds the running total of model `i` over the ages
+        `min_age..max_age`, with a leading 0 so the ads aged [low, high] are
+        `cumulative[i, high - min_age + 1] - cumulative[i, low - min_age]`.
+
+        Parameters
+        ----------
+        num_ads : LongSummary
+            Number of ads by model and age.
+        """
+        num_models = len(num_ads.offsets) - 1
+        if len(num_ads.keys) > 0:
+            self.min_age = int(num_ads.keys.min())
+            self.max_age = int(num_ads.keys.max())
+        else:
+            self.min_age, self.max_age = 0, -1
+
+        counts = np.zeros((num_models, self.max_age - self.min_age + 1), dtype=np.int64)
+        np.add.at(
+            counts, (num_ads.model_codes, num_ads.keys - self.min_age), num_ads.values
+        )
+        self.cumulative = np.zeros((num_models, counts.shape[1] + 1), dtype=np.int64)
+        np.cumsum(counts, axis=1, out=self.cumulative[:, 1:])
+
+        self.model_totals = self.cumulative[:, -1]
+        self.total = int(self.model_totals.sum())
+
+    @property
+    def nbytes(self):
+        return self.cumulative.nbytes
+
+    def counts(self, model_codes=None, age_range=None):
+        """Number of ads of each model within an age range.
+
+        Parameters
+        ----------
+        model_codes : np.ndarray, optional
+            Codes of the models to count, by default None counts every model.
+        age_range : list, optional
+            Inclusive [min, max] ages, by default None includes all ages.
+
+        Returns
+        -------
+        np.ndarray
+            Number of ads per model, in the order of `model_codes`.
+        """
+        if model_codes is None:
+            rows = self.cumulative
+        else:
+            rows = self.cumulative[np.asarray(model_codes, dtype=np.int64)]
+
+        if age_range is None:
+            return rows[:, -1]
+
+        # ages outside the summaries clip to the ends of the running totals
+        num_ages = self.cumulative.shape[1] - 1
+        low = int(np.clip(age_range[0] - self.min_age, 0, num_ages))
+        high = int(np.clip(age_range[1] - self.min_age + 1, 0, num_ages))
+        if high <= low:
+            return np.zeros(len(rows), dtype=np.int64)
+        return rows[:, high] - rows[:, low]
+
+    def count(self, model_codes=None, age_range=None):
+        """Total number of ads of some models within an age range.
+
+        Parameters
+        ----------
+        model_codes : np.ndarray, optional
+            Codes of the models to count, by default None counts every model.
+        age_range : list, optional
+            Inclusive [min, max] ages, by default None includes all ages.
+
+        Returns
+        -------
+        int
+            Number of ads.
+        """
+        if model_codes is None and age_range is None:
+            return self.total
+        return int(self.counts(model_codes, age_range).sum())
+
+
+def get_age_counts(snapshot):
+    """Cumulative age counts of a snapshot, built once per data version.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to count the ads of.
+
+    Returns
+    -------
+    CumulativeAgeCounts
+        The count table.
+    """
+    return snapshot.derived(
+        "age_counts",
+        lambda s: CumulativeAgeCounts(get_compact_summaries(s).num_ads),
+    )
+
+
+def get_total_ads(snapshot):
+    """Total number of ads in a snapshot, computed once per data version.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to count the ads of.
+
+    Returns
+    -------
+    int
+        Number of ads.
+    """
+    return snapshot.derived("total_ads", lambda s: get_age_counts(s).total)
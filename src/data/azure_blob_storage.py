@@ -3,23 +3,310 @@
 
 import os
 import sys
+import json
+import time
+import threading
 
-import pandas as pd
+import pyarrow as pa
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 import pyarrow.parquet as pq
 from azure.storage.blob import BlobServiceClient
-from io import BytesIO
+from io import BytesIO, RawIOBase
+from azure.core import MatchConditions
+from azure.core.pipeline.transport import RequestsTransport
+from azure.core.exceptions import (
+    HttpResponseError,
+    ResourceNotModifiedError,
+    ServiceRequestError,
+    ServiceResponseError,
+    ClientAuthenticationError,
+)
 from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv, find_dotenv
 
+from src.logs import get_logger
+from src.data.blob_cache import get_blob_disk_cache
+from src.data.storage import StorageBackend
+
+logger = get_logger(__name__)
+
 load_dotenv(find_dotenv())
 
 # Get environment variables
 AZ_DATA_CONTAINER = os.getenv("AZ_BLOB_DATA_CONTAINER")
 AZ_ACCOUNT_URL = os.getenv("AZ_BLOB_ACCOUNT_URL")
+# max keep-alive connections kept open to the storage account
+AZ_BLOB_POOL_SIZE = int(os.getenv("AZ_BLOB_POOL_SIZE", 16))
+# parallel ranged requests used to download a single large blob
+AZ_BLOB_MAX_CONCURRENCY = int(os.getenv("AZ_BLOB_MAX_CONCURRENCY", 4))
+# refresh tokens this long before they expire
+TOKEN_REFRESH_MARGIN_S = 300
+
+
+def _storage_unavailable(error):
+    """Whether an error means blob storage couldn't be reached or failed on its
+    side, in which case a cached copy is better than no data."""
+    if isinstance(
+        error, (ServiceRequestError, ServiceResponseError, ClientAuthenticationError)
+    ):
+        return True
+    return (
+        isinstance(error, HttpResponseError)
+        and error.status_code is not None
+        and error.status_code >= 500
+    )
+
+
+# counters to check the credential and connections are actually reused
+_connection_stats = {
+    "credentials_created": 0,
+    "clients_created": 0,
+    "connections_opened": 0,
+    "token_requests": 0,
+    "token_refreshes": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _increment_stat(name):
+    with _stats_lock:
+        _connection_stats[name] += 1
+
+
+def get_connection_stats():
+    """Counters of how many credentials, clients, connections and tokens have been
+    created by this process.
+
+    Returns
+    -------
+    dict
+        Copy of the counters.
+    """
+    with _stats_lock:
+        return dict(_connection_stats)
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _increment_stat("connections_opened")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _increment_stat("connections_opened")
+        return super()._new_conn()
+
+
+class _CountingPoolManager(PoolManager):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # urllib3 sets the pool classes per manager so subclasses can override them
+        self.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _CountingPoolManager(
+            num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs
+        )
+
+
+class CachedTokenCredential:
+    def __init__(self, credential):
+        """Wraps a credential so tokens are reused until shortly before they expire.
+
+        Parameters
+        ----------
+        credential : azure.core.credentials.TokenCredential
+            Credential to request new tokens from.
+        """
+        self.credential = credential
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes, **kwargs):
+        _increment_stat("token_requests")
+
+        # claims challenges need a fresh token so can't come from the cache
+        if kwargs.get("claims"):
+            _increment_stat("token_refreshes")
+            return self.credential.get_token(*scopes, **kwargs)
+
+        key = (scopes, tuple(sorted(kwargs.items())))
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is None or token.expires_on - time.time() < TOKEN_REFRESH_MARGIN_S:
+                token = self.credential.get_token(*scopes, **kwargs)
+                self._tokens[key] = token
+                _increment_stat("token_refreshes")
+            return token
+
+
+_shared_credential = None
+_blob_service_clients = {}
+_client_lock = threading.Lock()
+
+
+def get_shared_credential():
+    """Credential shared by every AzureBlob in the process so the credential chain
+    is only walked once and tokens are reused.
+
+    Returns
+    -------
+    CachedTokenCredential
+        The shared credential.
+    """
+    global _shared_credential
+
+    with _client_lock:
+        if _shared_credential is None:
+            _shared_credential = CachedTokenCredential(
+                DefaultAzureCredential(exclude_shared_token_cache_credential=True)
+            )
+            _increment_stat("credentials_created")
+        return _shared_credential
+
+
+def get_blob_service_client(account_url):
+    """BlobServiceClient for an account shared by the whole process, requests go
+    through one pool of keep-alive connections.
+
+    Parameters
+    ----------
+    account_url : str
+        URL of the Azure Blob Storage account
+
+    Returns
+    -------
+    BlobServiceClient
+        The shared client.
+    """
+    credential = get_shared_credential()
+
+    with _client_lock:
+        if account_url not in _blob_service_clients:
+            adapter = _CountingHTTPAdapter(
+                pool_connections=AZ_BLOB_POOL_SIZE, pool_maxsize=AZ_BLOB_POOL_SIZE
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            _blob_service_clients[account_url] = BlobServiceClient(
+                account_url,
+                credential=credential,
+                transport=RequestsTransport(session=session, session_owner=False),
+            )
+            _increment_stat("clients_created")
+        return _blob_service_clients[account_url]
+
+
+class BlobRangeReader(RawIOBase):
+    def __init__(self, blob_client):
+        """Seekable read-only file over a blob that downloads only the byte ranges
+        read, lets pyarrow fetch the parquet footer and the column chunks it needs
+        without downloading the whole blob.
+
+        Parameters
+        ----------
+        blob_client : azure.storage.blob.BlobClient
+            Client of the blob to read.
+        """
+        self.blob_client = blob_client
+        self.blob_size = blob_client.get_blob_properties().size
+        self.position = 0
+        self.num_requests = 0
+        self.bytes_downloaded = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=0):
+        if whence == 0:
+            self.position = offset
+        elif whence == 1:
+            self.position += offset
+        else:
+            self.position = self.blob_size + offset
+        return self.position
 
+    def readinto(self, buffer):
+        length = min(len(buffer), self.blob_size - self.position)
+        if length <= 0:
+            return 0
 
-class AzureBlob:
-    def __init__(self, container_name=AZ_DATA_CONTAINER, account_url=AZ_ACCOUNT_URL):
+        data = self.blob_client.download_blob(
+            offset=self.position, length=length
+        ).readall()
+        buffer[: len(data)] = data
+
+        self.position += len(data)
+        self.num_requests += 1
+        self.bytes_downloaded += len(data)
+        return len(data)
+
+
+class ArrowBufferWriter(RawIOBase):
+    def __init__(self, buffer):
+        """Seekable writable file over a pre-sized Arrow buffer, lets the Azure
+        downloader write chunks fetched in parallel straight into place.
+
+        Parameters
+        ----------
+        buffer : pyarrow.Buffer
+            Mutable buffer to write into, e.g. from pyarrow.allocate_buffer.
+        """
+        self.view = memoryview(buffer).cast("B")
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=0):
+        if whence == 0:
+            self.position = offset
+        elif whence == 1:
+            self.position += offset
+        else:
+            self.position = len(self.view) + offset
+        return self.position
+
+    def write(self, data):
+        data = memoryview(data).cast("B")
+        self.view[self.position : self.position + len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+class AzureBlob(StorageBackend):
+    def __init__(
+        self,
+        container_name=AZ_DATA_CONTAINER,
+        account_url=AZ_ACCOUNT_URL,
+        use_disk_cache=True,
+    ):
         """Initialize Azure Blob Storage client and authenticate.
 
         Parameters
@@ -28,6 +315,9 @@ class AzureBlob:
             Name of the container, by default AZ_DATA_CONTAINER
         account_url : str, optional
             URL of the Azure Blob Storage account, by default AZ_ACCOUNT_URL
+        use_disk_cache : bool, optional
+            Keep a local copy of downloaded blobs and only download them again when
+            they've changed, by default True
 
         Returns
         -------
@@ -35,15 +325,12 @@ class AzureBlob:
         """
         self.container_name = container_name
         self.account_url = account_url
-        self.default_credential = DefaultAzureCredential(
-            exclude_shared_token_cache_credential=True
-        )
-        self.blob_service_client = BlobServiceClient(
-            account_url, credential=self.default_credential
-        )
+        self.default_credential = get_shared_credential()
+        self.blob_service_client = get_blob_service_client(account_url)
         self.container_client = self.blob_service_client.get_container_client(
             container=self.container_name
         )
+        self.disk_cache = get_blob_disk_cache() if use_disk_cache else None
 
     def list_blobs(self):
         """List all blobs in the container
@@ -55,13 +342,22 @@ class AzureBlob:
         """
         return self.container_client.list_blobs()
 
-    def load_parquet(self, blob_path):
+    def load_parquet(self, blob_path, columns=None, filters=None):
         """Load a parquet file from Azure Blob Storage
 
+        When `columns` or `filters` are given only the parquet footer, the
+        requested column chunks and the row groups whose statistics can match the
+        filters are downloaded.
+
         Parameters
         ----------
         blob_path : str
             Path to the parquet file in the container
+        columns : list, optional
+            Columns to load, by default None loads all columns
+        filters : list, optional
+            Row filters in the pyarrow.parquet.read_table format, e.g.
+            `[("age", "<=", 10)]`, by default None
 
         Returns
         -------
@@ -73,8 +369,149 @@ class AzureBlob:
         FileNotFoundError
             If the blob_path does not exist in the container
         """
-        downloaded_blob = self.container_client.download_blob(blob_path)
-        bytes_io = BytesIO(downloaded_blob.readall())
-        df = pd.read_parquet(bytes_io)
+        if columns is None and filters is None:
+            buffer = self.download_buffer(blob_path)
+            table = pq.read_table(pa.BufferReader(buffer), use_pandas_metadata=True)
+            return table.to_pandas()
+
+        source = self._cached_copy(blob_path)
+        if source is None:
+            source = BlobRangeReader(
+                self.container_client.get_blob_client(blob_path)
+            )
+
+        table = pq.read_table(
+            source, columns=columns, filters=filters, use_pandas_metadata=True
+        )
+        if isinstance(source, BlobRangeReader):
+            logger.debug(
+                f"Read {columns} of {blob_path} in {source.num_requests} requests, "
+                f"{source.bytes_downloaded} of {source.blob_size} bytes"
+            )
+
+        return table.to_pandas()
+
+    def _cached_copy(self, blob_path):
+        """Cached copy of a blob if it's still current, checked with one metadata
+        request, or if the storage account can't be reached."""
+        if self.disk_cache is None:
+            return None
+
+        cache_key = f"{self.container_name}/{blob_path}"
+        cached = self.disk_cache.get(cache_key)
+        if cached is None:
+            return None
+
+        try:
+            etag = self.container_client.get_blob_client(
+                blob_path
+            ).get_blob_properties().etag
+        except (HttpResponseError, ServiceRequestError, ServiceResponseError) as e:
+            if not _storage_unavailable(e):
+                raise
+            logger.warning(
+                f"Couldn't reach blob storage for {blob_path}, using cached copy: {e}"
+            )
+            etag = cached["etag"]
+
+        if etag != cached["etag"]:
+            return None
+
+        data = self.disk_cache.read(cache_key)
+        return None if data is None else BytesIO(data)
+
+    def load_json(self, blob_path):
+        """Load a JSON file from Azure Blob Storage, e.g. the summary manifest
+
+        Parameters
+        ----------
+        blob_path : str
+            Path to the JSON file in the container
+
+        Returns
+        -------
+        dict
+            Parsed JSON.
+        """
+        return json.loads(self.download_buffer(blob_path).to_pybytes())
+
+    def _read_into_buffer(self, downloaded_blob):
+        """Stream a download straight into a pre-sized Arrow buffer, large blobs
+        are split into ranged chunks downloaded in parallel."""
+        buffer = pa.allocate_buffer(downloaded_blob.size)
+        downloaded_blob.readinto(ArrowBufferWriter(buffer))
+        return buffer
+
+    def download_buffer(self, blob_path):
+        """Download a blob, using the local disk cache when it hasn't changed.
+
+        With a cached copy the download is made conditional on the ETag so an
+        unchanged blob costs a single 304 round trip. If the storage account can't
+        be reached the cached copy is returned instead.
+
+        The blob is written directly into an Arrow buffer that pyarrow can read
+        without another copy.
+
+        Parameters
+        ----------
+        blob_path : str
+            Path to the blob in the container
+
+        Returns
+        -------
+        pyarrow.Buffer
+            Contents of the blob
+        """
+        if self.disk_cache is None:
+            return self._read_into_buffer(
+                self.container_client.download_blob(
+                    blob_path, max_concurrency=AZ_BLOB_MAX_CONCURRENCY
+                )
+            )
+
+        cache_key = f"{self.container_name}/{blob_path}"
+        cached = self.disk_cache.get(cache_key)
+
+        try:
+            if cached is None:
+                downloaded_blob = self.container_client.download_blob(
+                    blob_path, max_concurrency=AZ_BLOB_MAX_CONCURRENCY
+                )
+            else:
+                downloaded_blob = self.container_client.download_blob(
+                    blob_path,
+                    etag=cached["etag"],
+                    match_condition=MatchConditions.IfModified,
+                    max_concurrency=AZ_BLOB_MAX_CONCURRENCY,
+                )
+            data = self._read_into_buffer(downloaded_blob)
+        except ResourceNotModifiedError:
+            cached_data = self.disk_cache.read(cache_key)
+            if cached_data is not None:
+                logger.debug(f"{blob_path} unchanged, using cached copy")
+                return pa.py_buffer(cached_data)
+            # another worker evicted the copy after we checked it
+            logger.debug(f"{blob_path} evicted from the cache, downloading again")
+            downloaded_blob = self.container_client.download_blob(
+                blob_path, max_concurrency=AZ_BLOB_MAX_CONCURRENCY
+            )
+            data = self._read_into_buffer(downloaded_blob)
+        except (HttpResponseError, ServiceRequestError, ServiceResponseError) as e:
+            cached_data = None
+            if cached is not None and _storage_unavailable(e):
+                cached_data = self.disk_cache.read(cache_key)
+            if cached_data is None:
+                raise
+            logger.warning(
+                f"Couldn't reach blob storage for {blob_path}, using cached copy from {cached['last_modified']}: {e}"
+            )
+            return pa.py_buffer(cached_data)
+
+        self.disk_cache.put(
+            cache_key,
+            data,
+            etag=downloaded_blob.properties.etag,
+            last_modified=downloaded_blob.properties.last_modified,
+        )
 
-        return df
+        return data
@@ -0,0 +1,200 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import os
+import json
+import fcntl
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from dotenv import load_dotenv, find_dotenv
+
+from src.logs import get_logger
+
+logger = get_logger(__name__)
+
+load_dotenv(find_dotenv())
+
+BLOB_CACHE_DIR = os.getenv(
+    "BLOB_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "fortunato-wheels", "blob-cache"),
+)
+BLOB_CACHE_MAX_MB = float(os.getenv("BLOB_CACHE_MAX_MB", 512))
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+
+
+class BlobDiskCache:
+    def __init__(self, cache_dir=BLOB_CACHE_DIR, max_bytes=BLOB_CACHE_MAX_MB * 1e6):
+        """Local copy of downloaded blobs with the metadata needed to revalidate them.
+
+        Entries are evicted least recently used first once the total size of the
+        cached blobs goes over `max_bytes`, reads only touch the modification time
+        of the blob file to mark it as used. Several workers can share the same
+        directory, changes to the index are made under a file lock and files are
+        written with an atomic rename. A blob evicted by another worker between
+        `get` and `read` makes `read` return None so the caller downloads it again.
+
+        Parameters
+        ----------
+        cache_dir : str, optional
+            Directory to store the blobs in, by default BLOB_CACHE_DIR
+        max_bytes : float, optional
+            Maximum total size of the cached blobs, by default BLOB_CACHE_MAX_MB
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the index lock against other threads and other worker processes."""
+        with self._lock:
+            with open(os.path.join(self.cache_dir, LOCK_FILE), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file_path(self, key):
+        return os.path.join(
+            self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".blob"
+        )
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self, index):
+        self._atomic_write(
+            os.path.join(self.cache_dir, INDEX_FILE), json.dumps(index).encode()
+        )
+
+    def _atomic_write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, key):
+        """Metadata of a cached blob.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the blob.
+
+        Returns
+        -------
+        dict or None
+            Dict with `etag`, `last_modified` and `size` of the cached copy or None
+            if the blob isn't cached.
+        """
+        with self._locked():
+            entry = self._read_index().get(key)
+        if entry is None or not os.path.exists(self._file_path(key)):
+            return None
+        return entry
+
+    def read(self, key):
+        """Read the cached copy of a blob and mark it as recently used.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the blob.
+
+        Returns
+        -------
+        bytes or None
+            Contents of the cached blob, None if it has been evicted since `get`.
+        """
+        file_path = self._file_path(key)
+        try:
+            with open(file_path, "rb") as f:
+                data = f.read()
+            os.utime(file_path)
+        except FileNotFoundError:
+            return None
+
+        return data
+
+    def put(self, key, data, etag, last_modified=None):
+        """Store a downloaded blob and evict old entries if over the size limit.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the blob.
+        data : bytes-like
+            Contents of the blob, e.g. bytes or a pyarrow.Buffer.
+        etag : str
+            ETag of the downloaded version.
+        last_modified : datetime, optional
+            Last modified time of the blob, by default None
+        """
+        if len(data) > self.max_bytes:
+            return
+
+        with self._locked():
+            self._atomic_write(self._file_path(key), data)
+
+            index = self._read_index()
+            index[key] = {
+                "etag": etag,
+                "last_modified": None if last_modified is None else str(last_modified),
+                "size": len(data),
+            }
+            self._evict(index)
+            self._write_index(index)
+
+    def _last_access(self, key):
+        try:
+            return os.path.getmtime(self._file_path(key))
+        except FileNotFoundError:
+            return 0
+
+    def _evict(self, index):
+        total_bytes = sum(entry["size"] for entry in index.values())
+        # oldest access first
+        for key, entry in sorted(index.items(), key=lambda e: self._last_access(e[0])):
+            if total_bytes <= self.max_bytes:
+                break
+            total_bytes -= entry["size"]
+            del index[key]
+            try:
+                os.remove(self._file_path(key))
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Evicted {key} from blob cache")
+
+
+_blob_disk_cache = None
+_blob_disk_cache_lock = threading.Lock()
+
+
+def get_blob_disk_cache():
+    """Shared BlobDiskCache for the process, None if disabled with BLOB_CACHE_MAX_MB=0.
+
+    Returns
+    -------
+    BlobDiskCache or None
+        The shared disk cache.
+    """
+    global _blob_disk_cache
+
+    if BLOB_CACHE_MAX_MB <= 0:
+        return None
+
+    with _blob_disk_cache_lock:
+        if _blob_disk_cache is None:
+            _blob_disk_cache = BlobDiskCache()
+        return _blob_disk_cache
@@ -0,0 +1,745 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+"""Build the processed summary parquets the app reads from ad level data.
+
+Usage:
+    python -m src.data.build_summaries --input data/processed/cleaned-vehicles.csv --output-dir data
+    python -m src.data.build_summaries --append new-ads.csv --output-dir data
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import glob
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+# ensure src is importable when run as a script
+SRC_PATH = os.path.join(os.path.dirname(__file__), "..", "..")
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.logs import get_logger
+from src.data.summary_cache import SUMMARY_BLOBS, MANIFEST_BLOB, build_manifest
+from src.data.load_preprocess_craigslist import load_craigslist_data
+from src.data.ads_cube import build_ads_cube, merge_ads_cubes
+from src.data.ad_store import TEXT_COLUMNS, merge_ad_frames, sorted_categorical
+
+logger = get_logger(__name__)
+
+# craigslist ads were scraped in 2021, used to work out vehicle age at posting
+DEFAULT_POSTING_YEAR = 2021
+MAX_AGE = 20
+MILEAGE_BIN_KM = 2_500
+NUM_MILEAGE_BINS = 20
+# ads below this price are almost always placeholders, not real prices
+MIN_PRICE = 500
+# below this many rows splitting across processes costs more than it saves
+MIN_ROWS_PER_PARTITION = 250_000
+# mergeable counts kept next to the summaries so new ads can be appended,
+# relative to the output directory and not read by the app
+STATE_PATH = "state/summary_state.npz"
+AD_COLUMNS = ["manufacturer", "model", "price", "year", "odometer_km"]
+# extra columns kept for each ad in the ad level store the app filters on
+AD_STORE_COLUMNS = ["odometer_km", "condition", "fuel", "transmission", "cylinders"]
+# appended ads are written here one sorted file per batch and merged with the ad
+# store of the last full build when the app loads them
+AD_BATCH_DIR = "processed/ad_batches"
+# batches are merged into the ad store file once they hold this fraction of its
+# ads, so each ad is only rewritten a few times however many batches come in
+AD_BATCH_COMPACT_FRACTION = 0.5
+
+
+def model_slug(names):
+    """Convert make/model names to the lower case, dash separated form used as
+    summary column names, e.g. "Model X" -> "model-x".
+
+    Parameters
+    ----------
+    names : pd.Series
+        Make or model names.
+
+    Returns
+    -------
+    pd.Series
+        Slugified names.
+    """
+    return names.astype(str).str.strip().str.lower().str.replace(r"\s+", "-", regex=True)
+
+
+def prepare_ads(ads_df, posting_year=DEFAULT_POSTING_YEAR, extra_columns=()):
+    """Derive the columns the summaries are binned on from the cleaned ads.
+
+    Parameters
+    ----------
+    ads_df : pd.DataFrame
+        Ads with `manufacturer`, `model`, `price`, `year` and `odometer_km` columns.
+    posting_year : int, optional
+        Year the ads were posted, by default DEFAULT_POSTING_YEAR
+    extra_columns : list, optional
+        Columns of `ads_df` to carry through unchanged, by default ()
+
+    Returns
+    -------
+    pd.DataFrame
+        Ads with `make`, `model`, `price`, `age` and `mileage_bin` columns plus
+        `extra_columns`, ads outside the summary ranges removed. `mileage_bin` is
+        -1 when the yearly mileage is out of range.
+    """
+    ads_df = ads_df.dropna(subset=["manufacturer", "model", "price", "year"])
+    ads_df = ads_df[ads_df["price"] >= MIN_PRICE]
+
+    # model years can be a year ahead of when the ad was posted
+    age = (posting_year - ads_df["year"].to_numpy()).clip(min=0)
+    in_range = age <= MAX_AGE
+    ads_df = ads_df[in_range]
+    age = age[in_range]
+
+    mileage_per_year = ads_df["odometer_km"].to_numpy() / np.maximum(age, 1)
+    mileage_bin = np.floor_divide(np.nan_to_num(mileage_per_year, nan=-1), MILEAGE_BIN_KM)
+    mileage_bin[(mileage_bin < 0) | (mileage_bin >= NUM_MILEAGE_BINS)] = -1
+
+    prepared_df = pd.DataFrame(
+        {
+            "make": model_slug(ads_df["manufacturer"]).to_numpy(),
+            "model": model_slug(ads_df["model"]).to_numpy(),
+            "price": ads_df["price"].to_numpy(dtype=np.float64),
+            "age": age.astype(np.int64),
+            "mileage_bin": mileage_bin.astype(np.int64),
+        }
+    )
+    for column in extra_columns:
+        if column not in prepared_df:
+            prepared_df[column] = ads_df[column].to_numpy()
+    return prepared_df
+
+
+def ad_store_frame(prepared_df):
+    """Ads the app filters on directly, sorted by make, model and age so the ads
+    of a model are contiguous and ordered by model year, newest first.
+
+    Parameters
+    ----------
+    prepared_df : pd.DataFrame
+        Output of `prepare_ads` with AD_STORE_COLUMNS as extra columns, or an
+        earlier output of this function to re-sort.
+
+    Returns
+    -------
+    pd.DataFrame
+        Sorted ads with compact column types, text columns are dictionary
+        encoded with sorted categories so workers map their integer codes
+        rather than decoding a string per ad.
+    """
+    columns = ["make", "model", "age", "price"] + AD_STORE_COLUMNS
+    df = prepared_df[columns]
+    if "yearly_mileage_range" in prepared_df:
+        mileage = prepared_df["yearly_mileage_range"].to_numpy()
+    else:
+        mileage_bins = prepared_df["mileage_bin"].to_numpy()
+        mileage = np.where(mileage_bins >= 0, mileage_bins * MILEAGE_BIN_KM, -1)
+    # -1 when the yearly mileage is out of range, same as the ads cube
+    df = df.assign(yearly_mileage_range=mileage)
+    # sorted codes order the same as the names and sort much faster than strings
+    order = np.lexsort(
+        (
+            df["age"].to_numpy(),
+            pd.factorize(df["model"], sort=True)[0],
+            pd.factorize(df["make"], sort=True)[0],
+        )
+    )
+    df = df.iloc[order].reset_index(drop=True)
+    for column in TEXT_COLUMNS:
+        df[column] = sorted_categorical(df[column])
+    return df.astype(
+        {
+            "age": np.int8,
+            "price": np.float32,
+            "odometer_km": np.float32,
+            "cylinders": np.float32,
+            "yearly_mileage_range": np.int32,
+        }
+    )
+
+
+def _partition_counts(model_codes, ages, prices, mileage_bins, num_models):
+    """Count, price sum and mileage histogram for one partition of ads."""
+    age_index = model_codes * (MAX_AGE + 1) + ages
+    size = num_models * (MAX_AGE + 1)
+    counts = np.bincount(age_index, minlength=size)
+    price_sums = np.bincount(age_index, weights=prices, minlength=size)
+
+    has_mileage = mileage_bins >= 0
+    mileage_counts = np.bincount(
+        model_codes[has_mileage] * NUM_MILEAGE_BINS + mileage_bins[has_mileage],
+        minlength=num_models * NUM_MILEAGE_BINS,
+    )
+
+    return (
+        counts.reshape(num_models, MAX_AGE + 1),
+        price_sums.reshape(num_models, MAX_AGE + 1),
+        mileage_counts.reshape(num_models, NUM_MILEAGE_BINS),
+    )
+
+
+class SummaryState:
+    def __init__(self, models, makes, counts, price_sums, mileage_counts):
+        """Mergeable counts the summaries are built from.
+
+        Parameters
+        ----------
+        models : np.ndarray
+            Model names, one per row of the arrays below.
+        makes : np.ndarray
+            Make of each model.
+        counts : np.ndarray
+            Number of ads per model (rows) and age (columns).
+        price_sums : np.ndarray
+            Sum of ad prices per model and age.
+        mileage_counts : np.ndarray
+            Number of ads per model and yearly mileage bin.
+        """
+        self.models = np.asarray(models, dtype=object)
+        self.makes = np.asarray(makes, dtype=object)
+        self.counts = counts
+        self.price_sums = price_sums
+        self.mileage_counts = mileage_counts
+
+    @classmethod
+    def from_ads(cls, prepared_df, n_jobs=None):
+        """Aggregate prepared ads, splitting them across processes when large.
+
+        Parameters
+        ----------
+        prepared_df : pd.DataFrame
+            Output of `prepare_ads`.
+        n_jobs : int, optional
+            Number of processes to use, by default the number of cores.
+
+        Returns
+        -------
+        SummaryState
+            Aggregated state.
+        """
+        model_codes, models = pd.factorize(prepared_df["model"], sort=True)
+        models = np.asarray(models, dtype=object)
+
+        # when a model name is used by several makes pick the most common one
+        make_counts = (
+            prepared_df.groupby(["model", "make"]).size().reset_index(name="n")
+        )
+        model_makes = (
+            make_counts.sort_values("n")
+            .drop_duplicates("model", keep="last")
+            .set_index("model")
+            .make
+        )
+        makes = model_makes.reindex(models).to_numpy()
+
+        columns = (
+            model_codes.astype(np.int64),
+            prepared_df["age"].to_numpy(),
+            prepared_df["price"].to_numpy(),
+            prepared_df["mileage_bin"].to_numpy(),
+        )
+
+        n_jobs = n_jobs or os.cpu_count() or 1
+        n_partitions = min(n_jobs, max(1, len(prepared_df) // MIN_ROWS_PER_PARTITION))
+
+        if n_partitions == 1:
+            counts, price_sums, mileage_counts = _partition_counts(
+                *columns, len(models)
+            )
+        else:
+            partitions = [np.array_split(column, n_partitions) for column in columns]
+            with ProcessPoolExecutor(max_workers=n_partitions) as executor:
+                results = list(
+                    executor.map(
+                        _partition_counts, *partitions, [len(models)] * n_partitions
+                    )
+                )
+            counts, price_sums, mileage_counts = (
+                sum(result[i] for result in results) for i in range(3)
+            )
+
+        return cls(models, makes, counts, price_sums, mileage_counts)
+
+    def merge(self, other):
+        """Combine with the state of another set of ads, e.g. a new batch.
+
+        Models in both keep the make they already had.
+
+        Parameters
+        ----------
+        other : SummaryState
+            State to add to this one.
+
+        Returns
+        -------
+        SummaryState
+            New state covering the ads of both.
+        """
+        models = pd.Index(self.models).union(pd.Index(other.models))
+        self_rows = models.get_indexer(self.models)
+        other_rows = models.get_indexer(other.models)
+
+        makes = np.empty(len(models), dtype=object)
+        makes[other_rows] = other.makes
+        makes[self_rows] = self.makes
+
+        merged = []
+        for name in ["counts", "price_sums", "mileage_counts"]:
+            self_array, other_array = getattr(self, name), getattr(other, name)
+            array = np.zeros(
+                (len(models), self_array.shape[1]),
+                dtype=np.result_type(self_array, other_array),
+            )
+            array[self_rows] += self_array
+            array[other_rows] += other_array
+            merged.append(array)
+
+        return SummaryState(models.to_numpy(), makes, *merged)
+
+    def save(self, path):
+        """Persist the state so later batches can be merged into it.
+
+        Parameters
+        ----------
+        path : str
+            File to write, an .npz archive.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # write then rename so a failed update leaves the previous state intact
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            models=self.models.astype(str),
+            makes=self.makes.astype(str),
+            counts=self.counts,
+            price_sums=self.price_sums,
+            mileage_counts=self.mileage_counts,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load state written by `save`.
+
+        Parameters
+        ----------
+        path : str
+            File written by `save`.
+
+        Returns
+        -------
+        SummaryState
+            The persisted state.
+        """
+        with np.load(path) as state:
+            return cls(
+                state["models"],
+                state["makes"],
+                state["counts"],
+                state["price_sums"],
+                state["mileage_counts"],
+            )
+
+    def to_summaries(self, models=None):
+        """Build the wide summary tables the app reads.
+
+        Parameters
+        ----------
+        models : list, optional
+            Only build the columns of these models, by default None builds all.
+
+        Returns
+        -------
+        dict
+            DataFrames by summary name, see SUMMARY_BLOBS.
+        """
+        ages = np.arange(MAX_AGE + 1)
+
+        rows = slice(None)
+        if models is not None:
+            rows = pd.Index(self.models).get_indexer(models)
+        models = self.models[rows]
+        counts = self.counts[rows]
+        price_sums = self.price_sums[rows]
+        mileage_counts = self.mileage_counts[rows]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_prices = price_sums / counts
+            mileage_totals = mileage_counts.sum(axis=1, keepdims=True)
+            mileage_fractions = np.where(
+                mileage_totals > 0, mileage_counts / mileage_totals, 0.0
+            )
+
+        price_summary = pd.DataFrame(avg_prices.T, columns=models)
+        price_summary["age"] = ages
+
+        num_ads_summary = pd.DataFrame(counts.T, columns=models)
+        num_ads_summary["age"] = ages
+
+        mileage_summary = pd.DataFrame(mileage_fractions.T, columns=models)
+        mileage_summary["yearly_mileage_range"] = (
+            np.arange(NUM_MILEAGE_BINS) * MILEAGE_BIN_KM
+        )
+
+        makes_models = pd.DataFrame({"make": self.makes[rows], "model": models})
+
+        return {
+            "price_summary": price_summary,
+            "num_ads_summary": num_ads_summary,
+            "mileage_summary": mileage_summary,
+            "makes_models": makes_models,
+        }
+
+
+def _output_path(output_dir, blob_path):
+    return os.path.join(output_dir, *blob_path.split("/"))
+
+
+def _read_ads(input_path, use_cache=True):
+    columns = AD_COLUMNS + [c for c in AD_STORE_COLUMNS if c not in AD_COLUMNS]
+    return load_craigslist_data(
+        columns=columns, data_path=input_path, use_cache=use_cache
+    )
+
+
+def write_summaries(summaries, output_dir):
+    """Write the summaries and their manifest laid out like the blob container.
+
+    Parameters
+    ----------
+    summaries : dict
+        DataFrames by summary name, see SUMMARY_BLOBS.
+    output_dir : str
+        Root directory, files are written to `<output_dir>/processed/`.
+    """
+    for name, df in summaries.items():
+        path = _output_path(output_dir, SUMMARY_BLOBS[name])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(path, index=False)
+
+    write_manifest(output_dir)
+
+
+def _ad_batch_paths(output_dir):
+    """Blob paths of the ad batches appended since the last full build, in the
+    order they were written."""
+    batch_dir = _output_path(output_dir, AD_BATCH_DIR)
+    return [
+        f"{AD_BATCH_DIR}/{os.path.basename(path)}"
+        for path in sorted(glob.glob(os.path.join(batch_dir, "*.parquet")))
+    ]
+
+
+def _remove_ad_batches(output_dir):
+    for blob_path in _ad_batch_paths(output_dir):
+        os.remove(_output_path(output_dir, blob_path))
+
+
+def write_manifest(output_dir, unchanged=()):
+    """Write the manifest of the summaries in `output_dir` so running apps
+    pick up the new version.
+
+    Parameters
+    ----------
+    output_dir : str
+        Root directory the summaries were written to.
+    unchanged : list, optional
+        Blob paths not written since the previous manifest, their hashes are
+        reused rather than read from the files again, by default ()
+    """
+    # optional summaries may not have been built for older output directories
+    blob_paths = [
+        blob_path
+        for blob_path in SUMMARY_BLOBS.values()
+        if os.path.exists(_output_path(output_dir, blob_path))
+    ]
+    parts = {}
+    batch_paths = _ad_batch_paths(output_dir)
+    if batch_paths:
+        parts[SUMMARY_BLOBS["ads"]] = batch_paths
+
+    manifest_path = _output_path(output_dir, MANIFEST_BLOB)
+    known_files = {}
+    if unchanged:
+        try:
+            with open(manifest_path) as f:
+                previous_files = json.load(f)["files"]
+            known_files = {
+                blob_path: previous_files[blob_path]
+                for blob_path in unchanged
+                if blob_path in previous_files
+            }
+        except (FileNotFoundError, KeyError, json.JSONDecodeError):
+            pass
+
+    manifest = build_manifest(output_dir, blob_paths, parts, known_files)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def build_summaries(
+    input_path, output_dir, posting_year=DEFAULT_POSTING_YEAR, n_jobs=None
+):
+    """Build all summaries from ad level data in one pass.
+
+    Parameters
+    ----------
+    input_path : str
+        CSV of cleaned ads, e.g. data/processed/cleaned-vehicles.csv
+    output_dir : str
+        Root directory to write `processed/*.parquet` to.
+    posting_year : int, optional
+        Year the ads were posted, by default DEFAULT_POSTING_YEAR
+    n_jobs : int, optional
+        Number of processes to aggregate with, by default the number of cores.
+
+    Returns
+    -------
+    dict
+        Time taken by each stage in seconds.
+    """
+    stage_times = {}
+
+    start_time = time.time()
+    ads_df = _read_ads(input_path)
+    stage_times["load"] = time.time() - start_time
+
+    start_time = time.time()
+    prepared_df = prepare_ads(
+        ads_df, posting_year=posting_year, extra_columns=AD_STORE_COLUMNS
+    )
+    stage_times["prepare"] = time.time() - start_time
+
+    start_time = time.time()
+    state = SummaryState.from_ads(prepared_df, n_jobs=n_jobs)
+    stage_times["aggregate"] = time.time() - start_time
+
+    start_time = time.time()
+    summaries = state.to_summaries()
+    summaries["ads_cube"] = build_ads_cube(prepared_df, MILEAGE_BIN_KM)
+    summaries["ads"] = ad_store_frame(prepared_df)
+    stage_times["summarize"] = time.time() - start_time
+
+    start_time = time.time()
+    # the new ad store holds every ad so earlier appended batches are dropped
+    _remove_ad_batches(output_dir)
+    write_summaries(summaries, output_dir)
+    state.save(_output_path(output_dir, STATE_PATH))
+    stage_times["write"] = time.time() - start_time
+
+    for stage, seconds in stage_times.items():
+        logger.info(f"{stage}: {seconds:.2f}s")
+    logger.info(
+        f"Built summaries for {len(state.models)} models from {len(prepared_df)} ads "
+        f"in {sum(stage_times.values()):.2f}s"
+    )
+
+    return stage_times
+
+
+def _replace_columns(summary_df, update_df, key_column):
+    """Overwrite the model columns in `update_df` in `summary_df`, appending
+    models it doesn't have yet. Rows of both are the same fixed bins."""
+    update_df = update_df.drop(columns=key_column)
+    existing = update_df.columns.intersection(summary_df.columns)
+    summary_df[existing] = update_df[existing].to_numpy()
+
+    new = update_df.columns.difference(summary_df.columns, sort=False)
+    if len(new) > 0:
+        summary_df = pd.concat([summary_df, update_df[new]], axis=1)
+    return summary_df
+
+
+def _write_ad_batch(ads_df, output_dir):
+    """Write the sorted ads of a batch as the next file in AD_BATCH_DIR."""
+    batch_paths = _ad_batch_paths(output_dir)
+    number = 1
+    if batch_paths:
+        number = int(os.path.basename(batch_paths[-1]).split(".")[0]) + 1
+    path = _output_path(output_dir, f"{AD_BATCH_DIR}/{number:06d}.parquet")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    ads_df.to_parquet(path, index=False)
+
+
+def _compact_ad_batches(output_dir):
+    """Merge the ad batches into the ad store file once they hold
+    AD_BATCH_COMPACT_FRACTION of its ads.
+
+    Returns
+    -------
+    bool
+        True if the batches were merged.
+    """
+    ads_path = _output_path(output_dir, SUMMARY_BLOBS["ads"])
+    batch_paths = [
+        _output_path(output_dir, blob_path) for blob_path in _ad_batch_paths(output_dir)
+    ]
+    # row counts come from the parquet footers without reading the ads
+    batch_rows = sum(pq.ParquetFile(path).metadata.num_rows for path in batch_paths)
+    ads_rows = pq.ParquetFile(ads_path).metadata.num_rows
+    if batch_rows <= AD_BATCH_COMPACT_FRACTION * ads_rows:
+        return False
+
+    ads_df = merge_ad_frames(
+        [pd.read_parquet(path) for path in [ads_path] + batch_paths]
+    )
+    tmp_path = ads_path + ".tmp"
+    ads_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, ads_path)
+    _remove_ad_batches(output_dir)
+    logger.info(f"Merged {len(batch_paths)} ad batches into {ads_path}")
+    return True
+
+
+def append_ads(batch_path, output_dir, posting_year=DEFAULT_POSTING_YEAR):
+    """Add a batch of new ads to previously built summaries.
+
+    The batch is merged into the persisted state and only the columns of the
+    models in the batch are recomputed, so the cost grows with the batch rather
+    than with all the ads seen so far. The batch's ads are written as their own
+    sorted file next to the ad store, see AD_BATCH_DIR.
+
+    Parameters
+    ----------
+    batch_path : str
+        CSV of new ads with the same columns as cleaned-vehicles.csv
+    output_dir : str
+        Root directory the summaries were built in with `build_summaries`.
+    posting_year : int, optional
+        Year the new ads were posted, by default DEFAULT_POSTING_YEAR
+
+    Returns
+    -------
+    dict
+        Time taken by each stage in seconds.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no persisted state, run `build_summaries` first.
+    """
+    stage_times = {}
+    state_path = _output_path(output_dir, STATE_PATH)
+    if not os.path.exists(state_path):
+        raise FileNotFoundError(
+            f"No summary state at {state_path}, build the summaries before appending"
+        )
+
+    start_time = time.time()
+    state = SummaryState.load(state_path)
+    # batches are only read once so aren't worth a parquet copy
+    batch_df = _read_ads(batch_path, use_cache=False)
+    stage_times["load"] = time.time() - start_time
+
+    start_time = time.time()
+    prepared_df = prepare_ads(
+        batch_df, posting_year=posting_year, extra_columns=AD_STORE_COLUMNS
+    )
+    batch_state = SummaryState.from_ads(prepared_df, n_jobs=1)
+    state = state.merge(batch_state)
+    stage_times["aggregate"] = time.time() - start_time
+
+    start_time = time.time()
+    updates = state.to_summaries(models=batch_state.models)
+    batch_cube = build_ads_cube(prepared_df, MILEAGE_BIN_KM)
+    stage_times["summarize"] = time.time() - start_time
+
+    start_time = time.time()
+    key_columns = {
+        "price_summary": "age",
+        "num_ads_summary": "age",
+        "mileage_summary": "yearly_mileage_range",
+    }
+    for name, key_column in key_columns.items():
+        path = _output_path(output_dir, SUMMARY_BLOBS[name])
+        summary_df = _replace_columns(
+            pd.read_parquet(path), updates[name], key_column
+        )
+        summary_df.to_parquet(path, index=False)
+
+    # the cube holds counts and sums so adding the batch's cube keeps it exact
+    cube_path = _output_path(output_dir, SUMMARY_BLOBS["ads_cube"])
+    if os.path.exists(cube_path):
+        merge_ads_cubes(pd.read_parquet(cube_path), batch_cube).to_parquet(
+            cube_path, index=False
+        )
+    else:
+        logger.warning(
+            f"No ads cube at {cube_path}, run a full build to add one to {output_dir}"
+        )
+
+    unchanged = []
+    ads_path = _output_path(output_dir, SUMMARY_BLOBS["ads"])
+    if os.path.exists(ads_path):
+        unchanged = [SUMMARY_BLOBS["ads"]] + _ad_batch_paths(output_dir)
+        _write_ad_batch(ad_store_frame(prepared_df), output_dir)
+        if _compact_ad_batches(output_dir):
+            unchanged = []
+    else:
+        logger.warning(
+            f"No ad store at {ads_path}, run a full build to add one to {output_dir}"
+        )
+
+    makes_models = pd.DataFrame({"make": state.makes, "model": state.models})
+    makes_models.to_parquet(
+        _output_path(output_dir, SUMMARY_BLOBS["makes_models"]), index=False
+    )
+    write_manifest(output_dir, unchanged)
+    state.save(state_path)
+    stage_times["write"] = time.time() - start_time
+
+    for stage, seconds in stage_times.items():
+        logger.info(f"{stage}: {seconds:.2f}s")
+    logger.info(
+        f"Appended {len(prepared_df)} ads updating {len(batch_state.models)} models "
+        f"in {sum(stage_times.values()):.2f}s"
+    )
+
+    return stage_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--input",
+        default=os.path.join("data", "processed", "cleaned-vehicles.csv"),
+        help="CSV of cleaned ads",
+    )
+    parser.add_argument(
+        "--append",
+        default=None,
+        help="CSV of new ads to add to summaries already built in --output-dir",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="data",
+        help="directory to write processed/*.parquet and the manifest to",
+    )
+    parser.add_argument(
+        "--posting-year",
+        type=int,
+        default=DEFAULT_POSTING_YEAR,
+        help="year the ads were posted, used for vehicle age",
+    )
+    parser.add_argument(
+        "--n-jobs", type=int, default=None, help="processes to aggregate with"
+    )
+    args = parser.parse_args()
+
+    if args.append is not None:
+        append_ads(args.append, args.output_dir, args.posting_year)
+    else:
+        build_summaries(args.input, args.output_dir, args.posting_year, args.n_jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import numpy as np
+import pandas as pd
+
+# key column of the wide summaries holding the row bins
+SUMMARY_KEY_COLUMNS = {
+    "price_summary": "age",
+    "num_ads_summary": "age",
+    "mileage_summary": "yearly_mileage_range",
+}
+
+
+class LongSummary:
+    def __init__(self, model_codes, keys, values, num_models):
+        """One summary in long format, rows sorted by model code.
+
+        Parameters
+        ----------
+        model_codes : np.ndarray
+            Model code of each row, sorted ascending.
+        keys : np.ndarray
+            Bin of each row, e.g. vehicle age.
+        values : np.ndarray
+            Value of each row, e.g. average price.
+        num_models : int
+            Number of model codes, rows of model `i` are
+            `offsets[i]:offsets[i + 1]`.
+        """
+        self.model_codes = model_codes
+        self.keys = keys
+        self.values = values
+        self.offsets = np.searchsorted(model_codes, np.arange(num_models + 1))
+
+    @classmethod
+    def from_wide(cls, wide_df, models, key_column, key_dtype, value_dtype, drop_zeros):
+        """Convert a wide summary with one column per model.
+
+        Parameters
+        ----------
+        wide_df : pd.DataFrame
+            Summary with a column per model and `key_column` holding the bins, the
+            row number is used as the bin if `key_column` is missing.
+        models : np.ndarray
+            Model names in code order.
+        key_column : str
+            Column holding the bin of each row.
+        key_dtype, value_dtype : np.dtype
+            Types to store the bins and values as.
+        drop_zeros : bool
+            Whether to drop rows with a value of 0 as well as missing values.
+
+        Returns
+        -------
+        LongSummary
+            The summary in long format.
+        """
+        if key_column in wide_df.columns:
+            keys = wide_df[key_column].to_numpy()
+        else:
+            keys = np.arange(len(wide_df))
+
+        # models x bins so raveling keeps rows grouped by model code
+        values = wide_df.reindex(columns=models).to_numpy(dtype=np.float64).T
+        model_codes = np.repeat(np.arange(len(models), dtype=np.int32), len(keys))
+        keys = np.tile(keys.astype(key_dtype), len(models))
+        values = values.ravel()
+
+        keep = ~np.isnan(values)
+        if drop_zeros:
+            keep &= values != 0
+
+        return cls(
+            model_codes[keep], keys[keep], values[keep].astype(value_dtype), len(models)
+        )
+
+    @property
+    def nbytes(self):
+        return (
+            self.model_codes.nbytes
+            + self.keys.nbytes
+            + self.values.nbytes
+            + self.offsets.nbytes
+        )
+
+    def rows(self, model_codes, key_range=None):
+        """Rows of the given models in the order given.
+
+        Parameters
+        ----------
+        model_codes : np.ndarray
+            Codes of the models to select.
+        key_range : list, optional
+            Inclusive [min, max] bins to keep, by default None keeps all.
+
+        Returns
+        -------
+        np.ndarray
+            Indexes of the selected rows.
+        """
+        model_codes = np.asarray(model_codes, dtype=np.int64)
+        starts = self.offsets[model_codes]
+        lengths = self.offsets[model_codes + 1] - starts
+        # concatenated aranges of each model's slice
+        index = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(
+            lengths.sum()
+        )
+
+        if key_range is not None:
+            keys = self.keys[index]
+            index = index[(keys >= key_range[0]) & (keys <= key_range[1])]
+        return index
+
+    def model_totals(self, model_codes=None, key_range=None):
+        """Sum of the values of each model.
+
+        Parameters
+        ----------
+        model_codes : np.ndarray, optional
+            Codes of the models to sum, by default None sums every model.
+        key_range : list, optional
+            Inclusive [min, max] bins to include, by default None includes all.
+
+        Returns
+        -------
+        np.ndarray
+            Total per model, in the order of `model_codes`.
+        """
+        num_models = len(self.offsets) - 1
+        if key_range is None:
+            values = self.values
+            if values.dtype.kind in "iu":
+                values = values.astype(np.int64)
+            totals = np.add.reduceat(np.append(values, 0), self.offsets[:-1])
+            # reduceat returns the value at the offset for empty slices
+            totals[self.offsets[:-1] == self.offsets[1:]] = 0
+        else:
+            keep = (self.keys >= key_range[0]) & (self.keys <= key_range[1])
+            totals = np.bincount(
+                self.model_codes[keep],
+                weights=self.values[keep],
+                minlength=num_models,
+            )
+            if self.values.dtype.kind in "iu":
+                totals = totals.astype(np.int64)
+
+        if model_codes is None:
+            return totals
+        return totals[np.asarray(model_codes, dtype=np.int64)]
+
+
+class CompactSummaries:
+    def __init__(self, models, makes, model_makes, price, num_ads, mileage):
+        """Summaries in long format with models and makes as integer codes.
+
+        Models are coded in (make, model) order so the models of each make are a
+        contiguous range of codes, `make_offsets[i]:make_offsets[i + 1]`.
+
+        Parameters
+        ----------
+        models : np.ndarray
+            Model names by code.
+        makes : np.ndarray
+            Make names by code.
+        model_makes : np.ndarray
+            Make code of each model.
+        price : LongSummary
+            Average price by model and age.
+        num_ads : LongSummary
+            Number of ads by model and age.
+        mileage : LongSummary
+            Fraction of vehicles by model and yearly mileage bin.
+        """
+        self.models = models
+        self.makes = makes
+        self.model_makes = model_makes
+        self.price = price
+        self.num_ads = num_ads
+        self.mileage = mileage
+
+        self.model_index = pd.Index(models)
+        self.make_index = pd.Index(makes)
+        self.make_offsets = np.searchsorted(model_makes, np.arange(len(makes) + 1))
+
+        model_titles = pd.Series(models).str.title()
+        make_titles = pd.Series(makes[model_makes]).str.replace("-", " ").str.title()
+        self.legend_labels = (model_titles + " (" + make_titles + ")").to_numpy()
+        self.bar_labels = (model_titles + "<br>(" + make_titles + ")").to_numpy()
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Build from the wide summaries of a SummarySnapshot.
+
+        Parameters
+        ----------
+        snapshot : SummarySnapshot
+            Snapshot with `makes_models`, `price_summary`, `num_ads_summary` and
+            optionally `mileage_summary` frames.
+
+        Returns
+        -------
+        CompactSummaries
+            The compact summaries.
+        """
+        makes_models = (
+            snapshot["makes_models"][["make", "model"]]
+            .dropna()
+            .drop_duplicates("model")
+            .sort_values(["make", "model"])
+        )
+        make_codes, makes = pd.factorize(makes_models["make"], sort=True)
+        models = makes_models["model"].to_numpy(dtype=object)
+
+        empty = pd.DataFrame()
+        frames = {
+            name: snapshot.frames.get(name, empty) for name in SUMMARY_KEY_COLUMNS
+        }
+
+        return cls(
+            models=models,
+            makes=np.asarray(makes, dtype=object),
+            model_makes=make_codes.astype(np.int32),
+            price=LongSummary.from_wide(
+                frames["price_summary"], models, "age", np.int16, np.float32, False
+            ),
+            num_ads=LongSummary.from_wide(
+                frames["num_ads_summary"], models, "age", np.int16, np.int32, True
+            ),
+            mileage=LongSummary.from_wide(
+                frames["mileage_summary"],
+                models,
+                "yearly_mileage_range",
+                np.int32,
+                np.float32,
+                False,
+            ),
+        )
+
+    @property
+    def nbytes(self):
+        return self.price.nbytes + self.num_ads.nbytes + self.mileage.nbytes
+
+    def model_codes(self, models):
+        """Codes of model names, names not in the summaries are dropped.
+
+        Parameters
+        ----------
+        models : list
+            Model names.
+
+        Returns
+        -------
+        np.ndarray
+            Model codes in the order given.
+        """
+        codes = self.model_index.get_indexer(list(models))
+        return codes[codes >= 0]
+
+    def long_frame(self, summary, model_codes, key_range, key_name, value_name):
+        """Plot ready long DataFrame of some models.
+
+        Parameters
+        ----------
+        summary : LongSummary
+            Which summary to take rows from, e.g. `self.price`.
+        model_codes : np.ndarray
+            Codes of the models to include.
+        key_range : list or None
+            Inclusive [min, max] bins to keep.
+        key_name, value_name : str
+            Column names for the bins and values.
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns `key_name`, `model` (legend label), `value_name` and `make`.
+        """
+        rows = summary.rows(model_codes, key_range)
+        codes = summary.model_codes[rows]
+        return pd.DataFrame(
+            {
+                key_name: summary.keys[rows].astype(np.int64),
+                "model": self.legend_labels[codes],
+                value_name: summary.values[rows],
+                "make": self.makes[self.model_makes[codes]],
+            }
+        )
+
+
+def get_compact_summaries(snapshot):
+    """Compact summaries of a snapshot, built once per data version.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to get the compact summaries of.
+
+    Returns
+    -------
+    CompactSummaries
+        The compact summaries.
+    """
+    return snapshot.derived("compact_summaries", CompactSummaries.from_snapshot)
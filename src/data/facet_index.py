@@ -0,0 +1,254 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import numpy as np
+import pandas as pd
+
+from src.data.ad_store import get_ad_store
+
+FACET_COLUMNS = ["condition", "fuel", "transmission", "cylinders"]
+# set bits in every 16 bit number, popcounts look up two bytes at a time
+_POPCOUNT_16 = np.array(
+    [bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8
+)
+
+
+def popcount(bits):
+    """Number of set bits in packed bitmaps.
+
+    Parameters
+    ----------
+    bits : np.ndarray
+        uint8 bitmaps with an even number of bytes along the last axis.
+
+    Returns
+    -------
+    np.ndarray or int
+        Set bits per bitmap, summed over the last axis.
+    """
+    return _POPCOUNT_16[bits.view(np.uint16)].sum(axis=-1, dtype=np.int64)
+
+
+def _rows_to_bits(rows, num_bytes):
+    """Packed bitmap with the given rows set, rows must be unique.
+
+    Parameters
+    ----------
+    rows : np.ndarray
+        Row indexes.
+    num_bytes : int
+        Length of the bitmap.
+
+    Returns
+    -------
+    np.ndarray
+        uint8 bitmap, most significant bit first like np.packbits.
+    """
+    # distinct bits of a byte sum to the same value as OR'ing them
+    return np.bincount(
+        rows >> 3, weights=128 >> (rows & 7), minlength=num_bytes
+    ).astype(np.uint8)
+
+
+def _is_sparse(container):
+    # sparse values are stored as int32 row ids, dense ones as uint8 bitmaps
+    return container.dtype == np.int32
+
+
+class FacetIndex:
+    def __init__(self, ad_store):
+        """Container per facet value over the ads of an AdStore, built at load time.
+
+        Like roaring bitmaps each value keeps whichever of two containers is
+        smaller: the sorted row ids of its ads for rare values, or a bitmap with
+        one bit per ad, packed eight to a byte, for common ones. Unlike roaring
+        the containers span the whole store rather than 2^16 row chunks, facet
+        values are spread evenly over the rows so chunking wouldn't save more.
+        Filtering on several facets is a bitwise AND of OR'd value bitmaps and the
+        number of matching ads for every option is a popcount or bit lookups.
+
+        Parameters
+        ----------
+        ad_store : AdStore
+            Ads to index, bits follow the store's row order.
+        """
+        self.num_rows = len(ad_store)
+        # bytes rounded up to a whole number of 16 bit words for popcount
+        self.num_bytes = -(-self.num_rows // 16) * 2
+
+        self.values = {}
+        self.containers = {}
+        for facet in FACET_COLUMNS:
+            if facet in ad_store.categorical:
+                codes, categories = ad_store.categorical[facet]
+                labels = [str(category) for category in categories]
+            else:
+                codes, categories = pd.factorize(ad_store.numeric[facet], sort=True)
+                labels = [f"{category:g}" for category in categories]
+
+            # rows grouped by value, missing values (-1) sort first
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+            containers = []
+            for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+                rows = order[start:end]
+                if rows.nbytes < self.num_bytes:
+                    containers.append(rows.copy())
+                else:
+                    bits = np.zeros(self.num_bytes, dtype=np.uint8)
+                    bits[: -(-self.num_rows // 8)] = np.packbits(codes == i)
+                    containers.append(bits)
+            self.values[facet] = labels
+            self.containers[facet] = containers
+
+    @property
+    def nbytes(self):
+        return sum(
+            container.nbytes
+            for containers in self.containers.values()
+            for container in containers
+        )
+
+    def rows_bitmap(self, rows):
+        """Bitmap of a set of rows, e.g. from AdStore.select.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            Row indexes.
+
+        Returns
+        -------
+        np.ndarray
+            Packed bitmap with the rows set.
+        """
+        return _rows_to_bits(np.asarray(rows), self.num_bytes)
+
+    def facet_bitmap(self, selected, exclude=None):
+        """Bitmap of the ads matching the selected facet values.
+
+        Values within a facet are OR'd and facets are AND'd together.
+
+        Parameters
+        ----------
+        selected : dict
+            Selected values by facet, facets with no values don't filter.
+        exclude : str, optional
+            Facet to leave out, by default None
+
+        Returns
+        -------
+        np.ndarray or None
+            Packed bitmap, None when nothing is filtered.
+        """
+        bitmap = None
+        for facet, values in selected.items():
+            if facet == exclude or not values:
+                continue
+            positions = [
+                self.values[facet].index(value)
+                for value in values
+                if value in self.values[facet]
+            ]
+            containers = [self.containers[facet][i] for i in positions]
+            sparse = [c for c in containers if _is_sparse(c)]
+            if sparse:
+                # a facet's values never share a row so their ids scatter together
+                facet_bits = _rows_to_bits(np.concatenate(sparse), self.num_bytes)
+            else:
+                # also when none of the values are in the data so nothing matches
+                facet_bits = np.zeros(self.num_bytes, dtype=np.uint8)
+            for container in containers:
+                if not _is_sparse(container):
+                    facet_bits |= container
+            bitmap = facet_bits if bitmap is None else bitmap & facet_bits
+        return bitmap
+
+    def count(self, base, selected):
+        """Number of ads in `base` matching the selected facet values.
+
+        Parameters
+        ----------
+        base : np.ndarray
+            Bitmap of the ads to count within, e.g. the selected models.
+        selected : dict
+            Selected values by facet.
+
+        Returns
+        -------
+        int
+            Number of matching ads.
+        """
+        facets = self.facet_bitmap(selected)
+        return int(popcount(base if facets is None else base & facets))
+
+    def rows(self, base, selected):
+        """Row indexes of the ads in `base` matching the selected facet values.
+
+        Parameters
+        ----------
+        base : np.ndarray
+            Bitmap of the ads to select within.
+        selected : dict
+            Selected values by facet.
+
+        Returns
+        -------
+        np.ndarray
+            Matching rows in store order.
+        """
+        facets = self.facet_bitmap(selected)
+        bits = base if facets is None else base & facets
+        return np.flatnonzero(np.unpackbits(bits)[: self.num_rows])
+
+    def counts(self, base, selected):
+        """Number of matching ads for every option of every facet.
+
+        The count of an option applies the selections of the other facets but not
+        its own, so it shows how many ads picking that option would add.
+
+        Parameters
+        ----------
+        base : np.ndarray
+            Bitmap of the ads to count within.
+        selected : dict
+            Selected values by facet.
+
+        Returns
+        -------
+        dict
+            `{facet: {value: count}}`
+        """
+        counts = {}
+        for facet in FACET_COLUMNS:
+            others = self.facet_bitmap(selected, exclude=facet)
+            bits = base if others is None else base & others
+            facet_counts = []
+            for container in self.containers[facet]:
+                if _is_sparse(container):
+                    # look up the bit of each of the value's rows
+                    hits = bits[container >> 3] >> (7 - (container & 7)) & 1
+                    facet_counts.append(int(hits.sum()))
+                else:
+                    facet_counts.append(int(popcount(container & bits)))
+            counts[facet] = dict(zip(self.values[facet], facet_counts))
+        return counts
+
+
+def get_facet_index(snapshot):
+    """Facet containers of a snapshot's ad store, built once per data version.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot holding an `ads` frame.
+
+    Returns
+    -------
+    FacetIndex or None
+        The index, None if the snapshot has no ad level data.
+    """
+    ad_store = get_ad_store(snapshot)
+    if ad_store is None:
+        return None
+    return snapshot.derived("facet_index", lambda s: FacetIndex(ad_store))
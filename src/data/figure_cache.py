@@ -0,0 +1,281 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import os
+import json
+import fcntl
+import hashlib
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from dotenv import load_dotenv, find_dotenv
+
+from src.logs import get_logger
+from src.data.lru_cache import LRUCache
+
+logger = get_logger(__name__)
+
+load_dotenv(find_dotenv())
+
+FIGURE_CACHE_DIR = os.getenv(
+    "FIGURE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "fortunato-wheels", "figure-cache"),
+)
+# set to 0 to only keep figures in worker memory
+FIGURE_CACHE_MAX_MB = float(os.getenv("FIGURE_CACHE_MAX_MB", 256))
+FIGURE_CACHE_TTL_S = float(os.getenv("FIGURE_CACHE_TTL_S", 24 * 60 * 60))
+FIGURE_CACHE_MEMORY_SIZE = int(os.getenv("FIGURE_CACHE_MEMORY_SIZE", 128))
+
+LOCK_FILE = "figures.lock"
+
+
+def figure_cache_key(*parts):
+    """Cache key of some normalized filter state.
+
+    Parameters
+    ----------
+    *parts
+        JSON serializable parts of the key, e.g. the data version and sorted
+        models.
+
+    Returns
+    -------
+    str
+        The key.
+    """
+    return json.dumps(parts, separators=(",", ":"))
+
+
+class FigureDiskCache:
+    def __init__(
+        self,
+        cache_dir=FIGURE_CACHE_DIR,
+        max_bytes=FIGURE_CACHE_MAX_MB * 1e6,
+        ttl_s=FIGURE_CACHE_TTL_S,
+    ):
+        """Serialized figures on local disk shared by every worker on a machine.
+
+        Each entry is a file named by the hash of its key, written with an atomic
+        rename so other workers never read a partial figure. Entries older than
+        `ttl_s` are treated as missing and once the files go over `max_bytes` the
+        oldest are removed under a file lock.
+
+        Parameters
+        ----------
+        cache_dir : str, optional
+            Directory to store the figures in, by default FIGURE_CACHE_DIR
+        max_bytes : float, optional
+            Maximum total size of the cached figures, by default FIGURE_CACHE_MAX_MB
+        ttl_s : float, optional
+            Seconds a figure is kept for, by default FIGURE_CACHE_TTL_S
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the eviction lock against other threads and other worker processes."""
+        with self._lock:
+            with open(os.path.join(self.cache_dir, LOCK_FILE), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file_path(self, key):
+        return os.path.join(
+            self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".json"
+        )
+
+    def get(self, key):
+        """Cached figures of a key.
+
+        Parameters
+        ----------
+        key : str
+            Key from figure_cache_key.
+
+        Returns
+        -------
+        str or None
+            The serialized figures, None if not cached or expired.
+        """
+        file_path = self._file_path(key)
+        try:
+            if time.time() - os.path.getmtime(file_path) > self.ttl_s:
+                data = None
+            else:
+                with open(file_path) as f:
+                    data = f.read()
+        except FileNotFoundError:
+            data = None
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Store serialized figures and remove the oldest if over the size limit.
+
+        Parameters
+        ----------
+        key : str
+            Key from figure_cache_key.
+        data : str
+            The serialized figures.
+        """
+        encoded = data.encode()
+        if len(encoded) > self.max_bytes:
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(encoded)
+        os.replace(tmp_path, self._file_path(key))
+
+        with self._locked():
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        now = time.time()
+        total_bytes = sum(size for _, size, _ in entries)
+        # expired and then oldest written first
+        for modified, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes and now - modified <= self.ttl_s:
+                break
+            total_bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Evicted {os.path.basename(path)} from figure cache")
+
+    def stats(self):
+        """Hit and miss counters of this worker's lookups.
+
+        Returns
+        -------
+        dict
+            `hits`, `misses` and `hit_rate`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class FigureCache:
+    def __init__(self, memory_size=FIGURE_CACHE_MEMORY_SIZE, disk_cache=None):
+        """Serialized figures in an in memory LRU backed by a disk tier shared
+        between workers.
+
+        Parameters
+        ----------
+        memory_size : int, optional
+            Figures kept in worker memory, by default FIGURE_CACHE_MEMORY_SIZE
+        disk_cache : FigureDiskCache, optional
+            Shared tier checked on a memory miss, by default None
+        """
+        self.memory = LRUCache(memory_size)
+        self.disk = disk_cache
+
+    def get(self, key):
+        """Cached figures of a key, figures found on disk are kept in memory.
+
+        Parameters
+        ----------
+        key : str
+            Key from figure_cache_key.
+
+        Returns
+        -------
+        str or None
+            The serialized figures, None if no tier has them.
+        """
+        data = self.memory.get(key)
+        if data is None and self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                self.memory.put(key, data)
+        return data
+
+    def put(self, key, data):
+        """Store serialized figures in every tier.
+
+        Parameters
+        ----------
+        key : str
+            Key from figure_cache_key.
+        data : str
+            The serialized figures.
+        """
+        self.memory.put(key, data)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, data)
+            except OSError as e:
+                logger.warning(f"Failed to write figures to the disk cache: {e}")
+
+    def stats(self):
+        """Hit rates of each tier, disk lookups only happen on memory misses.
+
+        Returns
+        -------
+        dict
+            `memory` and `disk` counters, see LRUCache.stats.
+        """
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+
+_figure_cache = None
+_figure_cache_lock = threading.Lock()
+
+
+def get_figure_cache():
+    """Shared FigureCache for the process, the disk tier is left out if disabled
+    with FIGURE_CACHE_MAX_MB=0.
+
+    Returns
+    -------
+    FigureCache
+        The shared figure cache.
+    """
+    global _figure_cache
+
+    with _figure_cache_lock:
+        if _figure_cache is None:
+            disk_cache = None
+            if FIGURE_CACHE_MAX_MB > 0:
+                try:
+                    disk_cache = FigureDiskCache()
+                except OSError as e:
+                    logger.warning(f"Figure disk cache disabled: {e}")
+            _figure_cache = FigureCache(disk_cache=disk_cache)
+        return _figure_cache
@@ -2,10 +2,95 @@
 # March 13, 2023
 
 import os
+import tempfile
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 
+from src.logs import get_logger
 
-def load_craigslist_data():
-    df = pd.read_csv(os.path.join("data", "processed", "cleaned-vehicles.csv"))
-    return df
+logger = get_logger(__name__)
+
+CRAIGSLIST_DATA_PATH = os.path.join("data", "processed", "cleaned-vehicles.csv")
+
+# strings are dictionary encoded so they load as pandas categoricals and
+# numbers use the smallest type that holds the cleaned data
+_STRING = pa.dictionary(pa.int32(), pa.string())
+CRAIGSLIST_SCHEMA = {
+    "manufacturer": _STRING,
+    "model": _STRING,
+    "price": pa.int32(),
+    "year": pa.int16(),
+    "condition": _STRING,
+    "cylinders": pa.float32(),
+    "fuel": _STRING,
+    "odometer": pa.float32(),
+    "transmission": _STRING,
+    "odometer_km": pa.int32(),
+}
+
+
+def _cache_path(data_path):
+    return os.path.splitext(data_path)[0] + ".parquet"
+
+
+def _read_csv(data_path):
+    return pv.read_csv(
+        data_path,
+        read_options=pv.ReadOptions(use_threads=True),
+        convert_options=pv.ConvertOptions(
+            column_types=CRAIGSLIST_SCHEMA, strings_can_be_null=True
+        ),
+    )
+
+
+def _write_cache(table, cache_path):
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(cache_path) or ".", suffix=".tmp"
+    )
+    os.close(fd)
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, cache_path)
+
+
+def load_craigslist_data(columns=None, data_path=CRAIGSLIST_DATA_PATH, use_cache=True):
+    """Load the cleaned craigslist ads with a fixed, compact schema.
+
+    The CSV is parsed with pyarrow's multithreaded reader and a parquet copy is
+    kept next to it, later loads read only the requested columns from that copy
+    until the CSV is modified.
+
+    Parameters
+    ----------
+    columns : list, optional
+        Columns to load, by default None loads all columns
+    data_path : str, optional
+        Path to the cleaned ads CSV, by default CRAIGSLIST_DATA_PATH
+    use_cache : bool, optional
+        Whether to read and write the parquet copy, by default True
+
+    Returns
+    -------
+    pd.DataFrame
+        Ads with categorical string columns and downcast numeric columns.
+    """
+    cache_path = _cache_path(data_path)
+
+    if (
+        use_cache
+        and os.path.exists(cache_path)
+        and os.path.getmtime(cache_path) >= os.path.getmtime(data_path)
+    ):
+        table = pq.read_table(cache_path, columns=columns)
+    else:
+        table = _read_csv(data_path)
+        if use_cache:
+            try:
+                _write_cache(table, cache_path)
+            except OSError as e:
+                logger.warning(f"Couldn't cache {data_path} as parquet: {e}")
+        if columns is not None:
+            table = table.select(columns)
+
+    return table.to_pandas()
@@ -0,0 +1,110 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, max_size=256):
+        """Bounded in memory cache dropping the least recently used entries, safe
+        to share between the threads of a worker.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Maximum number of entries, by default 256
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Cached value of a key, counting the lookup as a hit or miss.
+
+        Parameters
+        ----------
+        key : hashable
+            Key to look up.
+        default : object, optional
+            Returned when the key isn't cached, by default None
+
+        Returns
+        -------
+        object
+            The cached value or `default`.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Cache a value, dropping the least recently used entry when full.
+
+        Parameters
+        ----------
+        key : hashable
+            Key to store the value under.
+        value : object
+            Value to cache.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute_fn):
+        """Cached value of a key, computing and caching it on a miss.
+
+        Parameters
+        ----------
+        key : hashable
+            Key to look up.
+        compute_fn : callable
+            Called without arguments to compute the value on a miss.
+
+        Returns
+        -------
+        object
+            The cached or newly computed value.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute_fn()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit and miss counters of the cache.
+
+        Returns
+        -------
+        dict
+            `hits`, `misses`, `hit_rate` and current `size`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,109 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import numpy as np
+
+from src.data.compact_summaries import get_compact_summaries
+
+# models that aren't really models, left out of the model lists of every page
+INVALID_MODELS = ["other"]
+
+
+class MakeModelIndex:
+    def __init__(self, summaries, invalid_models=()):
+        """Make <-> model lookups built once per data version.
+
+        Model lists are sorted by name and leave out `invalid_models` so the
+        dropdown options can be generated straight from them.
+
+        Parameters
+        ----------
+        summaries : CompactSummaries
+            Compact summaries whose model codes the index refers to.
+        invalid_models : iterable, optional
+            Models that aren't really models, e.g. "other", by default ()
+        """
+        self.summaries = summaries
+        models = summaries.models
+        makes = summaries.makes[summaries.model_makes]
+
+        # every model, including invalid ones, can still be looked up by name
+        self.make_of = dict(zip(models, makes))
+
+        valid_codes = np.flatnonzero(~np.isin(models, list(invalid_models)))
+        self.model_codes = valid_codes[np.argsort(models[valid_codes], kind="stable")]
+        self.models = models[self.model_codes]
+
+        # position of each code in name order, used to sort arbitrary code sets
+        self._rank = np.empty(len(models), dtype=np.int64)
+        self._rank[np.argsort(models, kind="stable")] = np.arange(len(models))
+
+        model_code_makes = summaries.model_makes[self.model_codes]
+        self.make_model_codes = {
+            make: self.model_codes[model_code_makes == make_code]
+            for make_code, make in enumerate(summaries.makes)
+        }
+        self.models_by_make = {
+            make: tuple(models[codes]) for make, codes in self.make_model_codes.items()
+        }
+
+    def codes_for_makes(self, makes):
+        """Valid model codes of the given makes, sorted by model name.
+
+        Parameters
+        ----------
+        makes : list
+            Make names, unknown makes are ignored.
+
+        Returns
+        -------
+        np.ndarray
+            Model codes.
+        """
+        known = [make for make in makes if make in self.make_model_codes]
+        if len(known) == 1:
+            return self.make_model_codes[known[0]]
+        if len(known) == 0:
+            return np.array([], dtype=np.int64)
+        return self.sort_codes(
+            np.concatenate([self.make_model_codes[make] for make in known])
+        )
+
+    def sort_codes(self, codes):
+        """Sort model codes by model name.
+
+        Parameters
+        ----------
+        codes : np.ndarray
+            Model codes.
+
+        Returns
+        -------
+        np.ndarray
+            The codes in name order.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        return codes[np.argsort(self._rank[codes], kind="stable")]
+
+
+def get_make_model_index(snapshot, invalid_models=INVALID_MODELS):
+    """Make/model index of a snapshot, built once per data version.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to index.
+    invalid_models : iterable, optional
+        Models to leave out of the model lists, by default INVALID_MODELS so
+        every page shares one index per data version
+
+    Returns
+    -------
+    MakeModelIndex
+        The index.
+    """
+    invalid_models = tuple(invalid_models)
+    return snapshot.derived(
+        ("make_model_index", invalid_models),
+        lambda s: MakeModelIndex(get_compact_summaries(s), invalid_models),
+    )
@@ -0,0 +1,314 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import os
+import threading
+
+import numpy as np
+from dotenv import load_dotenv, find_dotenv
+
+from src.logs import get_logger
+from src.data.compact_summaries import LongSummary, get_compact_summaries
+
+logger = get_logger(__name__)
+
+load_dotenv(find_dotenv())
+
+SMOOTHERS = ["lowess", "rolling", "linear"]
+
+
+def smoother_setting(value, default="lowess"):
+    """Smoother named by a setting, the default if it isn't one of SMOOTHERS.
+
+    Parameters
+    ----------
+    value : str
+        Configured smoother, e.g. from PRICE_TREND_SMOOTHER.
+    default : str, optional
+        Smoother to fall back to, by default "lowess"
+
+    Returns
+    -------
+    str
+        One of SMOOTHERS.
+    """
+    if value in SMOOTHERS:
+        return value
+    logger.warning(
+        f"Unknown price trend smoother {value}, expected one of {SMOOTHERS}, "
+        f"using {default}"
+    )
+    return default
+
+
+# smoother of the price trend lines, one of SMOOTHERS
+PRICE_TREND_SMOOTHER = smoother_setting(os.getenv("PRICE_TREND_SMOOTHER", "lowess"))
+# average prices at or below this aren't plotted so aren't part of the trends
+MIN_TREND_PRICE = 500
+
+
+def lowess(x, y, frac=2 / 3, iterations=3):
+    """Locally weighted linear regression, same as statsmodels' lowess with its
+    defaults but vectorized over the points as a curve only has a few.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Points to smooth, x sorted ascending.
+    frac : float, optional
+        Fraction of the points used to fit each point, by default 2/3
+    iterations : int, optional
+        Robustifying iterations down weighting outliers, by default 3
+
+    Returns
+    -------
+    np.ndarray
+        Smoothed y at each x.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    k = int(frac * n + 1e-10)
+    if n < 3 or k < 2:
+        return y.copy()
+
+    distances = np.abs(x[None, :] - x[:, None])
+    # each point is fit from its k nearest neighbours, weighted by a tricube of
+    # their distance relative to the furthest of them
+    radius = np.sort(distances, axis=1)[:, k - 1]
+    scaled = np.divide(
+        distances, radius[:, None], out=np.zeros_like(distances), where=radius[:, None] > 0
+    )
+    neighbour_weights = np.where(scaled < 1, (1 - scaled**3) ** 3, 0.0)
+
+    robust_weights = np.ones(n)
+    for iteration in range(iterations + 1):
+        weights = neighbour_weights * robust_weights[None, :]
+        # a fit needs two points with weight, otherwise the point is kept as is
+        fit_ok = (weights > 1e-12).sum(axis=1) >= 2
+        weights = weights / np.where(fit_ok, weights.sum(axis=1), 1)[:, None]
+        x_mean = weights @ x
+        y_mean = weights @ y
+        x_dev = x[None, :] - x_mean[:, None]
+        x_var = np.maximum((weights * x_dev**2).sum(axis=1), 1e-12)
+        xy_cov = (weights * x_dev * y[None, :]).sum(axis=1)
+        fitted = np.where(fit_ok, y_mean + xy_cov / x_var * (x - x_mean), y)
+
+        if iteration == iterations:
+            break
+        # down weight points far from the fit relative to the median residual
+        residuals = np.abs(y - fitted)
+        median = np.median(residuals)
+        if median == 0:
+            scaled_residuals = (residuals > 0).astype(np.float64)
+        else:
+            scaled_residuals = np.minimum(residuals / (6 * median), 1)
+        robust_weights = (1 - scaled_residuals**2) ** 2
+    return fitted
+
+
+def rolling_mean(x, y, window=3):
+    """Centred moving average over `window` points, shorter at the ends.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Points to smooth, x sorted ascending.
+    window : int, optional
+        Number of points averaged, by default 3
+
+    Returns
+    -------
+    np.ndarray
+        Smoothed y at each x.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    sums = np.concatenate([[0.0], np.cumsum(y)])
+    positions = np.arange(len(y))
+    starts = np.maximum(positions - window // 2, 0)
+    stops = np.minimum(positions + window // 2 + 1, len(y))
+    return (sums[stops] - sums[starts]) / (stops - starts)
+
+
+def linear_fit(x, y):
+    """Least squares straight line through the points.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Points to fit.
+
+    Returns
+    -------
+    np.ndarray
+        Fitted y at each x.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) < 2 or np.all(x == x[0]):
+        return np.full(len(y), y.mean() if len(y) > 0 else np.nan)
+    slope, intercept = np.polyfit(x, y, 1)
+    return slope * x + intercept
+
+
+def smooth(x, y, smoother=PRICE_TREND_SMOOTHER):
+    """Smooth one curve with one of SMOOTHERS.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Points to smooth, x sorted ascending.
+    smoother : str, optional
+        One of SMOOTHERS, by default PRICE_TREND_SMOOTHER
+
+    Returns
+    -------
+    np.ndarray
+        Smoothed y at each x.
+
+    Raises
+    ------
+    ValueError
+        If the smoother isn't one of SMOOTHERS.
+    """
+    if smoother == "lowess":
+        return lowess(x, y)
+    if smoother == "rolling":
+        return rolling_mean(x, y)
+    if smoother == "linear":
+        return linear_fit(x, y)
+    raise ValueError(f"Unknown smoother {smoother}, expected one of {SMOOTHERS}")
+
+
+def trend_summary(summary, model_codes, smoother=PRICE_TREND_SMOOTHER):
+    """Smoothed price by age of some models, e.g. of a filtered price summary.
+
+    Parameters
+    ----------
+    summary : LongSummary
+        Average price by model and age.
+    model_codes : np.ndarray
+        Codes of the models to smooth.
+    smoother : str, optional
+        One of SMOOTHERS, by default PRICE_TREND_SMOOTHER
+
+    Returns
+    -------
+    LongSummary
+        Smoothed price at each age of the models, prices at or below
+        MIN_TREND_PRICE are left out the same as in the plots.
+    """
+    codes, keys, values = [], [], []
+    for code in np.unique(np.asarray(model_codes, dtype=np.int64)):
+        start, stop = summary.offsets[code], summary.offsets[code + 1]
+        ages = summary.keys[start:stop]
+        prices = summary.values[start:stop]
+        keep = prices > MIN_TREND_PRICE
+        ages, prices = ages[keep], prices[keep]
+        order = np.argsort(ages, kind="stable")
+        ages, prices = ages[order], prices[order]
+
+        codes.append(np.full(len(ages), code, dtype=np.int64))
+        keys.append(ages)
+        values.append(smooth(ages, prices, smoother).astype(np.float32))
+
+    num_models = len(summary.offsets) - 1
+    if len(codes) == 0:
+        return LongSummary(
+            np.array([], dtype=np.int64),
+            summary.keys[:0],
+            np.array([], dtype=np.float32),
+            num_models,
+        )
+    return LongSummary(
+        np.concatenate(codes), np.concatenate(keys), np.concatenate(values), num_models
+    )
+
+
+class PriceTrends:
+    def __init__(self, price_summary, smoother=PRICE_TREND_SMOOTHER):
+        """Smoothed price by age curves of every model, each fit the first time
+        it's plotted and kept for the rest of the data version.
+
+        Parameters
+        ----------
+        price_summary : LongSummary
+            Average price by model and age.
+        smoother : str, optional
+            One of SMOOTHERS, by default PRICE_TREND_SMOOTHER
+        """
+        if smoother not in SMOOTHERS:
+            raise ValueError(f"Unknown smoother {smoother}, expected one of {SMOOTHERS}")
+        self.price_summary = price_summary
+        self.smoother = smoother
+        self._curves = {}
+        self._lock = threading.Lock()
+
+    def curve(self, model_code):
+        """Ages and smoothed prices of one model.
+
+        Parameters
+        ----------
+        model_code : int
+            Code of the model.
+
+        Returns
+        -------
+        LongSummary
+            The model's curve.
+        """
+        model_code = int(model_code)
+        curve = self._curves.get(model_code)
+        if curve is None:
+            curve = trend_summary(self.price_summary, [model_code], self.smoother)
+            with self._lock:
+                curve = self._curves.setdefault(model_code, curve)
+        return curve
+
+    def summary(self, model_codes):
+        """Smoothed prices of some models.
+
+        Parameters
+        ----------
+        model_codes : np.ndarray
+            Codes of the models.
+
+        Returns
+        -------
+        LongSummary
+            Curves of the models, empty for every other model.
+        """
+        num_models = len(self.price_summary.offsets) - 1
+        curves = [
+            self.curve(code)
+            for code in np.unique(np.asarray(model_codes, dtype=np.int64))
+        ]
+        if len(curves) == 0:
+            return trend_summary(self.price_summary, [], self.smoother)
+        return LongSummary(
+            np.concatenate([curve.model_codes for curve in curves]),
+            np.concatenate([curve.keys for curve in curves]),
+            np.concatenate([curve.values for curve in curves]),
+            num_models,
+        )
+
+
+def get_price_trends(snapshot, smoother=PRICE_TREND_SMOOTHER):
+    """Price trend curves of a snapshot's price summary, kept per data version.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to smooth the prices of.
+    smoother : str, optional
+        One of SMOOTHERS, by default PRICE_TREND_SMOOTHER
+
+    Returns
+    -------
+    PriceTrends
+        The curves.
+    """
+    return snapshot.derived(
+        f"price_trends_{smoother}",
+        lambda s: PriceTrends(get_compact_summaries(s).price, smoother),
+    )
@@ -0,0 +1,297 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import os
+import json
+import time
+import fcntl
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from dotenv import load_dotenv, find_dotenv
+
+from src.logs import get_logger
+
+logger = get_logger(__name__)
+
+load_dotenv(find_dotenv())
+
+SHARED_ARROW_DIR = os.getenv(
+    "SHARED_ARROW_DIR",
+    os.path.join(tempfile.gettempdir(), "fortunato-wheels", "arrow"),
+)
+# how long a worker can reuse a file written by another worker before refreshing it
+SHARED_ARROW_MAX_AGE_S = float(os.getenv("SHARED_ARROW_MAX_AGE_S", 3600))
+
+INDEX_METADATA_KEY = b"fortunato_index_columns"
+CATEGORIES_METADATA_KEY = b"fortunato_categories"
+
+
+def _frame_to_table(df):
+    """Convert a DataFrame to an Arrow table that can be read back zero-copy.
+
+    Numeric columns are converted without turning NaN into nulls, columns with
+    nulls would need a copy to be filled with NaN when converted back to pandas.
+    Categorical columns are stored as their integer codes, -1 for missing, with
+    the categories in the schema metadata, Arrow dictionary arrays with nulls
+    are copied when converted to pandas.
+    """
+    index_columns = []
+    if not isinstance(df.index, pd.RangeIndex):
+        index_columns = [
+            name if name is not None else f"__index_level_{i}__"
+            for i, name in enumerate(df.index.names)
+        ]
+        df = df.reset_index(names=index_columns)
+    elif df.index.start != 0 or df.index.step != 1:
+        df = df.reset_index(drop=True)
+
+    arrays = {}
+    categories = {}
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            arrays[str(column)] = pa.array(df[column].cat.codes.to_numpy())
+            categories[str(column)] = df[column].cat.categories.tolist()
+            continue
+        values = df[column].to_numpy()
+        if values.dtype.kind in "biuf":
+            arrays[str(column)] = pa.array(values)
+        else:
+            arrays[str(column)] = pa.array(values, from_pandas=True)
+
+    table = pa.table(arrays)
+    metadata = {INDEX_METADATA_KEY: ",".join(index_columns).encode()}
+    if categories:
+        metadata[CATEGORIES_METADATA_KEY] = json.dumps(categories).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def _categorical_column(table, column, categories):
+    """Categorical column over the codes stored in a table without copying them."""
+    codes = table.column(column)
+    if codes.num_chunks == 1:
+        codes = codes.chunk(0).to_numpy(zero_copy_only=True)
+    else:
+        codes = codes.to_numpy()
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=pd.Index(categories)),
+        name=column,
+        copy=False,
+    )
+
+
+def _table_to_frame(table):
+    metadata = table.schema.metadata or {}
+    categories = json.loads(metadata.get(CATEGORIES_METADATA_KEY, b"{}"))
+    categories = {
+        column: values
+        for column, values in categories.items()
+        if column in table.column_names
+    }
+    if categories:
+        others = table.drop(list(categories)).to_pandas(split_blocks=True)
+        # columns are put back in order without copying the memory-mapped values
+        df = pd.concat(
+            [
+                _categorical_column(table, column, categories[column])
+                if column in categories
+                else others[column]
+                for column in table.column_names
+            ],
+            axis=1,
+            copy=False,
+        )
+    else:
+        df = table.to_pandas(split_blocks=True)
+
+    index_columns = metadata.get(INDEX_METADATA_KEY, b"")
+    if index_columns:
+        df = df.set_index(index_columns.decode().split(","))
+
+    return df
+
+
+class SharedArrowStore:
+    def __init__(
+        self,
+        backend,
+        store_dir=SHARED_ARROW_DIR,
+        max_age_s=SHARED_ARROW_MAX_AGE_S,
+    ):
+        """Memory-mapped Arrow copies of blobs shared by all workers on a machine.
+
+        The first worker to ask for a blob downloads it through `backend` and
+        writes it as an Arrow IPC file, every worker then memory maps that file.
+        Numeric columns are returned without copying out of the map so the pages
+        live once in the OS page cache no matter how many workers are running.
+        DataFrames returned are read-only.
+
+        Parameters
+        ----------
+        backend : object
+            Where the blobs come from, anything with a `load_parquet(blob_path)`
+            method such as AzureBlob.
+        store_dir : str, optional
+            Directory for the Arrow files, by default SHARED_ARROW_DIR
+        max_age_s : float, optional
+            Age in seconds after which a file is downloaded again, by default
+            SHARED_ARROW_MAX_AGE_S
+        """
+        self.backend = backend
+        self.store_dir = store_dir
+        self.max_age_s = max_age_s
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def _file_path(self, blob_path, version=None):
+        name = blob_path.replace("/", "__")
+        if version is not None:
+            name += f"@{version}"
+        return os.path.join(self.store_dir, name + ".arrow")
+
+    def _is_fresh(self, file_path, version=None):
+        # files keyed by a content hash never go stale
+        if version is not None:
+            return os.path.exists(file_path)
+        try:
+            return time.time() - os.path.getmtime(file_path) < self.max_age_s
+        except FileNotFoundError:
+            return False
+
+    def load_parquet(self, blob_path, columns=None, filters=None, version=None):
+        """Load a parquet blob through the shared memory-mapped copy.
+
+        Parameters
+        ----------
+        blob_path : str
+            Path to the parquet file in the container
+        columns : list, optional
+            Columns to load, by default None loads all columns
+        filters : list, optional
+            Row filters in the pyarrow.parquet.read_table format, by default None
+        version : str, optional
+            Content hash of the blob, e.g. from the summary manifest. The shared file
+            is then keyed by it instead of expiring after `max_age_s`, by default
+            None
+
+        Returns
+        -------
+        pd.DataFrame
+            Read-only pandas DataFrame backed by the memory-mapped file.
+        """
+        file_path = self._ensure_file(
+            blob_path, version, lambda: self.backend.load_parquet(blob_path)
+        )
+        return self._map(file_path, columns, filters)
+
+    def load_merged_parquet(self, blob_paths, merge_fn, version=None):
+        """Load a summary written in several parquet blobs as one shared
+        memory-mapped copy of the merged parts.
+
+        Parameters
+        ----------
+        blob_paths : list
+            Paths of the parts in the container, the first names the shared file.
+        merge_fn : callable
+            Called with the DataFrame of every part to merge them into one.
+        version : str, optional
+            Hash of every part, see `load_parquet`, by default None
+
+        Returns
+        -------
+        pd.DataFrame
+            Read-only pandas DataFrame backed by the memory-mapped file.
+        """
+        file_path = self._ensure_file(
+            blob_paths[0],
+            version,
+            lambda: merge_fn([self.backend.load_parquet(path) for path in blob_paths]),
+        )
+        return self._map(file_path)
+
+    def _ensure_file(self, blob_path, version, load_fn):
+        """Write the shared file of a blob if it's missing or stale."""
+        file_path = self._file_path(blob_path, version)
+
+        if not self._is_fresh(file_path, version):
+            # only one worker downloads the blob, the rest wait and map its file
+            with open(file_path + ".lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    if not self._is_fresh(file_path, version):
+                        self._write(file_path, load_fn())
+                        if version is not None:
+                            self._remove_old_versions(blob_path, file_path)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return file_path
+
+    def _map(self, file_path, columns=None, filters=None):
+        table = ipc.open_file(pa.memory_map(file_path)).read_all()
+        if filters is not None:
+            table = table.filter(pq.filters_to_expression(filters))
+        if columns is not None:
+            index_columns = (table.schema.metadata or {}).get(INDEX_METADATA_KEY, b"")
+            index_columns = index_columns.decode().split(",") if index_columns else []
+            table = table.select(index_columns + list(columns))
+
+        return _table_to_frame(table)
+
+    def _write(self, file_path, df):
+        table = _frame_to_table(df)
+
+        # write to a temporary file and rename it so workers that already mapped
+        # the old file keep a consistent copy
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        os.close(fd)
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, file_path)
+
+        logger.debug(f"Wrote shared arrow file {file_path}")
+
+    def _remove_old_versions(self, blob_path, current_path):
+        """Delete other versioned copies of a blob not written within `max_age_s`,
+        workers that still have them mapped keep their copy until they unmap it."""
+        prefix = blob_path.replace("/", "__") + "@"
+        for file in os.listdir(self.store_dir):
+            file_path = os.path.join(self.store_dir, file)
+            if not file.startswith(prefix) or file_path.startswith(current_path):
+                continue
+            if file.endswith(".arrow") and self._is_fresh(file_path):
+                continue
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+    def load_json(self, blob_path):
+        """Load a JSON blob straight from the backend, these aren't shared.
+
+        Parameters
+        ----------
+        blob_path : str
+            Path to the JSON file in the container
+
+        Returns
+        -------
+        dict
+            Parsed JSON.
+        """
+        return self.backend.load_json(blob_path)
+
+    def invalidate(self, blob_path):
+        """Remove the shared copy of a blob so the next load downloads it again.
+
+        Parameters
+        ----------
+        blob_path : str
+            Path to the parquet file in the container
+        """
+        try:
+            os.remove(self._file_path(blob_path))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,183 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import os
+import json
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+import pyarrow.parquet as pq
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv())
+
+# which backend the app loads data from, "azure" or "local"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "azure")
+# root directory blob paths are relative to for the local backend
+LOCAL_DATA_DIR = os.getenv("LOCAL_DATA_DIR", "data")
+
+LocalBlobProperties = namedtuple(
+    "LocalBlobProperties", ["name", "size", "last_modified"]
+)
+
+
+class StorageBackend(ABC):
+    """Where the processed data is loaded from. Blob paths are always "/"
+    separated and relative to the container/root of the backend."""
+
+    @abstractmethod
+    def list_blobs(self):
+        """List all blobs in the backend
+
+        Returns
+        -------
+        iterable
+            Blobs with at least `name`, `size` and `last_modified` attributes.
+        """
+
+    @abstractmethod
+    def load_parquet(self, blob_path, columns=None, filters=None):
+        """Load a parquet file
+
+        Parameters
+        ----------
+        blob_path : str
+            Path to the parquet file
+        columns : list, optional
+            Columns to load, by default None loads all columns
+        filters : list, optional
+            Row filters in the pyarrow.parquet.read_table format, by default None
+
+        Returns
+        -------
+        pd.DataFrame
+            Pandas DataFrame of the parquet file
+        """
+
+    @abstractmethod
+    def load_json(self, blob_path):
+        """Load a JSON file, e.g. the summary manifest
+
+        Parameters
+        ----------
+        blob_path : str
+            Path to the JSON file
+
+        Returns
+        -------
+        dict
+            Parsed JSON.
+        """
+
+
+class LocalBlob(StorageBackend):
+    def __init__(self, data_dir=LOCAL_DATA_DIR):
+        """Storage backend reading from a local directory laid out like the blob
+        container, e.g. `<data_dir>/processed/avg_price_summary.parquet`.
+
+        Parameters
+        ----------
+        data_dir : str, optional
+            Root directory of the data, by default LOCAL_DATA_DIR
+        """
+        self.data_dir = data_dir
+
+    def _path(self, blob_path):
+        return os.path.join(self.data_dir, *blob_path.split("/"))
+
+    def list_blobs(self):
+        """List all files under the data directory
+
+        Returns
+        -------
+        list
+            LocalBlobProperties of every file with "/" separated relative names.
+        """
+        blobs = []
+        for root, _, files in os.walk(self.data_dir):
+            for file in sorted(files):
+                path = os.path.join(root, file)
+                name = os.path.relpath(path, self.data_dir).replace(os.sep, "/")
+                stat = os.stat(path)
+                blobs.append(LocalBlobProperties(name, stat.st_size, stat.st_mtime))
+        return blobs
+
+    def load_parquet(self, blob_path, columns=None, filters=None):
+        """Load a parquet file from the data directory
+
+        Parameters
+        ----------
+        blob_path : str
+            Path to the parquet file relative to the data directory
+        columns : list, optional
+            Columns to load, by default None loads all columns
+        filters : list, optional
+            Row filters in the pyarrow.parquet.read_table format, by default None
+
+        Returns
+        -------
+        pd.DataFrame
+            Pandas DataFrame of the parquet file
+
+        Raises
+        ------
+        FileNotFoundError
+            If the blob_path does not exist in the data directory
+        """
+        path = self._path(blob_path)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{blob_path} not found in {self.data_dir}")
+
+        table = pq.read_table(
+            path,
+            columns=columns,
+            filters=filters,
+            memory_map=True,
+            use_pandas_metadata=True,
+        )
+        return table.to_pandas()
+
+    def load_json(self, blob_path):
+        """Load a JSON file from the data directory
+
+        Parameters
+        ----------
+        blob_path : str
+            Path to the JSON file relative to the data directory
+
+        Returns
+        -------
+        dict
+            Parsed JSON.
+        """
+        with open(self._path(blob_path)) as f:
+            return json.load(f)
+
+
+def get_storage_backend(backend=STORAGE_BACKEND):
+    """Create the storage backend selected by configuration.
+
+    Parameters
+    ----------
+    backend : str, optional
+        "azure" or "local", by default the STORAGE_BACKEND environment variable
+
+    Returns
+    -------
+    StorageBackend
+        The storage backend.
+
+    Raises
+    ------
+    ValueError
+        If the backend isn't one of the supported options.
+    """
+    if backend == "azure":
+        # imported here as the Azure backend itself depends on this module
+        from src.data.azure_blob_storage import AzureBlob
+
+        return AzureBlob()
+    elif backend == "local":
+        return LocalBlob()
+    else:
+        raise ValueError(f"Unknown storage backend {backend}, expected azure or local")
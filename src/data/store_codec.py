@@ -0,0 +1,212 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import json
+import zlib
+import base64
+
+import numpy as np
+import pandas as pd
+
+CODEC_NAME = "columnar-v1"
+
+
+def _pack(data):
+    return base64.b64encode(zlib.compress(data, 6)).decode()
+
+
+def _unpack(text):
+    return zlib.decompress(base64.b64decode(text))
+
+
+def _smallest_int_dtype(values):
+    if len(values) == 0:
+        return np.dtype(np.int8)
+    low, high = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def is_encoded(payload):
+    """Whether store data was written by `encode_frame`.
+
+    Parameters
+    ----------
+    payload : object
+        Data from a dcc.Store.
+
+    Returns
+    -------
+    bool
+        True if the payload can be decoded with `decode_frame`.
+    """
+    return isinstance(payload, dict) and payload.get("codec") == CODEC_NAME
+
+
+def parse_payload(payload):
+    """Parse store data that was kept as a serialized JSON string.
+
+    Parameters
+    ----------
+    payload : object
+        Data from a dcc.Store.
+
+    Returns
+    -------
+    object
+        The parsed payload, anything other than a string is returned as is.
+    """
+    if isinstance(payload, str):
+        return json.loads(payload)
+    return payload
+
+
+def encode_frame(df, version=None, float_dtype="float32"):
+    """Encode a DataFrame for a dcc.Store as a few compressed typed arrays.
+
+    Numeric columns with the same type are stacked into one block, integers are
+    stored in the smallest type that holds them and floats as `float_dtype`.
+    Strings are stored as integer codes into a list of unique values. Each block
+    is compressed and base64 encoded so the JSON holds a handful of strings rather
+    than a nested dict with every cell keyed by its index.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Frame to encode, the index is dropped unless it isn't a default RangeIndex.
+    version : str, optional
+        Data version the frame belongs to, lets the server skip decoding when it
+        holds the same version, by default None
+    float_dtype : str, optional
+        Type to store float columns as, by default "float32" which is plenty for
+        prices and fractions. None keeps the original precision.
+
+    Returns
+    -------
+    dict
+        JSON serializable payload.
+    """
+    index_name = None
+    if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0):
+        index_name = df.index.name or "__index__"
+        df = df.reset_index(names=index_name)
+
+    blocks = {}
+    strings = []
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype.kind in "biuf":
+            blocks.setdefault(values.dtype.str, []).append(column)
+        else:
+            codes, uniques = pd.factorize(df[column])
+            strings.append(
+                {
+                    "column": str(column),
+                    "values": _pack("\n".join(str(v) for v in uniques).encode()),
+                    "codes": _pack(codes.astype(np.int32).tobytes()),
+                }
+            )
+
+    encoded_blocks = []
+    for dtype, columns in blocks.items():
+        data = df[columns].to_numpy(dtype=dtype)
+        if data.dtype.kind in "iu":
+            storage_dtype = _smallest_int_dtype(data)
+        elif data.dtype.kind == "f" and float_dtype is not None:
+            storage_dtype = np.dtype(float_dtype)
+        else:
+            storage_dtype = data.dtype
+        # column major so each column's values sit together and compress well
+        data = np.ascontiguousarray(data.T, dtype=storage_dtype)
+        encoded_blocks.append(
+            {
+                "dtype": dtype,
+                "storage_dtype": storage_dtype.str,
+                "columns": _pack("\n".join(str(c) for c in columns).encode()),
+                "data": _pack(data.tobytes()),
+            }
+        )
+
+    return {
+        "codec": CODEC_NAME,
+        "version": version,
+        "length": len(df),
+        "order": _pack("\n".join(str(c) for c in df.columns).encode()),
+        "index": index_name,
+        "blocks": encoded_blocks,
+        "strings": strings,
+    }
+
+
+def serialize_frame(df, version=None, float_dtype="float32"):
+    """Encode a DataFrame with `encode_frame` and serialize it to JSON.
+
+    The string can be cached and sent as the dcc.Store data as is so the frame
+    is only encoded and serialized once per data version.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Frame to encode.
+    version : str, optional
+        Data version the frame belongs to, by default None
+    float_dtype : str, optional
+        Type to store float columns as, by default "float32"
+
+    Returns
+    -------
+    str
+        Compact JSON of the encoded payload.
+    """
+    return json.dumps(
+        encode_frame(df, version=version, float_dtype=float_dtype),
+        separators=(",", ":"),
+    )
+
+
+def decode_frame(payload):
+    """Decode store data back into a DataFrame.
+
+    Parameters
+    ----------
+    payload : dict or str
+        Output of `encode_frame` or `serialize_frame`, or DataFrame.to_dict()
+        style data from sessions stored before the codec was used.
+
+    Returns
+    -------
+    pd.DataFrame
+        The decoded frame.
+    """
+    payload = parse_payload(payload)
+    if not is_encoded(payload):
+        return pd.DataFrame.from_dict(payload, orient="columns")
+
+    length = payload["length"]
+    columns = {}
+    for block in payload["blocks"]:
+        names = _unpack(block["columns"]).decode().split("\n")
+        data = np.frombuffer(
+            _unpack(block["data"]), dtype=block["storage_dtype"]
+        ).reshape(len(names), length)
+        data = data.astype(block["dtype"], copy=False)
+        columns.update(zip(names, data))
+
+    for string in payload["strings"]:
+        codes = np.frombuffer(_unpack(string["codes"]), dtype=np.int32)
+        values = _unpack(string["values"]).decode()
+        values = np.array((values.split("\n") if values else []) + [None], dtype=object)
+        # factorize marks missing values with -1 which picks the trailing None
+        columns[string["column"]] = values[codes]
+
+    order = _unpack(payload["order"]).decode()
+    order = order.split("\n") if order else []
+    df = pd.DataFrame({column: columns[column] for column in order})
+    if payload["index"] is not None:
+        df = df.set_index(payload["index"])
+        if payload["index"] == "__index__":
+            df.index.name = None
+    return df
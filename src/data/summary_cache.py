@@ -0,0 +1,568 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+
+import os
+import json
+import threading
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from dotenv import load_dotenv, find_dotenv
+
+from src.logs import get_logger
+from src.data.storage import get_storage_backend
+from src.data.shared_store import SharedArrowStore
+from src.data.ad_store import merge_ad_frames
+from src.data.store_codec import (
+    serialize_frame,
+    parse_payload,
+    decode_frame,
+    is_encoded,
+)
+
+logger = get_logger(__name__)
+
+load_dotenv(find_dotenv())
+
+# seconds between checks of the manifest for new summary data, 0 to disable
+SUMMARY_REFRESH_INTERVAL_S = float(os.getenv("SUMMARY_REFRESH_INTERVAL_S", 300))
+# "server" keeps the summaries in worker memory and only puts the data version in
+# the session stores, "client" sends the encoded summaries to the browser
+SUMMARY_STORE_MODE = os.getenv("SUMMARY_STORE_MODE", "server")
+
+# summary name -> path of the processed parquet in blob storage
+SUMMARY_BLOBS = {
+    "price_summary": "processed/avg_price_summary.parquet",
+    "mileage_summary": "processed/mileage_distribution_summary.parquet",
+    "num_ads_summary": "processed/num_ads_summary.parquet",
+    "makes_models": "processed/makes_models.parquet",
+    "ads_cube": "processed/ads_cube.parquet",
+    "ads": "processed/ads.parquet",
+}
+# summaries the app can run without, e.g. when serving data built before they existed
+OPTIONAL_SUMMARIES = {"ads_cube", "ads"}
+# summaries that can be written in parts, listed under `parts` in the manifest, and
+# the function merging the parts back into one frame
+SUMMARY_PART_MERGERS = {"ads": merge_ad_frames}
+# lists the content hash of every processed parquet, written with the summaries
+MANIFEST_BLOB = "processed/manifest.json"
+
+
+def shared_storage_backend():
+    """Configured storage backend behind a memory-mapped store shared by every
+    worker on the machine."""
+    return SharedArrowStore(get_storage_backend())
+
+
+class SummarySnapshot:
+    def __init__(
+        self,
+        version,
+        frames,
+        load_times_ms=None,
+        load_wall_time_ms=None,
+        file_hashes=None,
+    ):
+        """Immutable set of summary DataFrames belonging to one data version.
+
+        Anything derived from the summaries (dicts for the session stores,
+        lookup indexes etc.) should be built through `derived` so it is computed
+        once per data version and shared by every session in the worker.
+
+        Parameters
+        ----------
+        version : str or None
+            Identifier of the data version, None for snapshots built from session
+            store data that don't belong to a known version.
+        frames : dict
+            Mapping of summary name to pd.DataFrame.
+        load_times_ms : dict, optional
+            Time taken to load each summary in ms, by default None
+        load_wall_time_ms : float, optional
+            Total time taken to load all summaries in ms, by default None
+        file_hashes : dict, optional
+            Content hash of each summary from the manifest, by default None
+        """
+        self.version = version
+        self.frames = frames
+        self.load_times_ms = load_times_ms or {}
+        self.load_wall_time_ms = load_wall_time_ms
+        self.file_hashes = file_hashes or {}
+        self._derived = {}
+        # re-entrant as derived values are often built from other derived values
+        self._derived_lock = threading.RLock()
+
+    def __getitem__(self, name):
+        return self.frames[name]
+
+    def derived(self, key, build_fn):
+        """Return a value computed from this snapshot, building it on first use.
+
+        Parameters
+        ----------
+        key : hashable
+            Name of the derived value.
+        build_fn : callable
+            Called with the snapshot to build the value if not already cached.
+
+        Returns
+        -------
+        object
+            The cached derived value.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = build_fn(self)
+            return self._derived[key]
+
+
+def _frames_version(frames):
+    """Hash the contents of the summary frames into a short version id."""
+    hasher = hashlib.sha1()
+    for name in sorted(frames):
+        hasher.update(name.encode())
+        hasher.update(
+            pd.util.hash_pandas_object(frames[name], index=True).values.tobytes()
+        )
+    return hasher.hexdigest()[:12]
+
+
+class SummaryCache:
+    def __init__(
+        self,
+        backend_factory=shared_storage_backend,
+        blob_paths=SUMMARY_BLOBS,
+        manifest_path=MANIFEST_BLOB,
+    ):
+        """Process wide cache of the summary data shared by all sessions.
+
+        The current snapshot is swapped for a new one when `refresh` finds the
+        manifest has changed. The previous snapshot is kept around so sessions
+        loaded with it keep seeing a consistent version.
+
+        Parameters
+        ----------
+        backend_factory : callable, optional
+            Returns an object with a `load_parquet(blob_path)` method, by default
+            shared_storage_backend
+        blob_paths : dict, optional
+            Mapping of summary name to blob path, by default SUMMARY_BLOBS
+        manifest_path : str, optional
+            Blob path of the manifest with the content hash of each summary, by
+            default MANIFEST_BLOB
+        """
+        self.backend_factory = backend_factory
+        self.blob_paths = blob_paths
+        self.manifest_path = manifest_path
+        self._snapshot = None
+        self._previous = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresher = None
+        self._listeners = []
+
+    @property
+    def is_loaded(self):
+        return self._snapshot is not None
+
+    def add_listener(self, listener):
+        """Call a function with every snapshot this cache loads or swaps in, e.g.
+        to warm caches for the new data.
+
+        Parameters
+        ----------
+        listener : callable
+            Called with the new SummarySnapshot from the thread that loaded it.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, snapshot):
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.error(f"Summary data listener failed: {e}")
+
+    def snapshot(self):
+        """Return the current snapshot, loading it if this worker has none yet.
+
+        Returns
+        -------
+        SummarySnapshot
+            Current summary data.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            # another thread may have loaded the data while we waited
+            if self._snapshot is not None:
+                return self._snapshot
+            snapshot = self._snapshot = self._load()
+        self._notify(snapshot)
+        return snapshot
+
+    def get_version(self, version):
+        """Snapshot of a specific data version if this worker still holds it.
+
+        Parameters
+        ----------
+        version : str
+            Data version to look up.
+
+        Returns
+        -------
+        SummarySnapshot or None
+            The current or previous snapshot with that version, None if neither is.
+        """
+        for snapshot in (self._snapshot, self._previous):
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+        return None
+
+    def ensure_loaded(self):
+        """Load the summaries if needed.
+
+        Returns
+        -------
+        dict or None
+            Load time in ms per summary if this call loaded the data, otherwise
+            None when the data was already cached.
+        """
+        if self._snapshot is not None:
+            return None
+
+        with self._lock:
+            if self._snapshot is not None:
+                return None
+            snapshot = self._snapshot = self._load()
+        self._notify(snapshot)
+        return snapshot.load_times_ms
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next access reloads the data."""
+        with self._lock:
+            self._snapshot = None
+            self._previous = None
+
+    def _read_manifest(self, backend):
+        if not hasattr(backend, "load_json"):
+            return None
+        try:
+            return backend.load_json(self.manifest_path)
+        except Exception as e:
+            logger.debug(f"No summary manifest available at {self.manifest_path}: {e}")
+            return None
+
+    def _load(self, current=None):
+        backend = self.backend_factory()
+        manifest = self._read_manifest(backend)
+        file_hashes = {}
+        parts = {}
+        if manifest is not None:
+            files = manifest["files"]
+            file_hashes = {
+                name: files.get(blob_path, {}).get("sha256")
+                for name, blob_path in self.blob_paths.items()
+            }
+            # summaries in parts are versioned by the hashes of every part
+            for name, blob_path in self.blob_paths.items():
+                part_paths = manifest.get("parts", {}).get(blob_path, [])
+                if name not in SUMMARY_PART_MERGERS or len(part_paths) == 0:
+                    continue
+                parts[name] = part_paths
+                hashes = [file_hashes[name]] + [
+                    files.get(part_path, {}).get("sha256") for part_path in part_paths
+                ]
+                file_hashes[name] = (
+                    None
+                    if None in hashes
+                    else hashlib.sha256("".join(hashes).encode()).hexdigest()
+                )
+
+        # anything unchanged since the current snapshot is reused as is
+        reused = {}
+        if current is not None:
+            reused = {
+                name: current.frames[name]
+                for name, file_hash in file_hashes.items()
+                if file_hash is not None and current.file_hashes.get(name) == file_hash
+            }
+        to_load = {
+            name: blob_path
+            for name, blob_path in self.blob_paths.items()
+            if name not in reused
+        }
+
+        def timed_load(name, blob_path):
+            start_time = time.time()
+            if name in parts:
+                blob_paths = [blob_path] + parts[name]
+                merge_fn = SUMMARY_PART_MERGERS[name]
+                if isinstance(backend, SharedArrowStore):
+                    df = backend.load_merged_parquet(
+                        blob_paths, merge_fn, version=file_hashes.get(name)
+                    )
+                else:
+                    df = merge_fn([backend.load_parquet(path) for path in blob_paths])
+            elif isinstance(backend, SharedArrowStore):
+                df = backend.load_parquet(blob_path, version=file_hashes.get(name))
+            else:
+                df = backend.load_parquet(blob_path)
+            return df, round((time.time() - start_time) * 1000, 0)
+
+        # fetch all summaries at once so a cold load waits for the slowest blob
+        # rather than the sum of every round trip
+        start_time = time.time()
+        results = {}
+        if to_load:
+            with ThreadPoolExecutor(max_workers=len(to_load)) as executor:
+                futures = {
+                    name: executor.submit(timed_load, name, blob_path)
+                    for name, blob_path in to_load.items()
+                }
+                for name, future in futures.items():
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        if name not in OPTIONAL_SUMMARIES:
+                            raise
+                        logger.warning(f"Optional summary {name} not loaded: {e}")
+        load_wall_time_ms = round((time.time() - start_time) * 1000, 0)
+
+        frames = {name: df for name, (df, _) in results.items()}
+        frames.update(reused)
+        load_times_ms = {name: ms for name, (_, ms) in results.items()}
+
+        if manifest is not None:
+            version = manifest["version"]
+        else:
+            version = _frames_version(frames)
+        logger.debug(
+            f"Loaded summary data version {version} in {load_wall_time_ms} ms ({load_times_ms})"
+        )
+
+        return SummarySnapshot(
+            version, frames, load_times_ms, load_wall_time_ms, file_hashes
+        )
+
+    def refresh(self):
+        """Check the manifest and swap in a new snapshot if the data has changed.
+
+        Only the summaries whose hash changed are downloaded. The new snapshot is
+        built while the current one keeps serving requests and then swapped in
+        at once.
+
+        Returns
+        -------
+        bool
+            True if a new data version was swapped in.
+        """
+        with self._refresh_lock:
+            current = self._snapshot
+            if current is None:
+                return False
+
+            manifest = self._read_manifest(self.backend_factory())
+            if manifest is None or manifest["version"] == current.version:
+                return False
+
+            new_snapshot = self._load(current=current)
+
+            with self._lock:
+                self._previous = self._snapshot
+                self._snapshot = new_snapshot
+
+            logger.info(
+                f"Swapped summary data version {current.version} for {new_snapshot.version}"
+            )
+        self._notify(new_snapshot)
+        return True
+
+    def start_refresher(self, interval_s=SUMMARY_REFRESH_INTERVAL_S):
+        """Start a background thread polling the manifest for new data.
+
+        Parameters
+        ----------
+        interval_s : float, optional
+            Seconds between checks, by default SUMMARY_REFRESH_INTERVAL_S. Does
+            nothing if 0 or less.
+        """
+        if interval_s <= 0 or self._refresher is not None:
+            return
+
+        def poll():
+            while True:
+                time.sleep(interval_s)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Failed to refresh summary data: {e}")
+
+        self._refresher = threading.Thread(
+            target=poll, name="summary-refresher", daemon=True
+        )
+        self._refresher.start()
+
+    def start_background_load(self):
+        """Load the summaries in a background thread, e.g. when a worker boots so
+        the first session doesn't wait for them."""
+
+        def load():
+            try:
+                self.ensure_loaded()
+            except Exception as e:
+                logger.error(f"Failed to load summary data in the background: {e}")
+
+        threading.Thread(target=load, name="summary-loader", daemon=True).start()
+
+
+summary_cache = SummaryCache()
+
+
+def is_version_token(data):
+    """Whether session store data is a server mode token rather than a summary.
+
+    Parameters
+    ----------
+    data : object
+        Data from a dcc.Store.
+
+    Returns
+    -------
+    bool
+        True if the data only holds the data version.
+    """
+    return isinstance(data, dict) and list(data) == ["version"]
+
+
+def store_payload(snapshot, name, mode=SUMMARY_STORE_MODE):
+    """Data for a summary's session dcc.Store, built once per data version.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to take the summary from.
+    name : str
+        Name of the summary, one of SUMMARY_BLOBS.
+    mode : str, optional
+        "server" or "client", by default SUMMARY_STORE_MODE
+
+    Returns
+    -------
+    dict or str
+        `{"version": ...}` in server mode so callbacks only send the data version
+        and read the summary from worker memory, otherwise the summary serialized
+        by store_codec.serialize_frame, cached so every session of the version
+        reuses the same string.
+    """
+    if mode == "server":
+        return {"version": snapshot.version}
+    return snapshot.derived(
+        ("store_payload", name), lambda s: serialize_frame(s[name], version=s.version)
+    )
+
+
+def resolve_snapshot(data_version=None, **stores):
+    """Find the summary data a callback should use.
+
+    If the session was loaded with the data version this worker has cached the
+    cached frames are used directly, otherwise the session store data passed in
+    is decoded.
+
+    Parameters
+    ----------
+    data_version : str, optional
+        Data version stored in the session, by default None
+    **stores : dict
+        Session store data by summary name, e.g. `price_summary=...`.
+
+    Returns
+    -------
+    SummarySnapshot
+        Snapshot with (at least) the requested summaries.
+    """
+    stores = {name: parse_payload(data) for name, data in stores.items()}
+
+    # encoded payloads and server mode tokens carry the version they were built from
+    if data_version is None:
+        versions = {
+            data.get("version")
+            for data in stores.values()
+            if is_encoded(data) or is_version_token(data)
+        }
+        if len(versions) == 1:
+            data_version = versions.pop()
+
+    provided = {
+        name: data
+        for name, data in stores.items()
+        if data is not None and not is_version_token(data)
+    }
+
+    if data_version is not None or len(provided) == 0:
+        current = summary_cache.snapshot()
+        # sessions loaded before a data refresh keep using the version they started with
+        snapshot = summary_cache.get_version(data_version)
+        if snapshot is not None:
+            return snapshot
+        # nothing to decode, e.g. a server mode session on a version this worker
+        # no longer holds so it moves to the current data
+        if len(provided) == 0:
+            return current
+
+    frames = {name: decode_frame(data) for name, data in provided.items()}
+    return SummarySnapshot(None, frames)
+
+
+def build_manifest(data_dir, blob_paths, parts=None, known_files=None):
+    """Create the manifest listing the content hash of each processed file.
+
+    Parameters
+    ----------
+    data_dir : str
+        Local directory the blob paths are relative to.
+    blob_paths : list
+        Blob paths to include, e.g. the values of SUMMARY_BLOBS.
+    parts : dict, optional
+        Extra parts of a summary by its blob path, e.g. ad batches appended
+        after a full build, by default None
+    known_files : dict, optional
+        Entries of files known to be unchanged since the previous manifest, by
+        blob path, reused instead of hashing the files again, by default None
+
+    Returns
+    -------
+    dict
+        Manifest with a `version` for the whole set, `files` by blob path and
+        the `parts` of summaries written in several files.
+    """
+    parts = parts or {}
+    known_files = known_files or {}
+    part_paths = [path for paths in parts.values() for path in paths]
+
+    files = {}
+    for blob_path in sorted(list(blob_paths) + part_paths):
+        if blob_path in known_files:
+            files[blob_path] = known_files[blob_path]
+            continue
+        with open(os.path.join(data_dir, *blob_path.split("/")), "rb") as f:
+            data = f.read()
+        files[blob_path] = {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+
+    version = hashlib.sha256(
+        json.dumps(files, sort_keys=True).encode()
+    ).hexdigest()[:12]
+
+    manifest = {"version": version, "created": time.time(), "files": files}
+    if parts:
+        manifest["parts"] = parts
+    return manifest
@@ -32,11 +32,12 @@ from src.pages.dash_styles import SIDEBAR_STYLE, CONTENT_STYLE
 from src.logs import get_logger
 from src.analytics.google_analytics import log_to_GA_list_of_items
 from src.models.predict_price import predict_car_price
+from src.data.summary_cache import resolve_snapshot
+from src.data.make_model_index import INVALID_MODELS, get_make_model_index
 
 # Create a custom logger
 logger = get_logger(__name__)
 
-INVALID_MODELS = ["other"]
 DEFAULT_MODELS = ["ghost", "model-x", "911", "m3"]
 DEFAULT_MAKES = []
 
@@ -442,18 +443,27 @@ def update(back, next_, model, price, year, mileage, current):
     State("vehicle-mileage-input", "value"),
     State("vehicle-wheel-system-input", "value"),
     State("makes-models-store", "data"),
+    State("summary-version-store", "data"),
 )
 def generate_price_results(
-    current, model, price, year, mileage, wheel_system, makes_models_store
+    current,
+    model,
+    price,
+    year,
+    mileage,
+    wheel_system,
+    makes_models_store,
+    data_version=None,
 ):
     if current != 2:
         raise dash.exceptions.PreventUpdate
     else:
-        makes_models_df = pd.DataFrame.from_dict(makes_models_store, orient="columns")
+        snapshot = resolve_snapshot(data_version, makes_models=makes_models_store)
 
         model_formatted = model.lower().replace(" ", "-")
 
-        make = makes_models_df.query("model == @model_formatted").make.values[0].title()
+        index = get_make_model_index(snapshot, INVALID_MODELS)
+        make = index.make_of[model_formatted].title()
 
         age_at_posting = dt.datetime.now().year - year
 
@@ -3,6 +3,7 @@
 
 import os
 import sys
+import json
 
 import dash
 
@@ -12,11 +13,13 @@ dash.register_page(
     name="Fortunato Wheels | Explore",
 )
 
-from dash import Dash, dcc, html, Input, Output, State, callback
+from dash import Dash, dcc, html, Input, Output, State, callback, ALL
 import dash_bootstrap_components as dbc
 import dash_mantine_components as dmc
 from dash_iconify import DashIconify
+import numpy as np
 import pandas as pd
+import threading
 import time
 
 from src.visualizations.explore_ads_plots import (
@@ -28,14 +31,267 @@ from src.visualizations.utils import blank_placeholder_plot
 from src.pages.dash_styles import SIDEBAR_STYLE, CONTENT_STYLE
 from src.logs import get_logger
 from src.analytics.google_analytics import log_to_GA_list_of_items
+from src.analytics.popular_selections import (
+    PREWARM_TOP_N,
+    get_popular_selections,
+    selection,
+)
+from src.data.summary_cache import resolve_snapshot, summary_cache
+from src.data.compact_summaries import get_compact_summaries
+from src.data.make_model_index import INVALID_MODELS, get_make_model_index
+from src.data.age_counts import get_age_counts, get_total_ads
+from src.data.ads_cube import PRICE_BIN_SIZE, get_ads_cube
+from src.data.ad_store import get_ad_store
+from src.data.facet_index import FACET_COLUMNS, get_facet_index
+from src.data.lru_cache import LRUCache
+from src.data.figure_cache import figure_cache_key, get_figure_cache
+from src.data.price_trends import (
+    PRICE_TREND_SMOOTHER,
+    get_price_trends,
+    trend_summary,
+)
 
-INVALID_MODELS = ["other"]
 DEFAULT_MODELS = ["ghost", "model-x", "911", "m3"]
 DEFAULT_MAKES = []
+# description of the price trend lines by smoother
+TREND_LABELS = {
+    "lowess": "LOWESS smoothing model",
+    "rolling": "3 year rolling average",
+    "linear": "linear fit",
+}
+# number of make/model selections to keep the filter options of
+FILTER_OPTIONS_CACHE_SIZE = int(os.getenv("FILTER_OPTIONS_CACHE_SIZE", 256))
 
 # Create a custom logger
 logger = get_logger(__name__)
 
+filter_options_cache = LRUCache(FILTER_OPTIONS_CACHE_SIZE)
+
+
+def facet_selection(facet_values):
+    """Selected values by facet from the facet dropdowns.
+
+    Parameters
+    ----------
+    facet_values : list or None
+        Values of the facet dropdowns in FACET_COLUMNS order, as passed by the
+        pattern matching callback inputs.
+
+    Returns
+    -------
+    dict
+        Selected values by facet, empty when nothing is selected.
+    """
+    if facet_values is None:
+        return {}
+    return {
+        facet: values
+        for facet, values in zip(FACET_COLUMNS, facet_values)
+        if values
+    }
+
+
+def matching_ad_rows(snapshot, model_names, age_range, bounds, facets):
+    """Rows of the ad store matching the sidebar filters.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to take the ad store from.
+    model_names : np.ndarray
+        Models to include.
+    age_range : list
+        Inclusive [min, max] age.
+    bounds : list or None
+        Price range from `price_bounds`.
+    facets : dict
+        Selected values by facet from `facet_selection`.
+
+    Returns
+    -------
+    np.ndarray or None
+        Matching rows, None if the snapshot has no ad level data.
+    """
+    ad_store = get_ad_store(snapshot)
+    if ad_store is None:
+        return None
+    if len(model_names) == 0:
+        return np.array([], dtype=np.int64)
+
+    rows = ad_store.select(
+        models=model_names,
+        age_range=age_range,
+        ranges={"price": bounds} if bounds is not None else None,
+    )
+    if facets:
+        facet_index = get_facet_index(snapshot)
+        rows = facet_index.rows(facet_index.rows_bitmap(rows), facets)
+    return rows
+
+
+def matching_ad_count(snapshot, model_codes, age_range, bounds, facets):
+    """Number of ads matching the sidebar filters from the cheapest source that
+    can answer them.
+
+    Without a price or facet filter the running totals over age answer in two
+    lookups per model, a price range needs the ads cube and only the vehicle
+    details need the ad store.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to count the ads of.
+    model_codes : np.ndarray
+        Codes of the models to include.
+    age_range : list
+        Inclusive [min, max] age.
+    bounds : list or None
+        Price range from `price_bounds`.
+    facets : dict
+        Selected values by facet from `facet_selection`.
+
+    Returns
+    -------
+    int
+        Number of matching ads.
+    """
+    if facets:
+        summaries = get_compact_summaries(snapshot)
+        rows = matching_ad_rows(
+            snapshot, summaries.models[model_codes], age_range, bounds, facets
+        )
+        if rows is not None:
+            return len(rows)
+
+    ads_cube = get_ads_cube(snapshot)
+    if bounds is not None and ads_cube is not None:
+        return int(ads_cube.model_counts(model_codes, age_range, bounds).sum())
+    return get_age_counts(snapshot).count(model_codes, age_range)
+
+
+def price_bounds(price_range, price_max):
+    """Price range to filter the ads cube on, ends of the range left at the slider
+    limits are open so ads outside the slider's range aren't dropped.
+
+    Parameters
+    ----------
+    price_range : list
+        [min, max] value of the price slider.
+    price_max : float
+        Maximum of the price slider.
+
+    Returns
+    -------
+    list or None
+        [min, max] with None for open ends, None if the range isn't restricted.
+    """
+    if price_range is None:
+        return None
+    low = price_range[0] if price_range[0] > 0 else None
+    high = price_range[1]
+    if price_max is None or high >= price_max:
+        high = None
+    if low is None and high is None:
+        return None
+    return [low, high]
+
+
+def _compute_filter_options(snapshot, makes, models, option_makes):
+    """Model options, make options and max price for a normalized selection."""
+    summaries = get_compact_summaries(snapshot)
+    index = get_make_model_index(snapshot, INVALID_MODELS)
+    num_ads_per_model = summaries.num_ads.model_totals()
+
+    num_ads_per_make = np.bincount(
+        summaries.model_makes[index.model_codes],
+        weights=num_ads_per_model[index.model_codes],
+        minlength=len(summaries.makes),
+    )
+    # filter for a minimum of 200 ads per make
+    make_options = [
+        {
+            "label": f'{make.replace("-", " ").title()} ({num_ads/1000:.1f}k ads)',
+            "value": make,
+        }
+        for make, num_ads in zip(summaries.makes, num_ads_per_make)
+        if num_ads > 200
+    ]
+
+    # if no make is selected then all models are available, otherwise only the
+    # models of the selected makes but keeping the selected models visible
+    if len(option_makes) == 0:
+        model_codes = index.model_codes
+    else:
+        model_codes = index.codes_for_makes(list(option_makes))
+    selected_codes = summaries.model_codes(list(models))
+    if len(np.setdiff1d(selected_codes, model_codes)) > 0:
+        model_codes = index.sort_codes(np.union1d(model_codes, selected_codes))
+
+    # create the model options for the drop down including number of ads per model
+    model_options = [
+        {
+            "label": f'{model.replace("-", " ").title()} ({num_ads} ads)',
+            "value": model,
+        }
+        for model, num_ads in zip(
+            summaries.models[model_codes], num_ads_per_model[model_codes]
+        )
+        if num_ads > 10
+    ]
+
+    # get max price for price slider
+    if len(models) > 0:
+        price_codes = summaries.model_codes(list(models))
+    elif len(makes) > 0:
+        price_codes = index.codes_for_makes(list(makes))
+    else:
+        price_codes = np.arange(len(summaries.models))
+    prices = summaries.price.values[summaries.price.rows(price_codes)]
+    if len(prices) == 0:
+        prices = summaries.price.values
+    max_price = float(prices.max()) if len(prices) > 0 else None
+
+    return model_options, make_options, max_price
+
+
+def filter_options(snapshot, make_values, model_values, option_makes):
+    """Options of the make and model dropdowns and the max price of a selection,
+    memoized per data version.
+
+    The order of the selected makes and models doesn't change the options so
+    they're sorted into the cache key, repeated selections are a dict lookup.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to build the options from.
+    make_values : list
+        Selected makes.
+    model_values : list
+        Selected models.
+    option_makes : list
+        Makes to limit the model options to, empty for all models.
+
+    Returns
+    -------
+    tuple
+        (model_options, make_options, max_price), max_price is None if there are
+        no prices. The lists are shared between calls so must not be modified.
+    """
+    makes = tuple(sorted(make_values))
+    models = tuple(sorted(model_values))
+    option_makes = tuple(sorted(option_makes))
+    # snapshots decoded from session stores don't belong to a version to key on
+    if snapshot.version is None:
+        return _compute_filter_options(snapshot, makes, models, option_makes)
+
+    key = (snapshot.version, makes, models, option_makes)
+    options = filter_options_cache.get_or_compute(
+        key, lambda: _compute_filter_options(snapshot, makes, models, option_makes)
+    )
+    logger.debug(f"explore filter options cache {filter_options_cache.stats()}")
+    return options
+
 filtering_accordion = html.Div(
     dbc.Accordion(
         [
@@ -68,7 +324,7 @@ filtering_accordion = html.Div(
                 dcc.RangeSlider(
                     min=0,
                     max=100_000,
-                    step=100,
+                    step=PRICE_BIN_SIZE,
                     id="explore-price-slider",
                     value=[0, 100_000],
                     tooltip={"placement": "bottom", "always_visible": True},
@@ -88,6 +344,21 @@ filtering_accordion = html.Div(
                 ),
                 title="Vehicle Age",
             ),
+            dbc.AccordionItem(
+                [
+                    dmc.MultiSelect(
+                        label=f"Select {facet.title()}",
+                        placeholder="Any",
+                        id={"type": "explore-facet-select", "facet": facet},
+                        searchable=True,
+                        clearable=True,
+                        value=[],
+                        data=[],
+                    )
+                    for facet in FACET_COLUMNS
+                ],
+                title="Vehicle Details",
+            ),
         ],
         flush=True,
         always_open=True,
@@ -158,6 +429,10 @@ content = dbc.Container(
                                                 "here for more info",
                                                 href="https://en.wikipedia.org/wiki/Local_regression",
                                             ),
+                                        ]
+                                        if PRICE_TREND_SMOOTHER == "lowess"
+                                        else [
+                                            f"* lines indicate {TREND_LABELS[PRICE_TREND_SMOOTHER]}"
                                         ],
                                     ),
                                     style={"font-size": "12px"},
@@ -244,26 +519,24 @@ layout = html.Div(
 )
 
 
-# update the model select options based on the make select, price, age etc.
+# update the model select options based on the make select, price, age etc. the
+# outputs are only read as State so writing them doesn't fire this callback again
 @callback(
     Output("explore-model-select", "data"),
     Output("explore-make-select", "data"),
     Output("explore-price-slider", "max"),
     Output("explore-price-slider", "value"),
-    [
-        Input("explore-first-load", "children"),
-        Input("explore-make-select", "value"),
-        Input("explore-make-select", "data"),
-        Input("explore-model-select", "value"),
-        Input("explore-model-select", "data"),
-        Input("explore-price-slider", "max"),
-        Input("explore-price-slider", "value"),
-    ],
-    [
-        State("makes-models-store", "data"),
-        State("price-summary-store", "data"),
-        State("num-ads-summary-store", "data"),
-    ],
+    Input("explore-first-load", "children"),
+    Input("explore-make-select", "value"),
+    State("explore-make-select", "data"),
+    Input("explore-model-select", "value"),
+    State("explore-model-select", "data"),
+    State("explore-price-slider", "max"),
+    State("explore-price-slider", "value"),
+    State("makes-models-store", "data"),
+    State("price-summary-store", "data"),
+    State("num-ads-summary-store", "data"),
+    State("summary-version-store", "data"),
 )
 def update_filter_options(
     _first_load,
@@ -276,6 +549,7 @@ def update_filter_options(
     makes_models_store,
     price_summary_store,
     num_ads_summary_store,
+    data_version=None,
 ):
     """Update the data filtering options based on the selected make, model, price, age etc.
 
@@ -303,6 +577,9 @@ def update_filter_options(
     num_ads_summary_store : dict
         Dictionary of number of ads summary with columns being model names and rows being bins
         of how many ads by age of vehicles at posting in 'age' column
+    data_version : str, optional
+        Version of the summary data loaded into the session stores, when it matches
+        the data cached by the server the stores don't need to be decoded.
 
     Returns
     -------
@@ -320,83 +597,33 @@ def update_filter_options(
     """
     start_time = time.time()
 
-    make_model_df = pd.DataFrame.from_dict(makes_models_store, orient="columns")
-    price_summary_df = pd.DataFrame.from_dict(price_summary_store, orient="columns")
-    num_ads_summary_df = pd.DataFrame.from_dict(num_ads_summary_store, orient="columns")
-
-    # if make options is None, then we set it to all makes and always allow all makes selectable
-    if make_options is None:
-        make_options = make_model_df.make.unique().tolist()
-        make_options.sort()
-        models_list = (
-            make_model_df.query("model not in @INVALID_MODELS").model.unique().tolist()
-        )
-        num_ads_per_make = (
-            num_ads_summary_df[models_list].sum(axis=0).to_frame(name="num_ads")
-        )
-        num_ads_per_make["model"] = models_list
-        # ad the matching make for each model to the dataframe
-        num_ads_per_make["make"] = num_ads_per_make.model.apply(
-            lambda x: make_model_df.query("model == @x").make.values[0]
-        )
-        num_ads_per_make = num_ads_per_make.groupby("make", as_index=False).agg(
-            {"num_ads": "sum"}
-        )
-        # filter for a minimum of 200 ads per make
-        num_ads_per_make = num_ads_per_make.query("num_ads > 200")
-
-        make_options = [
-            {
-                "label": f'{make.replace("-", " ").title()} ({num_ads/1000:.1f}k ads)',
-                "value": make,
-            }
-            for make, num_ads in zip(num_ads_per_make.make, num_ads_per_make.num_ads)
-        ]
-
-    # if model options is not initialized or no make is selected, then we set it to all models
-    if (model_options is None) or (len(make_values) == 0):
-        models_list = (
-            make_model_df.query("model not in @INVALID_MODELS").model.unique().tolist()
-            + model_values
-        )
-        models_list.sort()
-    # if a make is selected then retrun model_options only of that make but
-    # keep the current model_values visible in the list
-    elif len(make_values) > 0:
-        models_list = (
-            make_model_df.query("make == @make_values & model not in @INVALID_MODELS")
-            .model.unique()
-            .tolist()
-            + model_values
-        )
-        models_list.sort()
-    # generate the model options
-    num_ads_per_model = (
-        num_ads_summary_df[models_list].sum(axis=0).to_frame(name="num_ads")
+    snapshot = resolve_snapshot(
+        data_version,
+        makes_models=makes_models_store,
+        price_summary=price_summary_store,
+        num_ads_summary=num_ads_summary_store,
     )
-    num_ads_per_model["model"] = models_list
-
-    num_ads_per_model = num_ads_per_model.query("num_ads > 10")
-
-    # create the model options for the drop down including number of ads per model
-    model_options = [
-        {
-            "label": f'{model.replace("-", " ").title()} ({num_ads} ads)',
-            "value": model,
-        }
-        for model, num_ads in zip(num_ads_per_model.model, num_ads_per_model.num_ads)
-    ]
+    # model options only follow the selected makes once they've been initialized
+    option_makes = make_values if model_options is not None else []
+    new_model_options, all_make_options, max_price = filter_options(
+        snapshot, make_values, model_values, option_makes
+    )
+    if max_price is None:
+        max_price = price_slider_max
 
-    # get max price for price slider
-    if len(model_values) > 0:
-        max_price = price_summary_df[model_values].max().max()
-    elif len(make_values) > 0:
-        models = make_model_df.query(
-            "make in @make_values & model not in @INVALID_MODELS"
-        ).model.unique()
-        max_price = price_summary_df[models].max().max()
-    else:
-        max_price = price_summary_df.max().max()
+    # if make options is None, then we set it to all makes and always allow all makes selectable
+    make_options_changed = make_options is None
+    if make_options_changed:
+        make_options = all_make_options
+
+    # a selection giving the same options, stop here so the browser doesn't
+    # re-render and re-fire the callbacks depending on the outputs
+    if (
+        not make_options_changed
+        and new_model_options == model_options
+        and max_price == price_slider_max
+    ):
+        raise dash.exceptions.PreventUpdate
 
     # if price slider has not been adjusted, set it to include the full range of prices
     if price_slider_values[1] == price_slider_max:
@@ -410,7 +637,103 @@ def update_filter_options(
     logger.debug(
         f"explore_update_filters_time log success - {log_success}: {int((time.time() - start_time) * 1000)}"
     )
-    return model_options, make_options, max_price, price_slider_values
+    return new_model_options, make_options, max_price, price_slider_values
+
+
+@callback(
+    Output({"type": "explore-facet-select", "facet": ALL}, "data"),
+    [
+        Input("explore-model-select", "value"),
+        Input("explore-make-select", "value"),
+        Input("explore-age-slider", "value"),
+        Input("explore-price-slider", "value"),
+        Input({"type": "explore-facet-select", "facet": ALL}, "value"),
+    ],
+    State("makes-models-store", "data"),
+    State("num-ads-summary-store", "data"),
+    State("summary-version-store", "data"),
+    State("explore-price-slider", "max"),
+)
+def update_facet_options(
+    models,
+    makes,
+    age_range,
+    price_range,
+    facet_values,
+    makes_models_store,
+    num_ads_summary_store,
+    data_version=None,
+    price_max=None,
+):
+    """Options of the facet dropdowns labelled with how many of the ads matching
+    the other filters have each value.
+
+    Parameters
+    ----------
+    models : list
+        Selected models.
+    makes : list
+        Selected makes.
+    age_range : list
+        Value of the age slider.
+    price_range : list
+        Value of the price slider.
+    facet_values : list
+        Selected values of each facet dropdown in FACET_COLUMNS order.
+    makes_models_store : dict
+        Session store of the makes and models.
+    num_ads_summary_store : dict
+        Session store of the number of ads summary.
+    data_version : str, optional
+        Version of the summary data loaded into the session stores.
+    price_max : float, optional
+        Maximum of the price slider.
+
+    Returns
+    -------
+    list
+        Options of each facet dropdown in FACET_COLUMNS order, empty when there
+        is no ad level data to count.
+    """
+    snapshot = resolve_snapshot(
+        data_version,
+        makes_models=makes_models_store,
+        num_ads_summary=num_ads_summary_store,
+    )
+    facet_index = get_facet_index(snapshot)
+    if facet_index is None:
+        return [[] for _ in FACET_COLUMNS]
+
+    summaries = get_compact_summaries(snapshot)
+    index = get_make_model_index(snapshot, INVALID_MODELS)
+    if len(models) > 0:
+        model_codes = summaries.model_codes(models)
+    elif len(makes) > 0:
+        model_codes = index.codes_for_makes(makes)
+    else:
+        model_codes = index.model_codes
+
+    rows = matching_ad_rows(
+        snapshot,
+        summaries.models[model_codes],
+        age_range,
+        price_bounds(price_range, price_max),
+        {},
+    )
+    counts = facet_index.counts(
+        facet_index.rows_bitmap(rows), facet_selection(facet_values)
+    )
+
+    return [
+        [
+            {
+                "label": f"{value.title()} ({num_ads} ads)",
+                "value": value,
+            }
+            for value, num_ads in counts[facet].items()
+        ]
+        for facet in FACET_COLUMNS
+    ]
 
 
 @callback(
@@ -424,56 +747,61 @@ def update_filter_options(
     State("num-ads-summary-store", "data"),
     State("makes-models-store", "data"),
     State("price-summary-store", "data"),
+    State("summary-version-store", "data"),
+    State("explore-price-slider", "max"),
+    Input({"type": "explore-facet-select", "facet": ALL}, "value"),
 )
 def update_ad_filter_count(
-    age_range, price_range, models, makes, num_ads_summary_dict, makes_models_dict, price_summary_store
+    age_range,
+    price_range,
+    models,
+    makes,
+    num_ads_summary_dict,
+    makes_models_dict,
+    price_summary_store,
+    data_version=None,
+    price_max=None,
+    facet_values=None,
 ):
     start_time = time.time()
 
-    num_ads_summary_df = pd.DataFrame.from_dict(num_ads_summary_dict, orient="columns")
-    makes_models_df = pd.DataFrame.from_dict(makes_models_dict, orient="columns")
-    price_summary_df = pd.DataFrame.from_dict(price_summary_store, orient="columns")
-
-    if price_range is None:
-        price_range = price_summary_df.max().max()
+    snapshot = resolve_snapshot(
+        data_version,
+        num_ads_summary=num_ads_summary_dict,
+        makes_models=makes_models_dict,
+        price_summary=price_summary_store,
+    )
+    summaries = get_compact_summaries(snapshot)
+    index = get_make_model_index(snapshot, INVALID_MODELS)
 
+    # the index leaves out models that are not really models
     if (len(models) == 0) & (len(makes) == 0):
-        # remove some models that are not really models
-        models = (
-            makes_models_df.query("model not in @INVALID_MODELS")
-            .model.unique()
-            .tolist()
-        )
+        model_codes = index.model_codes
     elif len(models) == 0:
-        models = (
-            makes_models_df.query("make in @makes & model not in @INVALID_MODELS")
-            .model.unique()
-            .tolist()
-        )
-
-    if len(makes) == 0:
-        makes = makes_models_df.make.unique()
-
-    matching_ads = (
-        num_ads_summary_df.query("age >= @age_range[0] & age <= @age_range[1]")[models]
-        .sum()
-        .sum()
+        model_codes = index.codes_for_makes(makes)
+    else:
+        model_codes = summaries.model_codes(models)
+
+    matching_ads = matching_ad_count(
+        snapshot,
+        model_codes,
+        age_range,
+        price_bounds(price_range, price_max),
+        facet_selection(facet_values),
     )
+    total_ads = get_total_ads(snapshot)
 
-    total_ads = num_ads_summary_df.drop(columns=["age"]).sum().sum()
-
-    num_matching_entries = html.Div(
-        [
-            html.H4(
-                str(matching_ads) + " matching ads",
-                style={"font-family": "'Poppins'", "textAlign": "center"},
-            ),
-            html.H6(
-                f"of {total_ads/1_000_000:.1f}" + "+ million ads analyzed",
-                style={"font-family": "'Poppins'", "textAlign": "center"},
-            ),
-        ]
-    )
+    matching_details = [
+        html.H4(
+            str(matching_ads) + " matching ads",
+            style={"font-family": "'Poppins'", "textAlign": "center"},
+        ),
+        html.H6(
+            f"of {total_ads/1_000_000:.1f}" + "+ million ads analyzed",
+            style={"font-family": "'Poppins'", "textAlign": "center"},
+        ),
+    ]
+    num_matching_entries = html.Div(matching_details)
     log_success = log_to_GA_list_of_items(
         event_name="explore_matching_ads_update_time",
         item_name="time_ms",
@@ -486,162 +814,293 @@ def update_ad_filter_count(
     return num_matching_entries
 
 
-@callback(
-    Output("price-age-summary-plot", "figure"),
-    [Input("apply-filters-button", "n_clicks")],
-    [
-        State("explore-age-slider", "value"),
-        State("explore-price-slider", "value"),
-        State("explore-model-select", "value"),
-        State("explore-make-select", "value"),
-        State("price-summary-store", "data"),
-        State("makes-models-store", "data"),
-    ],
-)
-def update_price_summary_plot(
-    n_clicks, age_range, price_range, models, makes, price_summary, makes_models
-):
-    start_time = time.time()
+def selected_model_codes(summaries, models):
+    """Codes of the models to plot, the default models if none are selected.
+
+    Parameters
+    ----------
+    summaries : CompactSummaries
+        Summaries to look the models up in.
+    models : list
+        Selected models from the drop down.
+
+    Returns
+    -------
+    np.ndarray
+        Codes of the models in `summaries`.
+    """
     # if no models selected, display the default models
     if len(models) == 0:
         models = DEFAULT_MODELS
-
-    # log to GA the currently selected models & makes
-    log_model_success = log_to_GA_list_of_items(
-        event_name="explore_apply_filters_click",
-        item_name="model",
-        # remove default models from list of models
-        list_of_items=[model for model in models if model not in DEFAULT_MODELS],
-    )
-    logger.debug(f"GA logging success for models: {log_model_success}")
-
-    log_make_success = log_to_GA_list_of_items(
-        event_name="explore_apply_filters_click",
-        item_name="make",
-        list_of_items=[make for make in makes if make not in DEFAULT_MAKES],
-    )
-    logger.debug(f"GA logging success for makes: {log_make_success}")
-
     # convert models to lower case and replace spaces with dashes
     models = [model.lower().replace(" ", "-") for model in models]
+    return summaries.model_codes(models)
 
-    price_summary_df = pd.DataFrame.from_dict(price_summary, orient="columns")
-    makes_models_df = pd.DataFrame.from_dict(makes_models, orient="columns")
 
-    price_summary_df = price_summary_df[models + ["age"]]
+def price_summary_figure(
+    snapshot,
+    model_codes,
+    age_range,
+    bounds,
+    rows=None,
+    smoother=PRICE_TREND_SMOOTHER,
+):
+    """Average price by age of the selected models.
 
-    if age_range is not None:
-        price_summary_df = price_summary_df.query(
-            "age >= @age_range[0] & age <= @age_range[1]"
-        )
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to plot the summaries of.
+    model_codes : np.ndarray
+        Codes of the models to plot.
+    age_range : list
+        Inclusive [min, max] age.
+    bounds : list or None
+        Price range from `price_bounds`.
+    rows : np.ndarray, optional
+        Ad store rows matching the vehicle details, by default None uses the
+        summaries or the ads cube.
+    smoother : str, optional
+        Smoother of the trend lines, one of price_trends.SMOOTHERS, by default
+        PRICE_TREND_SMOOTHER
 
-    # melt dataframe to long format with age, model, and price as columns
-    price_summary_df = pd.melt(
-        price_summary_df, id_vars=["age"], var_name="model", value_name="price"
-    )
+    Returns
+    -------
+    plotly.graph_objects.Figure
+        The price plot.
+    """
+    summaries = get_compact_summaries(snapshot)
+    ads_cube = get_ads_cube(snapshot)
+    # vehicle details are only known per ad, the price range is in the cube
+    if rows is not None:
+        price_summary = get_ad_store(snapshot).summarize(
+            rows, summaries, "age", "mean_price"
+        )
+    elif bounds is not None and ads_cube is not None:
+        price_summary = ads_cube.price_summary(model_codes, age_range, bounds)
+    else:
+        price_summary = summaries.price
 
-    # add make to the model field for the legend to be readable
-    price_summary_df = price_summary_df.merge(
-        makes_models_df, left_on="model", right_on="model", how="left"
-    )
-    price_summary_df["model"] = (
-        price_summary_df["model"].str.title()
-        + " ("
-        + price_summary_df["make"].str.replace("-", " ").str.title()
-        + ")"
+    # long format with age, model (labelled with its make), price and make columns
+    price_summary_df = summaries.long_frame(
+        price_summary, model_codes, age_range, "age", "price"
     )
-
-    # cast age to int
-    price_summary_df["age"] = price_summary_df["age"].astype(int)
     # drop rows where price is less than 500
     price_summary_df = price_summary_df[price_summary_df["price"] > 500]
 
-    price_summary_plot = plot_vehicle_prices_summary(price_summary_df)
+    # trends of the unfiltered prices are fit once per model and data version,
+    # filtered prices only have the few selected models to fit
+    if price_summary is summaries.price:
+        trends = get_price_trends(snapshot, smoother).summary(model_codes)
+    else:
+        trends = trend_summary(price_summary, model_codes, smoother)
+    trend_df = summaries.long_frame(trends, model_codes, age_range, "age", "price")
+
+    return plot_vehicle_prices_summary(price_summary_df, trend_df)
 
-    log_success = log_to_GA_list_of_items(
-        event_name="explore_price_age_summary_update_time",
-        item_name="time_ms",
-        list_of_items=[int((time.time() - start_time) * 1000)],
+
+def mileage_summary_figure(snapshot, model_codes, bounds, rows=None):
+    """Distribution of yearly mileage of the selected models over every age.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to plot the summaries of.
+    model_codes : np.ndarray
+        Codes of the models to plot.
+    bounds : list or None
+        Price range from `price_bounds`.
+    rows : np.ndarray, optional
+        Ad store rows of any age matching the vehicle details, by default None
+
+    Returns
+    -------
+    plotly.graph_objects.Figure
+        The mileage plot.
+    """
+    summaries = get_compact_summaries(snapshot)
+    ads_cube = get_ads_cube(snapshot)
+    # the distribution covers every age as before, only the price range and
+    # vehicle details narrow it
+    if rows is not None:
+        mileage_summary = get_ad_store(snapshot).summarize(
+            rows, summaries, "yearly_mileage_range", "fraction"
+        )
+    elif bounds is not None and ads_cube is not None:
+        mileage_summary = ads_cube.mileage_summary(model_codes, None, bounds)
+    else:
+        mileage_summary = summaries.mileage
+
+    # long format with mileage range, model (labelled with its make) and percent columns
+    mileage_summary_df = summaries.long_frame(
+        mileage_summary,
+        model_codes,
+        None,
+        "yearly_mileage_range",
+        "percent_of_vehicles",
     )
-    logger.debug(
-        f"explore_price_age_summary_update_time log success - {log_success}: {int((time.time() - start_time) * 1000)}"
+
+    return plot_mileage_distribution_summary(mileage_summary_df)
+
+
+def num_ads_summary_figure(snapshot, model_codes, age_range, bounds, rows=None):
+    """Number of ads of each selected model.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to plot the summaries of.
+    model_codes : np.ndarray
+        Codes of the models to plot.
+    age_range : list
+        Inclusive [min, max] age.
+    bounds : list or None
+        Price range from `price_bounds`.
+    rows : np.ndarray, optional
+        Ad store rows matching the vehicle details, by default None
+
+    Returns
+    -------
+    plotly.graph_objects.Figure
+        The number of ads plot.
+    """
+    summaries = get_compact_summaries(snapshot)
+    ads_cube = get_ads_cube(snapshot)
+    if rows is not None:
+        num_ads = get_ad_store(snapshot).model_counts(rows, summaries, model_codes)
+    elif bounds is not None and ads_cube is not None:
+        num_ads = ads_cube.model_counts(model_codes, age_range, bounds)
+    else:
+        num_ads = get_age_counts(snapshot).counts(model_codes, age_range)
+
+    num_ads_per_model = pd.DataFrame(
+        {
+            "num_ads": num_ads,
+            "model": summaries.bar_labels[model_codes],
+            "make": summaries.makes[summaries.model_makes[model_codes]],
+        }
     )
 
-    return price_summary_plot
+    return plot_num_ads_summary(num_ads_per_model)
 
 
-@callback(
-    Output("vehicle-mileage-plot", "figure"),
-    [Input("apply-filters-button", "n_clicks")],
-    [
-        State("explore-age-slider", "value"),
-        State("explore-price-slider", "value"),
-        State("explore-model-select", "value"),
-        State("explore-make-select", "value"),
-        State("mileage-summary-store", "data"),
-        State("makes-models-store", "data"),
-    ],
-)
-def update_mileage_summary_plot(
-    n_clicks, year_range, price_range, models, makes, mileage_summary, makes_models
+def explore_figures(
+    snapshot, models, age_range, bounds, facets, smoother=PRICE_TREND_SMOOTHER
 ):
-    start_time = time.time()
-    # if no models selected, display the default models
-    if len(models) == 0:
-        models = DEFAULT_MODELS
+    """Build the price, mileage and number of ads plots of one filter state.
 
-    # convert models to lower case and replace spaces with dashes
-    models = [model.lower().replace(" ", "-") for model in models]
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to plot the summaries of.
+    models : list
+        Selected models, the default models if empty.
+    age_range : list
+        Inclusive [min, max] age.
+    bounds : list or None
+        Price range from `price_bounds`.
+    facets : dict
+        Selected values by facet from `facet_selection`.
+    smoother : str, optional
+        Smoother of the price trend lines, by default PRICE_TREND_SMOOTHER
 
-    mileage_summary_df = pd.DataFrame.from_dict(mileage_summary, orient="columns")
-    makes_models_df = pd.DataFrame.from_dict(makes_models, orient="columns")
+    Returns
+    -------
+    figures : tuple
+        (price, mileage, num_ads) figures.
+    times_ms : tuple
+        Time taken to build each figure in ms.
+    """
+    summaries = get_compact_summaries(snapshot)
+    model_codes = selected_model_codes(summaries, models)
+
+    # the ads matching the vehicle details are selected once for all three plots,
+    # the mileage plot covers every age so the age range is applied after
+    age_rows = all_age_rows = None
+    if facets:
+        all_age_rows = matching_ad_rows(
+            snapshot, summaries.models[model_codes], None, bounds, facets
+        )
+    if all_age_rows is not None:
+        ages = get_ad_store(snapshot).ages[all_age_rows]
+        age_rows = all_age_rows[(ages >= age_range[0]) & (ages <= age_range[1])]
+
+    figures, times_ms = [], []
+    for build_figure in (
+        lambda: price_summary_figure(
+            snapshot, model_codes, age_range, bounds, age_rows, smoother
+        ),
+        lambda: mileage_summary_figure(snapshot, model_codes, bounds, all_age_rows),
+        lambda: num_ads_summary_figure(
+            snapshot, model_codes, age_range, bounds, age_rows
+        ),
+    ):
+        start_time = time.time()
+        figures.append(build_figure())
+        times_ms.append(int((time.time() - start_time) * 1000))
+    return tuple(figures), tuple(times_ms)
 
-    if models is None:
-        mileage_summary_df = mileage_summary_df[
-            ["911", "4runner", "tundra", "skyline"] + ["yearly_mileage_range"]
-        ]
-    else:
-        mileage_summary_df = mileage_summary_df[models + ["yearly_mileage_range"]]
-
-    # melt dataframe to long format with age, model, and price as columns
-    mileage_summary_df = pd.melt(
-        mileage_summary_df,
-        id_vars=["yearly_mileage_range"],
-        var_name="model",
-        value_name="percent_of_vehicles",
-    )
 
-    # add make to the model field for the legend to be readable
-    mileage_summary_df = mileage_summary_df.merge(
-        makes_models_df, left_on="model", right_on="model", how="left"
-    )
-    mileage_summary_df["model"] = (
-        mileage_summary_df["model"].str.title()
-        + " ("
-        + mileage_summary_df["make"].str.replace("-", " ").str.title()
-        + ")"
-    )
+def explore_figures_key(snapshot, models, age_range, bounds, facets, smoother):
+    """Figure cache key of a filter state, None if the snapshot has no version.
 
-    # cast age to int
-    mileage_summary_df["yearly_mileage_range"] = mileage_summary_df[
-        "yearly_mileage_range"
-    ].astype(int)
+    Selections that plot the same figures get the same key, e.g. models in a
+    different order or no models and the default models.
+    """
+    if snapshot.version is None:
+        return None
+    if len(models) == 0:
+        models = DEFAULT_MODELS
+    state = selection(models, age_range, bounds, facets)
+    return figure_cache_key(snapshot.version, state, smoother)
 
-    mileage_summary_plot = plot_mileage_distribution_summary(mileage_summary_df)
 
-    log_success = log_to_GA_list_of_items(
-        event_name="explore_mileage_summary_update_time",
-        item_name="time_ms",
-        list_of_items=[int((time.time() - start_time) * 1000)],
-    )
-    logger.debug(
-        f"explore_mileage_summary_update_time log success - {log_success}: {int((time.time() - start_time) * 1000)}"
-    )
+def cached_explore_figures(
+    snapshot, models, age_range, bounds, facets, smoother=PRICE_TREND_SMOOTHER
+):
+    """Plots of a filter state from the figure cache, built and cached on a miss.
 
-    return mileage_summary_plot
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to plot the summaries of.
+    models : list
+        Selected models, the default models if empty.
+    age_range : list
+        Inclusive [min, max] age.
+    bounds : list or None
+        Price range from `price_bounds`.
+    facets : dict
+        Selected values by facet from `facet_selection`.
+    smoother : str, optional
+        Smoother of the price trend lines, by default PRICE_TREND_SMOOTHER
+
+    Returns
+    -------
+    figures : list
+        (price, mileage, num_ads) figures as dicts.
+    times_ms : tuple or None
+        Time taken to build each figure in ms, None if they were cached.
+    """
+    figure_cache = get_figure_cache()
+    key = explore_figures_key(snapshot, models, age_range, bounds, facets, smoother)
+    figures_json = figure_cache.get(key) if key is not None else None
+    times_ms = None
+    if figures_json is None:
+        figures, times_ms = explore_figures(
+            snapshot, models, age_range, bounds, facets, smoother
+        )
+        figures_json = "[" + ",".join(figure.to_json() for figure in figures) + "]"
+        if key is not None:
+            figure_cache.put(key, figures_json)
+    logger.debug(f"explore figure cache {figure_cache.stats()}")
+    return json.loads(figures_json), times_ms
 
 
+# one request per click builds all three plots from a single snapshot lookup
 @callback(
+    Output("price-age-summary-plot", "figure"),
+    Output("vehicle-mileage-plot", "figure"),
     Output("num-ads-summary-plot", "figure"),
     [Input("apply-filters-button", "n_clicks")],
     [
@@ -649,55 +1108,171 @@ def update_mileage_summary_plot(
         State("explore-price-slider", "value"),
         State("explore-model-select", "value"),
         State("explore-make-select", "value"),
+        State("price-summary-store", "data"),
+        State("mileage-summary-store", "data"),
         State("num-ads-summary-store", "data"),
         State("makes-models-store", "data"),
+        State("summary-version-store", "data"),
+        State("explore-price-slider", "max"),
+        State({"type": "explore-facet-select", "facet": ALL}, "value"),
     ],
 )
-def update_num_ads_summary_plot(
-    n_clicks, age_range, price_range, models, makes, num_ads_summary, makes_models
+def update_summary_plots(
+    n_clicks,
+    age_range,
+    price_range,
+    models,
+    makes,
+    price_summary,
+    mileage_summary,
+    num_ads_summary,
+    makes_models,
+    data_version=None,
+    price_max=None,
+    facet_values=None,
 ):
-    start_time = time.time()
-    # if no models selected, display the default models
-    if len(models) == 0:
-        models = DEFAULT_MODELS
+    """Update the price, mileage and number of ads plots when filters are applied.
 
-    # convert models to lower case and replace spaces with dashes
-    models = [model.lower().replace(" ", "-") for model in models]
-    num_ads_summary_df = pd.DataFrame.from_dict(num_ads_summary, orient="columns")
-    makes_models_df = pd.DataFrame.from_dict(makes_models, orient="columns")
-    num_ads_summary_df = num_ads_summary_df[models + ["age"]]
-
-    if age_range is not None:
-        num_ads_summary_df = num_ads_summary_df.query(
-            "age >= @age_range[0] & age <= @age_range[1]"
-        )
+    Parameters
+    ----------
+    n_clicks : int
+        Number of clicks of the apply filters button.
+    age_range : list
+        Value of the age slider.
+    price_range : list
+        Value of the price slider.
+    models : list
+        Selected models, the default models are plotted if empty.
+    makes : list
+        Selected makes.
+    price_summary, mileage_summary, num_ads_summary, makes_models : dict
+        Session stores of the summaries.
+    data_version : str, optional
+        Version of the summary data loaded into the session stores.
+    price_max : float, optional
+        Maximum of the price slider.
+    facet_values : list, optional
+        Selected values of each facet dropdown in FACET_COLUMNS order.
 
-    make_options = makes_models_df.make.unique().tolist()
-    make_options.sort()
+    Returns
+    -------
+    tuple
+        Price, mileage and number of ads figures.
+    """
+    start_time = time.time()
 
-    num_ads_per_model = num_ads_summary_df[models].sum(axis=0).to_frame(name="num_ads")
-    num_ads_per_model["model"] = models
-    # ad the matching make for each model to the dataframe
-    num_ads_per_model["make"] = num_ads_per_model.model.apply(
-        lambda x: makes_models_df.query("model == @x").make.values[0]
+    # log to GA the currently selected models & makes
+    log_model_success = log_to_GA_list_of_items(
+        event_name="explore_apply_filters_click",
+        item_name="model",
+        # remove default models from list of models
+        list_of_items=[model for model in models if model not in DEFAULT_MODELS],
     )
+    logger.debug(f"GA logging success for models: {log_model_success}")
 
-    num_ads_per_model["model"] = (
-        num_ads_per_model["model"].str.title()
-        + "<br>("
-        + num_ads_per_model["make"].str.replace("-", " ").str.title()
-        + ")"
+    log_make_success = log_to_GA_list_of_items(
+        event_name="explore_apply_filters_click",
+        item_name="make",
+        list_of_items=[make for make in makes if make not in DEFAULT_MAKES],
     )
+    logger.debug(f"GA logging success for makes: {log_make_success}")
 
-    num_ads_summary_plot = plot_num_ads_summary(num_ads_per_model)
+    snapshot = resolve_snapshot(
+        data_version,
+        price_summary=price_summary,
+        mileage_summary=mileage_summary,
+        num_ads_summary=num_ads_summary,
+        makes_models=makes_models,
+    )
+    bounds = price_bounds(price_range, price_max)
+    facets = facet_selection(facet_values)
+    # popular selections are pre-warmed for the next data version and worker
+    get_popular_selections().record(selection(models, age_range, bounds, facets))
 
-    log_success = log_to_GA_list_of_items(
-        event_name="explore_num_ads_summary_update_time",
-        item_name="time_ms",
-        list_of_items=[int((time.time() - start_time) * 1000)],
+    figures, times_ms = cached_explore_figures(
+        snapshot, models, age_range, bounds, facets
     )
+
+    # build times are only reported when the figures weren't cached
+    for event_name, time_ms in zip(
+        [
+            "explore_price_age_summary_update_time",
+            "explore_mileage_summary_update_time",
+            "explore_num_ads_summary_update_time",
+        ],
+        times_ms or [],
+    ):
+        log_success = log_to_GA_list_of_items(
+            event_name=event_name,
+            item_name="time_ms",
+            list_of_items=[time_ms],
+        )
+        logger.debug(f"{event_name} log success - {log_success}: {time_ms}")
     logger.debug(
-        f"explore_num_ads_summary_update_time log success - {log_success}: {int((time.time() - start_time) * 1000)}"
+        f"explore_summary_plots_update_time: {int((time.time() - start_time) * 1000)}"
+    )
+
+    return tuple(figures)
+
+
+def prewarm_explore(snapshot, selections):
+    """Build the lookup structures, option lists and figures of some selections
+    ahead of the first visitors.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot to warm the caches of.
+    selections : list
+        Selections from popular_selections.selection.
+    """
+    start_time = time.time()
+    # structures every count and option list is computed from
+    get_make_model_index(snapshot, INVALID_MODELS)
+    get_age_counts(snapshot)
+    get_total_ads(snapshot)
+    get_ads_cube(snapshot)
+    get_facet_index(snapshot)
+
+    for state in selections:
+        models = state["models"] if len(state["models"]) > 0 else DEFAULT_MODELS
+        # options of the page's first load with these models selected
+        filter_options(snapshot, [], models, [])
+        cached_explore_figures(
+            snapshot,
+            state["models"],
+            state["age_range"],
+            state["bounds"],
+            state["facets"],
+        )
+
+    logger.info(
+        f"Pre-warmed {len(selections)} explore selections for data version "
+        f"{snapshot.version} in {int((time.time() - start_time) * 1000)} ms"
     )
 
-    return num_ads_summary_plot
+
+def schedule_prewarm(snapshot):
+    """Pre-warm the most popular selections of a new snapshot in the background.
+
+    Parameters
+    ----------
+    snapshot : SummarySnapshot
+        Snapshot the summary cache loaded or swapped in.
+    """
+    if PREWARM_TOP_N <= 0 or snapshot.version is None:
+        return
+
+    def prewarm():
+        try:
+            popular_selections = get_popular_selections()
+            # include the selections this worker counted since its last flush
+            popular_selections.flush()
+            prewarm_explore(snapshot, popular_selections.top(PREWARM_TOP_N))
+        except Exception as e:
+            logger.error(f"Failed to pre-warm explore selections: {e}")
+
+    threading.Thread(target=prewarm, name="explore-prewarm", daemon=True).start()
+
+
+summary_cache.add_listener(schedule_prewarm)
@@ -40,13 +40,16 @@ def hex_to_rgba(hex: str, opacity: float = 1.0):
     )
 
 
-def plot_vehicle_prices_summary(price_summary_df):
+def plot_vehicle_prices_summary(price_summary_df, trend_df=None):
     """Plots the price of selected vehicles by their age at posting.
 
     Parameters
     ----------
     price_summary_df : pd.DataFrame
-        DataFrame with columns `age` and remaining columns as vehicle model names.
+        DataFrame with columns `age`, `model` and `price`.
+    trend_df : pd.DataFrame, optional
+        Smoothed prices with the same columns, drawn as a line per model in the
+        colour of its points, by default None draws no lines.
 
     Returns
     -------
@@ -58,7 +61,6 @@ def plot_vehicle_prices_summary(price_summary_df):
         x="age",
         y="price",
         color="model",
-        trendline="lowess",
         labels={
             "age": "Age of Vehicle (years)",
             "price": "Avg. Price ($CAD)",
@@ -79,6 +81,22 @@ def plot_vehicle_prices_summary(price_summary_df):
         legend=dict(yanchor="top", y=0.99, xanchor="right", x=0.99),
     )
 
+    # trend lines are precomputed so plotting doesn't refit them on every update
+    if trend_df is not None:
+        for trace in list(fig.data):
+            model_trend_df = trend_df[trend_df["model"] == trace.name]
+            fig.add_trace(
+                go.Scatter(
+                    x=model_trend_df["age"],
+                    y=model_trend_df["price"],
+                    mode="lines",
+                    line_color=trace.marker.color,
+                    legendgroup=trace.legendgroup,
+                    showlegend=False,
+                    hoverinfo="skip",
+                )
+            )
+
     return fig
 
 
@@ -0,0 +1,71 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.analytics.callback_metrics import (
+    PAGE_LOAD,
+    CallbackMetrics,
+    _callback_outputs,
+    prop_key,
+)
+
+
+def test_prop_key_pattern_ids():
+    assert prop_key("explore-model-select", "value") == "explore-model-select.value"
+    # browsers send the matched id, callback outputs the wildcard, both key by type
+    assert prop_key('{"facet":"fuel","type":"facet-select"}', "value") == (
+        "facet-select.value"
+    )
+    assert prop_key({"facet": ["ALL"], "type": "facet-select"}, "value") == (
+        "facet-select.value"
+    )
+
+
+def test_callback_outputs_from_callback_map():
+    class FakeApp:
+        callback_map = {
+            "explore-model-select.value": {},
+            "..price-plot.figure...ad-count.children..": {},
+            '{"facet":["ALL"],"type":"facet-select"}.data': {},
+            "explore-figure-store.data@0a1b2c": {},
+        }
+
+    assert _callback_outputs(FakeApp()) == {
+        "explore-model-select.value",
+        "price-plot.figure",
+        "ad-count.children",
+        "facet-select.data",
+        "explore-figure-store.data",
+    }
+
+
+def test_chained_callbacks_count_towards_one_interaction():
+    metrics = CallbackMetrics(window_s=1)
+    # page load fires every callback without changed inputs
+    for output in ["a.children", "b.children", "c.children"]:
+        metrics.record("browser", output, [], True, 10, now=0.0)
+    # selecting a model fires two callbacks, one of their outputs chains a third
+    metrics.record("browser", "a.children", ["model.value"], False, 5, now=5.0)
+    metrics.record("browser", "b.children", ["model.value"], False, 5, now=5.01)
+    metrics.record("browser", "c.children", ["a.children"], True, 5, now=5.2)
+    # another browser's click is its own interaction
+    metrics.record("other", "plots.figure", ["button.n_clicks"], False, 40, now=5.1)
+    # a second model change after the window is a new interaction
+    metrics.record("browser", "a.children", ["model.value"], False, 5, now=9.0)
+    metrics.flush()
+
+    summary = metrics.summary()
+    assert summary[PAGE_LOAD] == {
+        "interactions": 1,
+        "callbacks_per_interaction": 3,
+        "server_ms_per_interaction": 30,
+    }
+    assert summary["model.value"]["interactions"] == 2
+    assert summary["model.value"]["callbacks_per_interaction"] == 2
+    assert summary["button.n_clicks"]["callbacks_per_interaction"] == 1
+    assert metrics.callback_counts["a.children"] == 3
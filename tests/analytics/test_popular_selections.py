@@ -0,0 +1,74 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+import json
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.analytics.popular_selections import PopularSelections, selection
+
+
+def test_selection_normalized():
+    state = selection(
+        ["Model X", "camry"], [2, 10], [5000, None], {"fuel": ["gas"], "condition": []}
+    )
+    assert state == {
+        "models": ["camry", "model-x"],
+        "age_range": [2, 10],
+        "bounds": [5000.0, None],
+        "facets": {"fuel": ["gas"]},
+    }
+    assert selection(["civic"])["age_range"] == [0, 15]
+
+
+def test_top_selections(tmp_path):
+    file_path = str(tmp_path / "popular.json")
+    popular = PopularSelections(file_path, configured='[["f150"]]')
+    for _ in range(3):
+        popular.record(selection(["civic", "camry"]))
+    popular.record(selection(["accord"]))
+    # counts stay in memory until they're flushed
+    assert popular.top(4) == [selection([]), selection(["f150"])]
+    popular.flush()
+    # another worker sharing the file
+    other_worker = PopularSelections(file_path, configured=[])
+    other_worker.record(selection(["camry", "civic"]))
+    other_worker.flush()
+
+    # the default view and configured selections come before the counted ones
+    assert [state["models"] for state in popular.top(4)] == [
+        [],
+        ["f150"],
+        ["camry", "civic"],
+        ["accord"],
+    ]
+    assert len(popular.top(2)) == 2
+
+
+def test_invalid_configured_selections_ignored(tmp_path):
+    popular = PopularSelections(str(tmp_path / "popular.json"), configured="not json")
+    assert popular.configured == []
+    assert popular.top(5) == [selection([])]
+
+
+def test_flush_merges_counts(tmp_path):
+    file_path = str(tmp_path / "popular.json")
+    popular = PopularSelections(file_path, configured=[])
+    popular.record(selection(["civic"]))
+    popular.flush()
+    # nothing new to add so the file isn't rewritten
+    os.remove(file_path)
+    popular.flush()
+    assert not os.path.exists(file_path)
+
+    popular.record(selection(["civic"]))
+    popular.record(selection(["civic"]))
+    popular.record(selection(["accord"]))
+    popular.flush()
+    assert popular._read() == {
+        json.dumps(selection(["civic"]), sort_keys=True): 2,
+        json.dumps(selection(["accord"]), sort_keys=True): 1,
+    }
@@ -0,0 +1,139 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.ad_store import AdStore, get_ad_store
+from src.data.build_summaries import AD_STORE_COLUMNS, ad_store_frame, prepare_ads
+from src.data.summary_cache import SummarySnapshot
+
+rng = np.random.default_rng(0)
+NUM_ADS = 5000
+ADS = pd.DataFrame(
+    {
+        "manufacturer": rng.choice(["toyota", "honda", "ford"], NUM_ADS),
+        "model": rng.choice(["camry", "civic", "f150", "other"], NUM_ADS),
+        "price": rng.integers(500, 60_000, NUM_ADS),
+        "year": rng.integers(2001, 2022, NUM_ADS),
+        "odometer_km": rng.integers(0, 300_000, NUM_ADS),
+        "condition": rng.choice(["good", "fair", None], NUM_ADS),
+        "fuel": rng.choice(["gas", "diesel"], NUM_ADS),
+        "transmission": rng.choice(["automatic", "manual"], NUM_ADS),
+        "cylinders": rng.choice([4.0, 6.0, np.nan], NUM_ADS),
+    }
+)
+
+
+@pytest.fixture(scope="module")
+def ads():
+    return ad_store_frame(
+        prepare_ads(ADS, posting_year=2021, extra_columns=AD_STORE_COLUMNS)
+    )
+
+
+FILTERS = [
+    {},
+    {"models": ["civic", "f150"], "age_range": [3, 9]},
+    {"makes": ["ford"], "ranges": {"price": (10_000, None)}},
+    {
+        "age_range": [0, 5],
+        "ranges": {"price": (5_000, 30_000), "odometer_km": (None, 100_000)},
+        "values": {"condition": ["good"], "fuel": ["diesel"], "cylinders": [6.0]},
+    },
+    {"models": ["missing"]},
+]
+
+
+def expected_mask(ads, models=None, makes=None, age_range=None, ranges=None, values=None):
+    mask = np.ones(len(ads), dtype=bool)
+    if models:
+        mask &= np.isin(ads.model.to_numpy(), models)
+    elif makes:
+        mask &= np.isin(ads.make.to_numpy(), makes)
+    if age_range is not None:
+        mask &= ads.age.between(*age_range)
+    for column, (low, high) in (ranges or {}).items():
+        if low is not None:
+            mask &= ads[column] >= low
+        if high is not None:
+            mask &= ads[column] <= high
+    for column, allowed in (values or {}).items():
+        mask &= np.isin(ads[column].to_numpy(), allowed)
+    return np.asarray(mask)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_queries_match_pandas(ads, filters):
+    store = AdStore(ads)
+    mask = expected_mask(ads, **filters)
+
+    assert store.count(**filters) == mask.sum()
+    assert np.array_equal(np.sort(store.select(**filters)), np.flatnonzero(mask))
+
+    summary = store.describe("price", q=[0.1, 0.5], **filters)
+    if mask.sum() > 0:
+        assert np.isclose(summary["mean"], ads.price[mask].mean())
+        assert np.allclose(
+            summary["quantiles"], np.quantile(ads.price[mask], [0.1, 0.5])
+        )
+    else:
+        assert np.isnan(summary["mean"])
+
+
+# the frame should already be sorted, shuffled data is sorted on load
+def test_unsorted_ads(ads):
+    shuffled = ads.sample(frac=1, random_state=0).reset_index(drop=True)
+    filters = {"models": ["camry"], "age_range": [2, 4]}
+    assert AdStore(shuffled).count(**filters) == AdStore(ads).count(**filters)
+
+
+# text columns are dictionary encoded and used without copying their codes
+def test_ad_store_uses_dictionary_codes(ads):
+    assert all(
+        isinstance(ads[column].dtype, pd.CategoricalDtype)
+        for column in ["make", "model", "condition", "fuel", "transmission"]
+    )
+    store = AdStore(ads)
+    codes, categories = store.categorical["fuel"]
+    assert np.shares_memory(codes, ads["fuel"].cat.codes.to_numpy())
+    assert categories.tolist() == ["diesel", "gas"]
+    assert np.shares_memory(store.numeric["price"], ads["price"].to_numpy())
+
+
+def test_ad_store_built_once(ads):
+    snapshot = SummarySnapshot("v1", {"ads": ads})
+    assert get_ad_store(snapshot) is get_ad_store(snapshot)
+    assert get_ad_store(SummarySnapshot("v1", {})) is None
+
+
+def test_summarize_matches_pandas(ads):
+    from src.data.compact_summaries import CompactSummaries
+
+    store = AdStore(ads)
+    models = np.array(sorted(ads.model.unique()), dtype=object)
+    summaries = CompactSummaries(
+        models,
+        np.array(["all"], dtype=object),
+        np.zeros(len(models), dtype=np.int32),
+        *[None] * 3,
+    )
+    rows = store.select(models=["civic", "f150"], values={"fuel": ["gas"]})
+    selected = ads.iloc[rows]
+
+    prices = store.summarize(rows, summaries, "age", "mean_price")
+    expected = selected.groupby(["model", "age"], observed=True).price.mean()
+    assert np.allclose(prices.values, expected.to_numpy())
+
+    mileage = store.summarize(rows, summaries, "yearly_mileage_range", "fraction")
+    assert np.allclose(mileage.model_totals(summaries.model_codes(["civic", "f150"])), 1)
+
+    counts = store.model_counts(rows, summaries, summaries.model_codes(["f150"]))
+    assert counts.tolist() == [(selected.model == "f150").sum()]
@@ -0,0 +1,86 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+import numpy as np
+import pandas as pd
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.ads_cube import build_ads_cube, merge_ads_cubes, get_ads_cube
+from src.data.build_summaries import MILEAGE_BIN_KM, SummaryState, prepare_ads
+from src.data.compact_summaries import get_compact_summaries
+from src.data.summary_cache import SummarySnapshot
+
+rng = np.random.default_rng(0)
+NUM_ADS = 2000
+ADS = pd.DataFrame(
+    {
+        "manufacturer": rng.choice(["toyota", "honda"], NUM_ADS),
+        "model": rng.choice(["camry", "civic", "tacoma"], NUM_ADS),
+        "price": rng.integers(500, 60_000, NUM_ADS),
+        "year": rng.integers(2001, 2022, NUM_ADS),
+        "odometer_km": rng.integers(0, 300_000, NUM_ADS),
+    }
+)
+
+
+def make_snapshot(prepared):
+    frames = SummaryState.from_ads(prepared).to_summaries()
+    frames["ads_cube"] = build_ads_cube(prepared, MILEAGE_BIN_KM)
+    return SummarySnapshot("v1", frames)
+
+
+def test_counts_and_prices_match_ads():
+    prepared = prepare_ads(ADS, posting_year=2021)
+    snapshot = make_snapshot(prepared)
+    summaries = get_compact_summaries(snapshot)
+    cube = get_ads_cube(snapshot)
+    codes = summaries.model_codes(["tacoma", "civic"])
+
+    counts = cube.model_counts(codes, [2, 10], [5000, 20000])
+    price_summary = cube.price_summary(codes, [2, 10], [5000, 20000])
+    for model, count in zip(["tacoma", "civic"], counts):
+        # prices match at the resolution of the price bins
+        in_range = (
+            (prepared.model == model)
+            & prepared.age.between(2, 10)
+            & prepared.price.between(5000, 20499)
+        )
+        assert count == in_range.sum()
+
+        expected = prepared[in_range].groupby("age").price.mean()
+        rows = price_summary.rows(summaries.model_codes([model]))
+        assert price_summary.keys[rows].tolist() == expected.index.tolist()
+        assert np.allclose(price_summary.values[rows], expected.to_numpy())
+
+
+def test_unfiltered_cube_matches_summaries():
+    snapshot = make_snapshot(prepare_ads(ADS, posting_year=2021))
+    summaries = get_compact_summaries(snapshot)
+    cube = get_ads_cube(snapshot)
+    codes = np.arange(len(summaries.models))
+
+    assert np.array_equal(cube.model_counts(codes), summaries.num_ads.model_totals())
+    mileage = cube.mileage_summary(codes)
+    assert np.allclose(
+        mileage.model_totals(), summaries.mileage.model_totals(), atol=1e-5
+    )
+
+
+def test_merged_cubes_match_full_cube():
+    prepared = prepare_ads(ADS, posting_year=2021)
+    full = build_ads_cube(prepared, MILEAGE_BIN_KM)
+    merged = merge_ads_cubes(
+        build_ads_cube(prepared.iloc[:500], MILEAGE_BIN_KM),
+        build_ads_cube(prepared.iloc[500:], MILEAGE_BIN_KM),
+    )
+    pd.testing.assert_frame_equal(merged, full)
+
+
+def test_snapshot_without_cube():
+    snapshot = SummarySnapshot("v1", {})
+    assert get_ads_cube(snapshot) is None
@@ -0,0 +1,54 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+import numpy as np
+import pandas as pd
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.summary_cache import SummarySnapshot
+from src.data.compact_summaries import get_compact_summaries
+from src.data.age_counts import get_age_counts, get_total_ads
+
+
+def make_snapshot():
+    makes_models = pd.DataFrame(
+        {"make": ["toyota", "honda", "toyota"], "model": ["tacoma", "civic", "camry"]}
+    )
+    num_ads = pd.DataFrame(
+        {
+            "tacoma": [5, 0, 3, 1],
+            "civic": [2, 7, np.nan, 4],
+            "camry": [0, 0, 0, 9],
+            "age": [1, 2, 3, 4],
+        }
+    )
+    return SummarySnapshot(
+        "v1", {"makes_models": makes_models, "num_ads_summary": num_ads}
+    )
+
+
+def test_counts_match_summed_summary():
+    snapshot = make_snapshot()
+    num_ads = snapshot["num_ads_summary"]
+    summaries = get_compact_summaries(snapshot)
+    age_counts = get_age_counts(snapshot)
+
+    for age_range in [[1, 4], [2, 3], [3, 3], [0, 10], [4, 2], [6, 8]]:
+        in_range = num_ads["age"].between(*age_range)
+        for models in [["camry"], ["tacoma", "civic"], ["civic", "camry", "tacoma"]]:
+            expected = np.nansum(num_ads.loc[in_range, models].to_numpy(dtype=float))
+            codes = summaries.model_codes(models)
+            assert age_counts.count(codes, age_range) == expected
+
+
+def test_total_cached_per_snapshot():
+    snapshot = make_snapshot()
+
+    assert get_total_ads(snapshot) == 31
+    assert get_age_counts(snapshot).count() == 31
+    assert get_age_counts(snapshot) is get_age_counts(snapshot)
@@ -0,0 +1,211 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+from types import SimpleNamespace
+
+import io
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotModifiedError
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+import src.data.azure_blob_storage as azure_blob_storage
+from src.data.azure_blob_storage import AzureBlob, get_connection_stats
+from src.data.blob_cache import BlobDiskCache
+
+
+class FakeDownload:
+    def __init__(self, data, etag):
+        self.data = data
+        self.size = len(data)
+        self.properties = SimpleNamespace(etag=etag, last_modified=None)
+
+    def readinto(self, stream):
+        stream.write(self.data)
+
+
+class FakeContainerClient:
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.downloads = 0
+        self.error = None
+        self.before_not_modified = None
+
+    def download_blob(self, blob_path, etag=None, match_condition=None, **kwargs):
+        if self.error is not None:
+            raise self.error
+        data, current_etag = self.blobs[blob_path]
+        if etag == current_etag:
+            if self.before_not_modified is not None:
+                self.before_not_modified()
+            raise ResourceNotModifiedError("not modified")
+        self.downloads += 1
+        return FakeDownload(data, current_etag)
+
+
+class FakeBlobClient:
+    def __init__(self, data):
+        self.data = data
+        self.requests = 0
+        self.bytes_downloaded = 0
+
+    def get_blob_properties(self):
+        return SimpleNamespace(size=len(self.data), etag="0x1")
+
+    def download_blob(self, offset=None, length=None, **kwargs):
+        self.requests += 1
+        self.bytes_downloaded += length
+        return SimpleNamespace(readall=lambda: self.data[offset : offset + length])
+
+
+class FakeRangeContainerClient:
+    def __init__(self, blob_client):
+        self.blob_client = blob_client
+
+    def get_blob_client(self, blob_path):
+        return self.blob_client
+
+
+def make_azure_blob(container_client, disk_cache):
+    # skip __init__ so no credentials or network are needed
+    azure_blob = AzureBlob.__new__(AzureBlob)
+    azure_blob.container_name = "container"
+    azure_blob.container_client = container_client
+    azure_blob.disk_cache = disk_cache
+    return azure_blob
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return BlobDiskCache(cache_dir=str(tmp_path), max_bytes=1e6)
+
+
+def test_unchanged_blob_served_from_cache(disk_cache):
+    client = FakeContainerClient({"processed/a.json": (b"{}", "0x1")})
+    azure_blob = make_azure_blob(client, disk_cache)
+
+    assert azure_blob.download_buffer("processed/a.json").to_pybytes() == b"{}"
+    assert azure_blob.download_buffer("processed/a.json").to_pybytes() == b"{}"
+    assert client.downloads == 1
+
+
+# another worker can evict the cached copy between the ETag check and the read
+def test_evicted_copy_downloaded_again(disk_cache):
+    client = FakeContainerClient({"processed/a.json": (b"{}", "0x1")})
+    azure_blob = make_azure_blob(client, disk_cache)
+    azure_blob.download_buffer("processed/a.json")
+
+    client.before_not_modified = lambda: os.remove(
+        disk_cache._file_path("container/processed/a.json")
+    )
+    assert azure_blob.download_buffer("processed/a.json").to_pybytes() == b"{}"
+    assert client.downloads == 2
+
+
+def test_server_error_falls_back_to_cache(disk_cache):
+    client = FakeContainerClient({"processed/a.json": (b"{}", "0x1")})
+    azure_blob = make_azure_blob(client, disk_cache)
+    azure_blob.download_buffer("processed/a.json")
+
+    client.error = HttpResponseError("service unavailable")
+    client.error.status_code = 503
+    assert azure_blob.download_buffer("processed/a.json").to_pybytes() == b"{}"
+
+    client.error = HttpResponseError("forbidden")
+    client.error.status_code = 403
+    with pytest.raises(HttpResponseError):
+        azure_blob.download_buffer("processed/a.json")
+
+
+# only the footer and the chunks of the requested columns should be downloaded
+def test_load_parquet_reads_only_requested_columns():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {f"model-{i}": rng.random(5000) for i in range(20)} | {"age": np.arange(5000)}
+    )
+    sink = io.BytesIO()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, sink, row_group_size=1000)
+    blob_client = FakeBlobClient(sink.getvalue())
+    azure_blob = make_azure_blob(FakeRangeContainerClient(blob_client), None)
+
+    loaded = azure_blob.load_parquet(
+        "processed/avg_price_summary.parquet",
+        columns=["model-3", "age"],
+        filters=[("age", "<", 1000)],
+    )
+
+    assert loaded.columns.tolist() == ["model-3", "age"]
+    assert len(loaded) == 1000
+    # 2 of 21 columns in 1 of 5 row groups plus the footer
+    assert blob_client.bytes_downloaded < len(blob_client.data) / 10
+    assert blob_client.requests < 10
+
+
+class FakeChunkedDownload:
+    def __init__(self, data, chunk_size):
+        self.data = data
+        self.size = len(data)
+        self.chunk_size = chunk_size
+
+    def readinto(self, stream):
+        # parallel chunk downloads finish in any order and seek before writing
+        starts = list(range(0, self.size, self.chunk_size))
+        for start in starts[1::2] + starts[::2][::-1]:
+            stream.seek(start)
+            stream.write(self.data[start : start + self.chunk_size])
+        return self.size
+
+
+def test_read_into_buffer_out_of_order_chunks():
+    data = np.random.default_rng(0).bytes(10_000)
+    azure_blob = make_azure_blob(None, None)
+
+    buffer = azure_blob._read_into_buffer(FakeChunkedDownload(data, 1024))
+
+    assert buffer.size == len(data)
+    assert buffer.to_pybytes() == data
+
+
+class FakeDefaultAzureCredential:
+    def __init__(self, **kwargs):
+        self.tokens_issued = 0
+
+    def get_token(self, *scopes, **kwargs):
+        self.tokens_issued += 1
+        return SimpleNamespace(token="token", expires_on=time.time() + 3600)
+
+
+# every AzureBlob in a process should share one client, pool and cached token
+def test_azure_blobs_share_client_and_token(monkeypatch):
+    monkeypatch.setattr(
+        azure_blob_storage, "DefaultAzureCredential", FakeDefaultAzureCredential
+    )
+    monkeypatch.setattr(azure_blob_storage, "_shared_credential", None)
+    monkeypatch.setattr(azure_blob_storage, "_blob_service_clients", {})
+    before = get_connection_stats()
+
+    account_url = "https://fortunatotest.blob.core.windows.net"
+    first = AzureBlob("data", account_url, use_disk_cache=False)
+    second = AzureBlob("other-data", account_url, use_disk_cache=False)
+    scope = "https://storage.azure.com/.default"
+    first.default_credential.get_token(scope)
+    second.default_credential.get_token(scope)
+
+    stats = get_connection_stats()
+    assert first.blob_service_client is second.blob_service_client
+    assert first.default_credential is second.default_credential
+    assert first.default_credential.credential.tokens_issued == 1
+    assert stats["credentials_created"] - before["credentials_created"] == 1
+    assert stats["clients_created"] - before["clients_created"] == 1
+    assert stats["token_requests"] - before["token_requests"] == 2
+    assert stats["token_refreshes"] - before["token_refreshes"] == 1
@@ -0,0 +1,49 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+import pytest
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.blob_cache import BlobDiskCache
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return BlobDiskCache(cache_dir=str(tmp_path), max_bytes=10)
+
+
+def test_put_and_read(disk_cache):
+    disk_cache.put("container/a.parquet", b"12345", etag="0x1")
+
+    assert disk_cache.get("container/a.parquet")["etag"] == "0x1"
+    assert disk_cache.read("container/a.parquet") == b"12345"
+    assert disk_cache.get("container/missing.parquet") is None
+
+
+# least recently used blob should be evicted once over the size limit
+def test_lru_eviction(disk_cache):
+    disk_cache.put("a", b"12345", etag="a")
+    disk_cache.put("b", b"12345", etag="b")
+    disk_cache.read("a")
+    disk_cache.put("c", b"12345", etag="c")
+
+    assert disk_cache.get("a") is not None
+    assert disk_cache.get("b") is None
+    assert disk_cache.get("c") is not None
+
+
+def test_blob_larger_than_cache_not_stored(disk_cache):
+    disk_cache.put("big", b"x" * 11, etag="big")
+    assert disk_cache.get("big") is None
+
+
+def test_read_evicted_blob(disk_cache):
+    disk_cache.put("a", b"12345", etag="a")
+    os.remove(disk_cache._file_path("a"))
+
+    assert disk_cache.read("a") is None
@@ -0,0 +1,168 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+import json
+
+import pytest
+import numpy as np
+import pandas as pd
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.build_summaries import (
+    AD_BATCH_DIR,
+    SummaryState,
+    prepare_ads,
+    build_summaries,
+    append_ads,
+    _partition_counts,
+)
+from src.data.summary_cache import SUMMARY_BLOBS, MANIFEST_BLOB
+
+ADS = pd.DataFrame(
+    {
+        "manufacturer": ["toyota", "toyota", "toyota", "honda", "honda"],
+        "model": ["Camry", "Camry", "Camry", "Civic", "Civic"],
+        "price": [20000, 10000, 15000, 9000, 100],
+        "year": [2021, 2021, 2019, 2016, 2016],
+        "odometer_km": [5000, 12000, 30000, 60000, 10000],
+        "condition": ["good", None, "excellent", "fair", "good"],
+        "fuel": ["gas", "gas", "hybrid", "gas", "gas"],
+        "transmission": ["automatic", "automatic", "automatic", "manual", None],
+        "cylinders": [4.0, 4.0, 6.0, None, 4.0],
+    }
+)
+
+
+def test_prepare_ads():
+    prepared = prepare_ads(ADS, posting_year=2021)
+
+    # the $100 civic is dropped as a placeholder price
+    assert len(prepared) == 4
+    assert prepared.model.tolist() == ["camry", "camry", "camry", "civic"]
+    assert prepared.age.tolist() == [0, 0, 2, 5]
+    # 60000 km over 5 years is 12000 km/yr
+    assert prepared.mileage_bin.tolist() == [2, 4, 6, 4]
+
+
+def test_summaries_from_ads():
+    summaries = SummaryState.from_ads(prepare_ads(ADS, posting_year=2021)).to_summaries()
+
+    price = summaries["price_summary"].set_index("age")
+    assert price.loc[0, "camry"] == 15000.0
+    assert price.loc[2, "camry"] == 15000.0
+    assert np.isnan(price.loc[1, "camry"])
+
+    num_ads = summaries["num_ads_summary"].set_index("age")
+    assert num_ads.camry.sum() == 3
+    assert num_ads.loc[5, "civic"] == 1
+
+    mileage = summaries["mileage_summary"]
+    assert mileage.camry.sum() == 1.0
+
+    assert summaries["makes_models"].to_dict("list") == {
+        "make": ["toyota", "honda"],
+        "model": ["camry", "civic"],
+    }
+
+
+def test_partitions_merge_to_same_counts():
+    prepared = prepare_ads(ADS, posting_year=2021)
+    columns = [
+        np.array([0, 0, 0, 1]),
+        prepared.age.to_numpy(),
+        prepared.price.to_numpy(),
+        prepared.mileage_bin.to_numpy(),
+    ]
+
+    whole = _partition_counts(*columns, 2)
+    halves = [_partition_counts(*[c[i : i + 2] for c in columns], 2) for i in (0, 2)]
+
+    for i in range(3):
+        assert np.array_equal(whole[i], halves[0][i] + halves[1][i])
+
+
+def test_build_summaries_writes_manifest(tmp_path):
+    input_path = tmp_path / "ads.csv"
+    ADS.to_csv(input_path, index=False)
+
+    stage_times = build_summaries(str(input_path), str(tmp_path), posting_year=2021)
+    assert set(stage_times) == {"load", "prepare", "aggregate", "summarize", "write"}
+
+    with open(tmp_path / MANIFEST_BLOB) as f:
+        manifest = json.load(f)
+    assert set(manifest["files"]) == set(SUMMARY_BLOBS.values())
+    for blob_path in SUMMARY_BLOBS.values():
+        assert os.path.exists(tmp_path / blob_path)
+
+
+def test_append_matches_full_build(tmp_path):
+    ADS.iloc[:2].to_csv(tmp_path / "first.csv", index=False)
+    ADS.iloc[2:].to_csv(tmp_path / "batch.csv", index=False)
+    ADS.to_csv(tmp_path / "all.csv", index=False)
+
+    build_summaries(str(tmp_path / "first.csv"), str(tmp_path / "inc"), 2021)
+    append_ads(str(tmp_path / "batch.csv"), str(tmp_path / "inc"), 2021)
+    build_summaries(str(tmp_path / "all.csv"), str(tmp_path / "full"), 2021)
+
+    # the batch is as large as the first build so it's merged into its ad store
+    assert not os.listdir(tmp_path / "inc" / AD_BATCH_DIR)
+    for blob_path in SUMMARY_BLOBS.values():
+        incremental = pd.read_parquet(tmp_path / "inc" / blob_path)
+        full = pd.read_parquet(tmp_path / "full" / blob_path)
+        pd.testing.assert_frame_equal(
+            incremental[sorted(incremental.columns)], full[sorted(full.columns)]
+        )
+
+
+# small batches are written as their own sorted file and merged when loaded
+def test_append_writes_ad_batch(tmp_path):
+    from src.data.storage import LocalBlob
+    from src.data.shared_store import SharedArrowStore
+    from src.data.summary_cache import SummaryCache
+
+    first = pd.concat([ADS.iloc[:4]] * 3, ignore_index=True)
+    batch = ADS.iloc[2:4]
+    first.to_csv(tmp_path / "first.csv", index=False)
+    batch.to_csv(tmp_path / "batch.csv", index=False)
+    pd.concat([first, batch]).to_csv(tmp_path / "all.csv", index=False)
+
+    inc_dir = tmp_path / "inc"
+    build_summaries(str(tmp_path / "first.csv"), str(inc_dir), 2021)
+    ads_path = inc_dir / SUMMARY_BLOBS["ads"]
+    with open(ads_path, "rb") as f:
+        base = f.read()
+    append_ads(str(tmp_path / "batch.csv"), str(inc_dir), 2021)
+    build_summaries(str(tmp_path / "all.csv"), str(tmp_path / "full"), 2021)
+
+    # the ads of earlier builds aren't read or rewritten
+    with open(ads_path, "rb") as f:
+        assert f.read() == base
+    with open(inc_dir / MANIFEST_BLOB) as f:
+        manifest = json.load(f)
+    batch_path = f"{AD_BATCH_DIR}/000001.parquet"
+    assert manifest["parts"] == {SUMMARY_BLOBS["ads"]: [batch_path]}
+    assert batch_path in manifest["files"]
+
+    full = pd.read_parquet(tmp_path / "full" / SUMMARY_BLOBS["ads"])
+    for backend_factory in (
+        lambda: LocalBlob(str(inc_dir)),
+        lambda: SharedArrowStore(
+            LocalBlob(str(inc_dir)), store_dir=str(tmp_path / "arrow")
+        ),
+    ):
+        cache = SummaryCache(backend_factory=backend_factory)
+        pd.testing.assert_frame_equal(cache.snapshot()["ads"], full)
+
+    # a full build replaces the batches
+    build_summaries(str(tmp_path / "all.csv"), str(inc_dir), 2021)
+    assert not os.listdir(inc_dir / AD_BATCH_DIR)
+
+
+def test_append_without_state(tmp_path):
+    ADS.to_csv(tmp_path / "batch.csv", index=False)
+    with pytest.raises(FileNotFoundError):
+        append_ads(str(tmp_path / "batch.csv"), str(tmp_path))
@@ -0,0 +1,74 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.summary_cache import SummarySnapshot
+from src.data.compact_summaries import get_compact_summaries
+
+
+@pytest.fixture
+def summaries():
+    frames = {
+        "makes_models": pd.DataFrame(
+            {"make": ["toyota", "honda", "toyota"], "model": ["camry", "civic", "4runner"]}
+        ),
+        "price_summary": pd.DataFrame(
+            {
+                "camry": [20000.0, np.nan, 12000.0],
+                "civic": [18000.0, 14000.0, 11000.0],
+                "4runner": [40000.0, 35000.0, np.nan],
+                "age": [0, 1, 2],
+            }
+        ),
+        "num_ads_summary": pd.DataFrame(
+            {"camry": [5, 0, 3], "civic": [2, 4, 6], "4runner": [1, 1, 0], "age": [0, 1, 2]}
+        ),
+        "mileage_summary": pd.DataFrame(
+            {
+                "camry": [0.5, 0.5],
+                "civic": [1.0, 0.0],
+                "4runner": [0.25, 0.75],
+                "yearly_mileage_range": [0, 2500],
+            }
+        ),
+    }
+    return get_compact_summaries(SummarySnapshot("v1", frames))
+
+
+def test_models_coded_by_make(summaries):
+    assert summaries.models.tolist() == ["civic", "4runner", "camry"]
+    assert summaries.makes.tolist() == ["honda", "toyota"]
+    assert summaries.make_offsets.tolist() == [0, 1, 3]
+    assert summaries.model_codes(["camry", "missing", "civic"]).tolist() == [2, 0]
+
+
+def test_long_layout(summaries):
+    # missing prices and zero counts aren't stored
+    assert len(summaries.price.values) == 7
+    assert len(summaries.num_ads.values) == 7
+    assert summaries.price.keys.dtype == np.int16
+    assert summaries.num_ads.values.dtype == np.int32
+    assert summaries.price.values.dtype == np.float32
+
+
+def test_model_totals(summaries):
+    assert summaries.num_ads.model_totals().tolist() == [12, 2, 8]
+    assert summaries.num_ads.model_totals([2, 0], key_range=[1, 2]).tolist() == [3, 10]
+
+
+def test_long_frame(summaries):
+    df = summaries.long_frame(
+        summaries.price, summaries.model_codes(["camry"]), [0, 1], "age", "price"
+    )
+    assert df.columns.tolist() == ["age", "model", "price", "make"]
+    assert df.age.tolist() == [0]
+    assert df.model.tolist() == ["Camry (Toyota)"]
@@ -0,0 +1,136 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.ad_store import AdStore
+from src.data.build_summaries import AD_STORE_COLUMNS, ad_store_frame, prepare_ads
+from src.data.facet_index import FacetIndex, popcount
+
+rng = np.random.default_rng(0)
+NUM_ADS = 3001
+ADS = pd.DataFrame(
+    {
+        "manufacturer": rng.choice(["toyota", "honda"], NUM_ADS),
+        "model": rng.choice(["camry", "civic", "tacoma"], NUM_ADS),
+        "price": rng.integers(500, 60_000, NUM_ADS),
+        "year": rng.integers(2001, 2022, NUM_ADS),
+        "odometer_km": rng.integers(0, 300_000, NUM_ADS),
+        "condition": rng.choice(["good", "fair", "like new", None], NUM_ADS),
+        "fuel": rng.choice(["gas", "diesel", "hybrid"], NUM_ADS),
+        "transmission": rng.choice(["automatic", "manual", None], NUM_ADS),
+        "cylinders": rng.choice([4.0, 6.0, 8.0, np.nan], NUM_ADS),
+    }
+)
+
+
+@pytest.fixture(scope="module")
+def store():
+    return AdStore(
+        ad_store_frame(
+            prepare_ads(ADS, posting_year=2021, extra_columns=AD_STORE_COLUMNS)
+        )
+    )
+
+
+def facet_mask(store, selected, exclude=None):
+    mask = np.ones(len(store), dtype=bool)
+    for facet, values in selected.items():
+        if facet == exclude:
+            continue
+        if facet == "cylinders":
+            mask &= np.isin(store.numeric[facet], [float(v) for v in values])
+        else:
+            codes, categories = store.categorical[facet]
+            mask &= np.isin(codes, np.flatnonzero(np.isin(categories, values)))
+    return mask
+
+
+def test_popcount():
+    bits = np.packbits(np.array([1, 0, 1, 1, 0, 0, 0, 1] * 4, dtype=bool))
+    assert popcount(bits) == 16
+
+
+def test_facet_values(store):
+    facet_index = FacetIndex(store)
+    assert facet_index.values["condition"] == ["fair", "good", "like new"]
+    assert facet_index.values["cylinders"] == ["4", "6", "8"]
+
+
+def test_counts_match_masks(store):
+    facet_index = FacetIndex(store)
+    rows = store.select(models=["camry", "tacoma"], age_range=[2, 12])
+    base = facet_index.rows_bitmap(rows)
+    selected = {"fuel": ["gas", "hybrid"], "cylinders": ["6"]}
+    in_base = np.zeros(len(store), dtype=bool)
+    in_base[rows] = True
+
+    expected = in_base & facet_mask(store, selected)
+    assert facet_index.count(base, selected) == expected.sum()
+    assert np.array_equal(facet_index.rows(base, selected), np.flatnonzero(expected))
+
+    counts = facet_index.counts(base, selected)
+    # options of a facet ignore its own selection but apply the others
+    others = in_base & facet_mask(store, selected, exclude="fuel")
+    codes, categories = store.categorical["fuel"]
+    for i, value in enumerate(categories):
+        assert counts["fuel"][value] == (others & (codes == i)).sum()
+    assert counts["condition"]["good"] == (
+        expected & (store.categorical["condition"][0] == 1)
+    ).sum()
+
+
+def test_unknown_value_matches_nothing(store):
+    facet_index = FacetIndex(store)
+    base = facet_index.rows_bitmap(store.select())
+    assert facet_index.count(base, {"fuel": ["steam"]}) == 0
+    assert facet_index.count(base, {}) == len(store)
+
+
+# rare values keep their row ids and common ones a bitmap, counts are the same
+def test_sparse_values_match_masks():
+    ads = ADS.copy()
+    ads.loc[ads.index[::200], "fuel"] = "electric"
+    ads.loc[ads.index[5::300], "cylinders"] = 12.0
+    store = AdStore(
+        ad_store_frame(
+            prepare_ads(ads, posting_year=2021, extra_columns=AD_STORE_COLUMNS)
+        )
+    )
+    facet_index = FacetIndex(store)
+    electric = facet_index.values["fuel"].index("electric")
+    assert facet_index.containers["fuel"][electric].dtype == np.int32
+    assert facet_index.containers["fuel"][0].dtype == np.uint8
+    dense_bytes = sum(len(v) for v in facet_index.values.values()) * facet_index.num_bytes
+    assert facet_index.nbytes < dense_bytes
+
+    rows = store.select(models=["camry", "civic"])
+    base = facet_index.rows_bitmap(rows)
+    in_base = np.zeros(len(store), dtype=bool)
+    in_base[rows] = True
+    for selected in [
+        {"fuel": ["electric", "gas"]},
+        {"fuel": ["electric"], "cylinders": ["12", "4"]},
+        {"cylinders": ["12"], "condition": ["good"]},
+    ]:
+        expected = in_base & facet_mask(store, selected)
+        assert facet_index.count(base, selected) == expected.sum()
+        assert np.array_equal(
+            facet_index.rows(base, selected), np.flatnonzero(expected)
+        )
+        counts = facet_index.counts(base, selected)
+        others = in_base & facet_mask(store, selected, exclude="cylinders")
+        cylinders = store.numeric["cylinders"]
+        assert counts["cylinders"]["12"] == (others & (cylinders == 12)).sum()
+        others = in_base & facet_mask(store, selected, exclude="fuel")
+        codes, categories = store.categorical["fuel"]
+        for i, value in enumerate(categories):
+            assert counts["fuel"][value] == (others & (codes == i)).sum()
@@ -0,0 +1,79 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+import time
+
+import pytest
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.figure_cache import FigureCache, FigureDiskCache, figure_cache_key
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return FigureDiskCache(cache_dir=str(tmp_path), max_bytes=10, ttl_s=60)
+
+
+def test_figure_cache_key():
+    assert figure_cache_key("v1", ["camry", "civic"], [0, 15]) == (
+        '["v1",["camry","civic"],[0,15]]'
+    )
+
+
+def test_disk_cache_shared_between_instances(disk_cache):
+    disk_cache.put("a", "12345")
+    # another worker using the same directory
+    other = FigureDiskCache(cache_dir=disk_cache.cache_dir, max_bytes=10, ttl_s=60)
+
+    assert other.get("a") == "12345"
+    assert other.get("missing") is None
+    assert other.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_disk_cache_expires_entries(disk_cache):
+    disk_cache.put("a", "12345")
+    past = time.time() - 120
+    os.utime(disk_cache._file_path("a"), (past, past))
+
+    assert disk_cache.get("a") is None
+
+
+# oldest figures should be removed once over the size limit
+def test_disk_cache_size_limit(disk_cache):
+    disk_cache.put("a", "12345")
+    past = time.time() - 30
+    os.utime(disk_cache._file_path("a"), (past, past))
+    disk_cache.put("b", "12345")
+    disk_cache.put("c", "12345")
+
+    assert disk_cache.get("a") is None
+    assert disk_cache.get("b") == "12345"
+    assert disk_cache.get("c") == "12345"
+    disk_cache.put("too-big", "12345678901")
+    assert disk_cache.get("too-big") is None
+
+
+def test_tiers_and_hit_rates(disk_cache):
+    cache = FigureCache(memory_size=1, disk_cache=disk_cache)
+    cache.put("a", "1")
+    cache.put("b", "2")
+
+    # "a" was evicted from memory but is still on disk, and moves back to memory
+    assert cache.get("a") == "1"
+    assert cache.get("a") == "1"
+    assert cache.get("missing") is None
+
+    stats = cache.stats()
+    assert (stats["memory"]["hits"], stats["memory"]["misses"]) == (1, 2)
+    assert (stats["disk"]["hits"], stats["disk"]["misses"]) == (1, 1)
+
+
+def test_memory_only():
+    cache = FigureCache(memory_size=2)
+    cache.put("a", "1")
+    assert cache.get("a") == "1"
+    assert "disk" not in cache.stats()
@@ -0,0 +1,56 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+import pandas as pd
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.load_preprocess_craigslist import load_craigslist_data
+
+CSV = """manufacturer,model,price,year,condition,cylinders,fuel,odometer,transmission,odometer_km
+Toyota,Tundra Double Cab Sr,30990,2017,good,8 ,gas,41124.0,other,66182
+Toyota,Tacoma,35000,2019,,,gas,43000.0,automatic,69201
+Honda,Civic,9000,2012,excellent,4 ,,120000.0,manual,193121
+"""
+
+
+def test_load_typed(tmp_path):
+    data_path = tmp_path / "cleaned-vehicles.csv"
+    data_path.write_text(CSV)
+
+    df = load_craigslist_data(data_path=str(data_path))
+
+    assert len(df) == 3
+    assert df.manufacturer.dtype == "category"
+    assert df.price.dtype == "int32"
+    assert df.year.dtype == "int16"
+    assert df.cylinders.tolist()[0] == 8.0
+    assert pd.isna(df.condition[1])
+
+
+def test_load_cached_columns(tmp_path):
+    data_path = tmp_path / "cleaned-vehicles.csv"
+    data_path.write_text(CSV)
+
+    load_craigslist_data(data_path=str(data_path))
+    assert os.path.exists(tmp_path / "cleaned-vehicles.parquet")
+
+    df = load_craigslist_data(columns=["model", "price"], data_path=str(data_path))
+    assert df.columns.tolist() == ["model", "price"]
+    assert df.model.tolist() == ["Tundra Double Cab Sr", "Tacoma", "Civic"]
+
+
+def test_cache_refreshed_when_csv_changes(tmp_path):
+    data_path = tmp_path / "cleaned-vehicles.csv"
+    data_path.write_text(CSV)
+    load_craigslist_data(data_path=str(data_path))
+
+    data_path.write_text(CSV.rsplit("Honda", 1)[0])
+    cache_path = tmp_path / "cleaned-vehicles.parquet"
+    os.utime(cache_path, (0, 0))
+
+    assert len(load_craigslist_data(data_path=str(data_path))) == 2
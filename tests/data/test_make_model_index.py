@@ -0,0 +1,81 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+import threading
+
+import pandas as pd
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.summary_cache import SummarySnapshot
+from src.data.make_model_index import INVALID_MODELS, get_make_model_index
+
+
+def make_snapshot():
+    makes_models = pd.DataFrame(
+        {
+            "make": ["toyota", "honda", "toyota", "honda", "toyota"],
+            "model": ["tacoma", "civic", "camry", "accord", "other"],
+        }
+    )
+    num_ads = pd.DataFrame({model: [1, 2] for model in makes_models.model})
+    num_ads["age"] = [0, 1]
+    return SummarySnapshot(
+        "v1", {"makes_models": makes_models, "num_ads_summary": num_ads}
+    )
+
+
+def test_index_excludes_invalid_models():
+    index = get_make_model_index(make_snapshot(), ["other"])
+
+    assert index.models.tolist() == ["accord", "camry", "civic", "tacoma"]
+    assert index.models_by_make == {
+        "honda": ("accord", "civic"),
+        "toyota": ("camry", "tacoma"),
+    }
+    # invalid models can still be looked up
+    assert index.make_of["other"] == "toyota"
+
+
+def test_codes_for_makes_sorted_by_name():
+    index = get_make_model_index(make_snapshot(), ["other"])
+    models = index.summaries.models
+
+    assert models[index.codes_for_makes(["toyota", "honda"])].tolist() == [
+        "accord",
+        "camry",
+        "civic",
+        "tacoma",
+    ]
+    assert len(index.codes_for_makes(["missing"])) == 0
+
+
+def test_index_built_once_per_snapshot():
+    snapshot = make_snapshot()
+    assert get_make_model_index(snapshot, ["other"]) is get_make_model_index(
+        snapshot, ["other"]
+    )
+
+
+# the index is built from the compact summaries which are themselves derived, so
+# building it first on a fresh snapshot must not wait on its own lock
+def test_index_built_before_compact_summaries():
+    snapshot = make_snapshot()
+    thread = threading.Thread(target=get_make_model_index, args=(snapshot,))
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert get_make_model_index(snapshot).make_of["camry"] == "toyota"
+
+
+# pages calling without the invalid models must share the index built with them
+def test_default_invalid_models_shared():
+    snapshot = make_snapshot()
+    assert get_make_model_index(snapshot) is get_make_model_index(
+        snapshot, INVALID_MODELS
+    )
+    assert "other" not in get_make_model_index(snapshot).models
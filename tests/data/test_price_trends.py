@@ -0,0 +1,88 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+import numpy as np
+import pytest
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.compact_summaries import LongSummary
+from src.data.price_trends import (
+    PriceTrends,
+    lowess,
+    rolling_mean,
+    smooth,
+    smoother_setting,
+    trend_summary,
+)
+
+rng = np.random.default_rng(0)
+
+
+# same curves as the statsmodels lowess plotly express used to fit
+@pytest.mark.parametrize("num_points", [4, 9, 16, 25])
+def test_lowess_matches_statsmodels(num_points):
+    sm_lowess = pytest.importorskip(
+        "statsmodels.nonparametric.smoothers_lowess"
+    ).lowess
+    ages = np.sort(rng.choice(np.arange(30), num_points, replace=False)).astype(float)
+    prices = 40_000 * np.exp(-ages / 8) + rng.normal(0, 1500, num_points)
+    # an outlier to exercise the robustifying iterations
+    prices[num_points // 2] += 20_000
+
+    expected = sm_lowess(prices, ages)[:, 1]
+    assert np.allclose(lowess(ages, prices), expected, rtol=1e-6)
+
+
+def test_rolling_mean_and_unknown_smoother():
+    ages = np.arange(5)
+    prices = np.array([10.0, 20.0, 30.0, 40.0, 50.0])
+    assert rolling_mean(ages, prices).tolist() == [15, 20, 30, 40, 45]
+    assert np.allclose(smooth(ages, prices, "linear"), prices)
+    with pytest.raises(ValueError):
+        smooth(ages, prices, "spline")
+
+
+def price_summary():
+    # two models, prices at or below 500 aren't plotted so aren't fit
+    codes = np.array([0, 0, 0, 0, 0, 1, 1, 1, 1])
+    ages = np.array([1, 2, 3, 4, 5, 1, 2, 3, 4])
+    prices = np.array(
+        [30000, 25000, 400, 18000, 15000, 20000, 18000, 15000, 14000],
+        dtype=np.float32,
+    )
+    return LongSummary(codes, ages, prices, num_models=3)
+
+
+# a mistyped setting falls back rather than failing the explore page at import
+def test_smoother_setting():
+    assert smoother_setting("rolling") == "rolling"
+    assert smoother_setting("loess") == "lowess"
+    assert smoother_setting("", default="linear") == "linear"
+
+
+def test_trend_summary():
+    trends = trend_summary(price_summary(), [1, 0], "rolling")
+
+    rows = trends.rows([0])
+    assert trends.keys[rows].tolist() == [1, 2, 4, 5]
+    assert np.allclose(
+        trends.values[rows], rolling_mean(None, [30000, 25000, 18000, 15000])
+    )
+    assert len(trends.rows([2])) == 0
+
+
+def test_price_trends_fit_once_per_model():
+    trends = PriceTrends(price_summary(), "lowess")
+    first = trends.summary([0, 1])
+    assert trends.curve(1) is trends.curve(1)
+
+    expected = trend_summary(price_summary(), [0, 1], "lowess")
+    assert first.model_codes.tolist() == expected.model_codes.tolist()
+    assert np.allclose(first.values, expected.values)
+    assert len(trends.summary([]).model_codes) == 0
+
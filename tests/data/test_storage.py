@@ -0,0 +1,59 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+
+import pytest
+import pandas as pd
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.storage import LocalBlob, StorageBackend, get_storage_backend
+
+
+@pytest.fixture
+def local_blob(tmp_path):
+    os.makedirs(tmp_path / "processed")
+    pd.DataFrame(
+        {"camry": [20000.0, 15000.0, 12000.0], "civic": [18000.0, 14000.0, 11000.0], "age": [0, 1, 2]}
+    ).to_parquet(tmp_path / "processed" / "avg_price_summary.parquet")
+    return LocalBlob(data_dir=str(tmp_path))
+
+
+def test_local_list_blobs(local_blob):
+    assert [blob.name for blob in local_blob.list_blobs()] == [
+        "processed/avg_price_summary.parquet"
+    ]
+
+
+def test_local_load_parquet(local_blob):
+    df = local_blob.load_parquet("processed/avg_price_summary.parquet")
+    assert df.columns.tolist() == ["camry", "civic", "age"]
+
+    df = local_blob.load_parquet(
+        "processed/avg_price_summary.parquet",
+        columns=["civic", "age"],
+        filters=[("age", ">=", 1)],
+    )
+    assert df.civic.tolist() == [14000.0, 11000.0]
+
+
+def test_local_missing_blob(local_blob):
+    with pytest.raises(FileNotFoundError):
+        local_blob.load_parquet("processed/missing.parquet")
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_storage_backend("s3")
+
+
+def test_incomplete_backend_cannot_be_created():
+    class ListOnlyBackend(StorageBackend):
+        def list_blobs(self):
+            return []
+
+    with pytest.raises(TypeError):
+        ListOnlyBackend()
@@ -0,0 +1,73 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+import json
+
+import numpy as np
+import pandas as pd
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.store_codec import (
+    encode_frame,
+    serialize_frame,
+    decode_frame,
+    is_encoded,
+)
+
+
+def test_round_trip():
+    df = pd.DataFrame(
+        {
+            "camry": [20000.0, np.nan, 12000.0],
+            "civic": [18000.0, 14000.0, 11000.0],
+            "age": [0, 1, 2],
+            "make": ["toyota", None, "honda"],
+        }
+    )
+    payload = json.loads(json.dumps(encode_frame(df, version="v1", float_dtype=None)))
+
+    assert is_encoded(payload)
+    assert payload["version"] == "v1"
+    pd.testing.assert_frame_equal(decode_frame(payload), df)
+
+
+def test_serialized_round_trip():
+    df = pd.DataFrame({"civic": [18000.0, 14000.0], "age": [0, 1]})
+    payload = serialize_frame(df, version="v1")
+
+    assert isinstance(payload, str)
+    assert json.loads(payload)["version"] == "v1"
+    pd.testing.assert_frame_equal(decode_frame(payload), df)
+
+
+def test_floats_downcast():
+    df = pd.DataFrame({"camry": [20000.5, 1 / 3]})
+    decoded = decode_frame(encode_frame(df))
+
+    assert decoded.camry.dtype == np.float64
+    assert decoded.camry[0] == 20000.5
+    assert np.isclose(decoded.camry[1], 1 / 3)
+
+
+def test_round_trip_index():
+    df = pd.DataFrame({"num_ads": [3, 4]}, index=pd.Index(["camry", "civic"], name="model"))
+    pd.testing.assert_frame_equal(decode_frame(encode_frame(df)), df)
+
+
+def test_decode_legacy_dict():
+    df = decode_frame({"camry": [1, 2], "age": [0, 1]})
+    assert df.camry.tolist() == [1, 2]
+
+
+def test_payload_smaller_than_dict():
+    df = pd.DataFrame(
+        np.where(np.random.rand(20, 500) > 0.7, np.random.rand(20, 500) * 1e5, np.nan),
+        columns=[f"model-{i}" for i in range(500)],
+    )
+    encoded_size = len(json.dumps(encode_frame(df)))
+    dict_size = len(json.dumps(df.to_dict()))
+    assert encoded_size * 5 < dict_size
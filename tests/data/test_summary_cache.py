@@ -0,0 +1,197 @@
+# Author: Ty Andrews
+# Date: 2026-10-18
+import os, sys
+import threading
+import time
+
+import pytest
+import pandas as pd
+
+# ensure that the parent directory is on the path for relative imports
+SRC_PATH = sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+from src.data.store_codec import decode_frame
+import src.data.summary_cache as summary_cache_module
+from src.data.summary_cache import SummaryCache, store_payload, resolve_snapshot
+
+BLOB_PATHS = {
+    "price_summary": "processed/avg_price_summary.parquet",
+    "makes_models": "processed/makes_models.parquet",
+}
+
+
+class FakeBackend:
+    loads = 0
+
+    def load_parquet(self, blob_path):
+        FakeBackend.loads += 1
+        if blob_path.endswith("makes_models.parquet"):
+            return pd.DataFrame({"make": ["toyota"], "model": ["camry"]})
+        return pd.DataFrame({"camry": [20000.0, 15000.0], "age": [0, 1]})
+
+
+@pytest.fixture
+def cache():
+    FakeBackend.loads = 0
+    return SummaryCache(backend_factory=FakeBackend, blob_paths=BLOB_PATHS)
+
+
+# the summaries should only be downloaded once no matter how many sessions ask
+def test_summaries_loaded_once(cache):
+    threads = [threading.Thread(target=cache.snapshot) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert FakeBackend.loads == len(BLOB_PATHS)
+    assert cache.ensure_loaded() is None
+    assert cache.snapshot()["makes_models"].model.tolist() == ["camry"]
+
+
+def test_invalidate_reloads(cache):
+    load_times = cache.ensure_loaded()
+    assert set(load_times) == set(BLOB_PATHS)
+
+    version = cache.snapshot().version
+    cache.invalidate()
+    assert not cache.is_loaded
+    # same data so the version shouldn't change
+    assert cache.snapshot().version == version
+    assert FakeBackend.loads == 2 * len(BLOB_PATHS)
+
+
+def test_store_payload_built_once(cache):
+    snapshot = cache.snapshot()
+    payload = store_payload(snapshot, "price_summary", mode="client")
+    pd.testing.assert_frame_equal(
+        decode_frame(payload), snapshot["price_summary"], check_exact=False
+    )
+    assert store_payload(snapshot, "price_summary", mode="client") is payload
+
+
+def test_server_mode_payload_is_version_token(cache, monkeypatch):
+    snapshot = cache.snapshot()
+    payload = store_payload(snapshot, "price_summary", mode="server")
+    assert payload == {"version": snapshot.version}
+
+    monkeypatch.setattr(summary_cache_module, "summary_cache", cache)
+    assert resolve_snapshot(None, price_summary=payload) is snapshot
+
+
+# serialized client payloads carry their version so the cached frames are used
+def test_client_payload_resolves_cached_version(cache, monkeypatch):
+    snapshot = cache.snapshot()
+    payload = store_payload(snapshot, "price_summary", mode="client")
+
+    monkeypatch.setattr(summary_cache_module, "summary_cache", cache)
+    assert resolve_snapshot(None, price_summary=payload) is snapshot
+
+
+# summaries are fetched in parallel so the wall time should be close to a single fetch
+def test_summaries_loaded_concurrently():
+    class SlowBackend(FakeBackend):
+        def load_parquet(self, blob_path):
+            time.sleep(0.2)
+            return super().load_parquet(blob_path)
+
+    cache = SummaryCache(backend_factory=SlowBackend, blob_paths=BLOB_PATHS)
+    snapshot = cache.snapshot()
+
+    assert snapshot.load_wall_time_ms < 200 * len(BLOB_PATHS)
+    assert all(ms >= 200 for ms in snapshot.load_times_ms.values())
+
+
+# workers should share one memory-mapped copy and get back the same data
+def test_shared_arrow_store(tmp_path):
+    from src.data.shared_store import SharedArrowStore
+
+    df = FakeBackend().load_parquet("processed/avg_price_summary.parquet")
+    df.loc[1, "camry"] = float("nan")
+    FakeBackend.loads = 0
+
+    class NaNBackend:
+        def load_parquet(self, blob_path):
+            FakeBackend.loads += 1
+            return df
+
+    worker_1 = SharedArrowStore(NaNBackend(), store_dir=str(tmp_path))
+    worker_2 = SharedArrowStore(NaNBackend(), store_dir=str(tmp_path))
+
+    pd.testing.assert_frame_equal(worker_1.load_parquet("processed/a.parquet"), df)
+    pd.testing.assert_frame_equal(worker_2.load_parquet("processed/a.parquet"), df)
+    assert FakeBackend.loads == 1
+
+
+# categorical columns are mapped as their codes rather than decoded per worker
+def test_shared_arrow_store_categorical(tmp_path):
+    from src.data.shared_store import SharedArrowStore
+
+    df = pd.DataFrame(
+        {
+            "fuel": pd.Categorical(["gas", None, "diesel", "gas"]),
+            "price": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+
+    class CategoricalBackend:
+        def load_parquet(self, blob_path):
+            return df
+
+    store = SharedArrowStore(CategoricalBackend(), store_dir=str(tmp_path))
+    loaded = store.load_parquet("processed/ads.parquet")
+
+    pd.testing.assert_frame_equal(loaded, df)
+    codes = loaded["fuel"].cat.codes.to_numpy()
+    # read-only views of the memory map, not private copies
+    assert not codes.flags.writeable and not codes.flags.owndata
+    prices = store.load_parquet("processed/ads.parquet", columns=["price"])
+    assert prices.columns.tolist() == ["price"]
+
+
+# only summaries whose hash changed in the manifest should be downloaded again
+def test_refresh_from_manifest():
+    manifest = {
+        "version": "v1",
+        "files": {
+            "processed/avg_price_summary.parquet": {"sha256": "a"},
+            "processed/makes_models.parquet": {"sha256": "b"},
+        },
+    }
+    loaded = []
+
+    class ManifestBackend(FakeBackend):
+        def load_parquet(self, blob_path):
+            loaded.append(blob_path)
+            return super().load_parquet(blob_path)
+
+        def load_json(self, blob_path):
+            return manifest
+
+    cache = SummaryCache(backend_factory=ManifestBackend, blob_paths=BLOB_PATHS)
+    notified = []
+    cache.add_listener(lambda snapshot: notified.append(snapshot.version))
+    first = cache.snapshot()
+    assert first.version == "v1"
+    assert cache.refresh() is False
+
+    manifest = {
+        "version": "v2",
+        "files": {
+            "processed/avg_price_summary.parquet": {"sha256": "c"},
+            "processed/makes_models.parquet": {"sha256": "b"},
+        },
+    }
+    loaded.clear()
+    assert cache.refresh() is True
+
+    second = cache.snapshot()
+    assert second.version == "v2"
+    assert loaded == ["processed/avg_price_summary.parquet"]
+    assert second["makes_models"] is first["makes_models"]
+    # sessions on the old version can still use it
+    assert cache.get_version("v1") is first
+    # listeners see every version loaded or swapped in, once
+    assert notified == ["v1", "v2"]
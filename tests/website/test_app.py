@@ -3,6 +3,7 @@ import os, sys
 import pytest
 import dash
 import logging 
+import threading
 from dash.dependencies import Input, Output, State
 
 # on launch ensure src is in path
@@ -16,7 +17,9 @@ except ValueError:
 if SRC_PATH not in sys.path:
     sys.path.append(SRC_PATH)
 
+import src.app as app_module
 from src.app import toggle_navbar_collapse, load_data
+from src.data.summary_cache import SummarySnapshot
 
 @pytest.fixture
 def sample_data():
@@ -32,6 +35,28 @@ def test_data_already_loaded(sample_data):
     first_load = True
     pytest.raises(dash.exceptions.PreventUpdate, load_data, first_load, price_summary, num_ads_summary, mileage_summary)
 
+# ensure the load times are sent once per worker whoever loaded the data
+def test_load_times_reported_once(monkeypatch):
+    events = []
+    monkeypatch.setattr(app_module, "_load_times_reported", False)
+    monkeypatch.setattr(
+        app_module, "custom_event_to_GA", lambda *args: events.append(args[1:])
+    )
+    snapshot = SummarySnapshot("v1", {}, {"price_summary": 120.0}, 150.0)
+
+    app_module.report_load_times(snapshot)
+    app_module.report_load_times(snapshot)
+
+    assert events == [
+        ("price_data_load_time", {"time_ms": 120.0}),
+        ("summary_data_load_wall_time", {"time_ms": 150.0}),
+    ]
+
+# ensure importing the app doesn't start the worker's background threads
+def test_no_background_threads_on_import():
+    names = {thread.name for thread in threading.enumerate()}
+    assert not names & {"summary-refresher", "summary-loader", "popular-selections-flusher"}
+
 # ensure the navbar collapse toggles correctly
 @pytest.mark.parametrize(
     "n, is_open, expected",
@@ -102,4 +102,243 @@ def test_update_filter_option_single_make(sample_data):
         {'label': 'Camry (6000 ads)', 'value': 'camry'}, 
     ]
     assert max_price == 30000
-    assert price_slider_values == [0, 30000]    
\ No newline at end of file
+    assert price_slider_values == [0, 30000]    
+
+# ends of the price slider left at its limits shouldn't filter anything out
+def test_price_bounds():
+    from src.pages.explore_ads import price_bounds
+
+    assert price_bounds([0, 60_000], 60_000) is None
+    assert price_bounds([5_000, 60_000], 60_000) == [5_000, None]
+    assert price_bounds([0, 20_000], 60_000) == [None, 20_000]
+    assert price_bounds([5_000, 20_000], 60_000) == [5_000, 20_000]
+
+
+def test_facet_selection():
+    from src.pages.explore_ads import facet_selection
+
+    assert facet_selection(None) == {}
+    assert facet_selection([[], ["gas"], [], ["4", "6"]]) == {
+        "fuel": ["gas"],
+        "cylinders": ["4", "6"],
+    }
+
+
+# selections differing only in order share one cache entry per data version
+def test_filter_options_memoized(sample_data):
+    from src.data.summary_cache import SummarySnapshot, resolve_snapshot
+    from src.pages.explore_ads import filter_options, filter_options_cache
+
+    makes_models_store, price_summary_store, num_ads_summary_store = sample_data
+    decoded = resolve_snapshot(
+        None,
+        makes_models=makes_models_store,
+        price_summary=price_summary_store,
+        num_ads_summary=num_ads_summary_store,
+    )
+    snapshot = SummarySnapshot("v-test", decoded.frames)
+    filter_options_cache.clear()
+
+    first = filter_options(snapshot, ["toyota", "honda"], [], ["toyota", "honda"])
+    second = filter_options(snapshot, ["honda", "toyota"], [], ["honda", "toyota"])
+
+    assert second is first
+    assert first[0] == [
+        {"label": "Accord (12000 ads)", "value": "accord"},
+        {"label": "Camry (6000 ads)", "value": "camry"},
+    ]
+    assert first[2] == 35000
+    stats = filter_options_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+# re-firing with the callback's own outputs shouldn't update anything
+def test_update_filter_options_unchanged_prevents_update(sample_data):
+    from dash.exceptions import PreventUpdate
+
+    makes_models_store, price_summary_store, num_ads_summary_store = sample_data
+    outputs = update_filter_options(
+        True, ["toyota"], None, [], [], 60000, [0, 60000],
+        makes_models_store, price_summary_store, num_ads_summary_store,
+    )
+    model_options, make_options, max_price, price_slider_values = outputs
+
+    with pytest.raises(PreventUpdate):
+        update_filter_options(
+            True, ["toyota"], make_options, [], model_options, max_price,
+            price_slider_values, makes_models_store, price_summary_store,
+            num_ads_summary_store,
+        )
+
+
+def make_ads_snapshot(num_ads=2000):
+    """Snapshot with summaries, an ads cube and an ad store of random ads."""
+    import numpy as np
+    from src.data.ads_cube import build_ads_cube
+    from src.data.build_summaries import (
+        AD_STORE_COLUMNS,
+        MILEAGE_BIN_KM,
+        SummaryState,
+        ad_store_frame,
+        prepare_ads,
+    )
+    from src.data.summary_cache import SummarySnapshot
+
+    rng = np.random.default_rng(0)
+    ads = pd.DataFrame(
+        {
+            "manufacturer": rng.choice(["toyota", "honda"], num_ads),
+            "model": rng.choice(["camry", "civic"], num_ads),
+            "price": rng.integers(1000, 60_000, num_ads),
+            "year": rng.integers(2005, 2022, num_ads),
+            "odometer_km": rng.integers(0, 300_000, num_ads),
+            "condition": rng.choice(["good", "fair"], num_ads),
+            "fuel": rng.choice(["gas", "diesel"], num_ads),
+            "transmission": rng.choice(["automatic", "manual"], num_ads),
+            "cylinders": rng.choice([4.0, 6.0], num_ads),
+        }
+    )
+    prepared = prepare_ads(ads, posting_year=2021, extra_columns=AD_STORE_COLUMNS)
+    frames = SummaryState.from_ads(prepared).to_summaries()
+    frames["ads_cube"] = build_ads_cube(prepared, MILEAGE_BIN_KM)
+    frames["ads"] = ad_store_frame(prepared)
+    return SummarySnapshot("v1", frames), prepared
+
+
+# the merged plot callback selects the ads once and builds all three plots from them
+def test_explore_figures_with_vehicle_details():
+    from src.pages.explore_ads import explore_figures
+
+    snapshot, prepared = make_ads_snapshot()
+
+    (price_fig, mileage_fig, num_ads_fig), times_ms = explore_figures(
+        snapshot, ["camry", "civic"], [2, 10], None, {"fuel": ["diesel"]}
+    )
+
+    assert len(times_ms) == 3
+    assert len(price_fig.data) > 0 and len(mileage_fig.data) > 0
+    # a precomputed trend line in the colour of each model's points
+    points = [trace for trace in price_fig.data if trace.mode == "markers"]
+    lines = [trace for trace in price_fig.data if trace.mode == "lines"]
+    assert len(lines) == len(points) == 2
+    assert [line.line.color for line in lines] == [p.marker.color for p in points]
+    matching = prepared[prepared.age.between(2, 10) & (prepared.fuel == "diesel")]
+    num_ads_by_model = {
+        trace.y[0]: trace.x[0] for trace in num_ads_fig.data
+    }
+    assert sorted(num_ads_by_model.values()) == sorted(
+        matching.groupby("model").size().tolist()
+    )
+
+
+# only facet filters scan the ad store, the default view and price ranges are
+# answered from the running totals and the ads cube
+def test_matching_ad_count(monkeypatch):
+    import src.pages.explore_ads as explore_ads
+    from src.data.compact_summaries import get_compact_summaries
+
+    snapshot, prepared = make_ads_snapshot()
+    model_codes = get_compact_summaries(snapshot).model_codes(["camry", "civic"])
+    in_ages = prepared[prepared.age.between(2, 10)]
+    diesel = in_ages[in_ages.fuel == "diesel"]
+
+    assert explore_ads.matching_ad_count(
+        snapshot, model_codes, [2, 10], None, {"fuel": ["diesel"]}
+    ) == len(diesel)
+
+    def no_ad_store(*args):
+        raise AssertionError("ad store scanned without a facet filter")
+
+    monkeypatch.setattr(explore_ads, "matching_ad_rows", no_ad_store)
+    assert explore_ads.matching_ad_count(
+        snapshot, model_codes, [2, 10], None, {}
+    ) == len(in_ages)
+    # the cube filters prices by whole bins, these bounds are on bin edges
+    assert explore_ads.matching_ad_count(
+        snapshot, model_codes, [2, 10], [10_000, 19_999], {}
+    ) == in_ages.price.between(10_000, 19_999).sum()
+
+
+# the same selection in any order is one figure cache lookup after the first build
+def test_cached_explore_figures(sample_data, tmp_path, monkeypatch):
+    import src.pages.explore_ads as explore_ads
+    from src.data.figure_cache import FigureCache, FigureDiskCache
+    from src.data.summary_cache import SummarySnapshot, resolve_snapshot
+
+    makes_models_store, price_summary_store, num_ads_summary_store = sample_data
+    decoded = resolve_snapshot(
+        None,
+        makes_models=makes_models_store,
+        price_summary=price_summary_store,
+        num_ads_summary=num_ads_summary_store,
+    )
+    figure_cache = FigureCache(disk_cache=FigureDiskCache(cache_dir=str(tmp_path)))
+    monkeypatch.setattr(explore_ads, "get_figure_cache", lambda: figure_cache)
+    built = []
+
+    def explore_figures(*args):
+        built.append(args)
+        return (explore_ads.blank_placeholder_plot(),) * 3, (1, 2, 3)
+
+    monkeypatch.setattr(explore_ads, "explore_figures", explore_figures)
+    snapshot = SummarySnapshot("v-test", decoded.frames)
+
+    figures, times_ms = explore_ads.cached_explore_figures(
+        snapshot, ["Camry", "accord"], [0, 15], None, {}
+    )
+    cached, cached_times_ms = explore_ads.cached_explore_figures(
+        snapshot, ["accord", "camry"], [0, 15], None, {}
+    )
+
+    assert len(built) == 1
+    assert times_ms == (1, 2, 3) and cached_times_ms is None
+    assert cached == figures and len(cached) == 3
+    assert figure_cache.stats()["memory"]["hits"] == 1
+
+    # other filters or data versions are different figures
+    explore_ads.cached_explore_figures(snapshot, ["camry"], [0, 10], None, {})
+    explore_ads.cached_explore_figures(
+        SummarySnapshot("v-other", decoded.frames), ["camry"], [0, 10], None, {}
+    )
+    assert len(built) == 3
+
+
+# pre-warmed selections are served from the figure cache
+def test_prewarm_explore(sample_data, tmp_path, monkeypatch):
+    import src.pages.explore_ads as explore_ads
+    from src.analytics.popular_selections import selection
+    from src.data.figure_cache import FigureCache
+    from src.data.summary_cache import SummarySnapshot, resolve_snapshot
+
+    makes_models_store, price_summary_store, num_ads_summary_store = sample_data
+    decoded = resolve_snapshot(
+        None,
+        makes_models=makes_models_store,
+        price_summary=price_summary_store,
+        num_ads_summary=num_ads_summary_store,
+    )
+    figure_cache = FigureCache()
+    monkeypatch.setattr(explore_ads, "get_figure_cache", lambda: figure_cache)
+    built = []
+
+    def explore_figures(*args):
+        built.append(args)
+        return (explore_ads.blank_placeholder_plot(),) * 3, (1, 2, 3)
+
+    monkeypatch.setattr(explore_ads, "explore_figures", explore_figures)
+    snapshot = SummarySnapshot("v-prewarm", decoded.frames)
+
+    explore_ads.prewarm_explore(
+        snapshot, [selection([]), selection(["camry", "accord"], [0, 10])]
+    )
+    assert len(built) == 2
+
+    _, times_ms = explore_ads.cached_explore_figures(
+        snapshot, ["accord", "Camry"], [0, 10], None, {}
+    )
+    _, default_times_ms = explore_ads.cached_explore_figures(
+        snapshot, explore_ads.DEFAULT_MODELS, [0, 15], None, {}
+    )
+    assert times_ms is None and default_times_ms is None
+    assert len(built) == 2